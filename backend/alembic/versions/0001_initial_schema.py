@@ -0,0 +1,85 @@
+"""Initial schema (users, chats, messages, legacy chat_messages)
+
+Databases created by the old create_all() startup already have these tables;
+mark them as migrated with ``alembic stamp 0001`` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'chats',
+        sa.Column('chat_id', sa.Uuid(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('ended_at', sa.DateTime(), nullable=True),
+        sa.Column('context_summary', sa.Text(), nullable=True),
+        sa.Column('chat_metadata', JSONB, nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('chat_id'),
+    )
+
+    op.create_table(
+        'messages',
+        sa.Column('message_id', sa.Uuid(), nullable=False),
+        sa.Column('chat_id', sa.Uuid(), nullable=False),
+        sa.Column('sender', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('analysis_data', JSONB, nullable=True),
+        sa.CheckConstraint("sender IN ('USER', 'AI')", name='check_sender_type'),
+        sa.ForeignKeyConstraint(['chat_id'], ['chats.chat_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('message_id'),
+    )
+
+    op.create_table(
+        'chat_messages',
+        sa.Column('message_id', sa.Uuid(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('sender', sa.Enum('USER', 'AI', name='messagesender'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('analysis_data', JSONB, nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('message_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('chat_messages')
+    op.drop_table('messages')
+    op.drop_table('chats')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    sa.Enum(name='messagesender').drop(op.get_bind(), checkfirst=True)
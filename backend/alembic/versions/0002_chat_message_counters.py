@@ -0,0 +1,46 @@
+"""Denormalized message_count / last_message_at on chats
+
+Adds the counters maintained by the chat endpoints and backfills them from
+the existing messages.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('chats') as batch_op:
+        batch_op.add_column(sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_message_at', sa.DateTime(), nullable=True))
+
+    # Backfill existing rows
+    op.execute(
+        """
+        UPDATE chats SET
+            message_count = (
+                SELECT count(*) FROM messages WHERE messages.chat_id = chats.chat_id
+            ),
+            last_message_at = (
+                SELECT max(created_at) FROM messages WHERE messages.chat_id = chats.chat_id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('chats') as batch_op:
+        batch_op.drop_column('last_message_at')
+        batch_op.drop_column('message_count')
@@ -0,0 +1,27 @@
+"""Indexes for keyset pagination of chats and messages
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chats_user_started', 'chats', ['user_id', 'started_at', 'chat_id'])
+    op.create_index('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'message_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_chat_created', table_name='messages')
+    op.drop_index('ix_chats_user_started', table_name='chats')
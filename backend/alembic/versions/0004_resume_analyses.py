@@ -0,0 +1,36 @@
+"""Content-addressed resume analysis results
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resume_analyses',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('analyzer_version', sa.String(length=32), nullable=False),
+        sa.Column('result', JSONB, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash', 'analyzer_version'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resume_analyses')
@@ -0,0 +1,63 @@
+"""Batch resume analysis jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resume_batch_jobs',
+        sa.Column('job_id', sa.Uuid(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('total_items', sa.Integer(), nullable=False),
+        sa.Column('completed_items', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('failed_items', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id'),
+    )
+    op.create_index('ix_resume_batch_jobs_user_id', 'resume_batch_jobs', ['user_id'])
+    op.create_table(
+        'resume_batch_items',
+        sa.Column('item_id', sa.Uuid(), nullable=False),
+        sa.Column('job_id', sa.Uuid(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('content', sa.LargeBinary(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('analyzer_version', sa.String(length=32), nullable=True),
+        sa.Column('status', sa.String(length=16), server_default='queued', nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint("status IN ('queued', 'running', 'done', 'failed')", name='check_batch_item_status'),
+        sa.ForeignKeyConstraint(['job_id'], ['resume_batch_jobs.job_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('item_id'),
+    )
+    op.create_index('ix_resume_batch_items_status_claimed', 'resume_batch_items', ['status', 'claimed_at'])
+    op.create_index('ix_resume_batch_items_job_finished', 'resume_batch_items', ['job_id', 'finished_at', 'item_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resume_batch_items_job_finished', table_name='resume_batch_items')
+    op.drop_index('ix_resume_batch_items_status_claimed', table_name='resume_batch_items')
+    op.drop_table('resume_batch_items')
+    op.drop_index('ix_resume_batch_jobs_user_id', table_name='resume_batch_jobs')
+    op.drop_table('resume_batch_jobs')
@@ -0,0 +1,37 @@
+"""Track how many messages each chat's context_summary covers
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("message_count > summary_message_count")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('chats') as batch_op:
+        batch_op.add_column(sa.Column('summary_message_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('summary_updated_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_chats_summary_pending', 'chats', ['last_message_at'],
+        postgresql_where=PENDING, sqlite_where=PENDING
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chats_summary_pending', table_name='chats')
+    with op.batch_alter_table('chats') as batch_op:
+        batch_op.drop_column('summary_updated_at')
+        batch_op.drop_column('summary_message_count')
@@ -0,0 +1,80 @@
+"""Full-text search over message content
+
+PostgreSQL: a generated tsvector column (messages.content_tsv) with a GIN
+index. Adding a stored generated column rewrites the messages table, so run
+this in a maintenance window on large databases.
+
+SQLite: an external-content FTS5 table (messages_fts) over the
+messages_search view (content plus an owner token per message), kept in
+sync with messages by triggers and built from the existing messages.
+
+Note: a later batch_alter_table on messages or chats recreates the table on
+SQLite, which breaks the view and triggers (and changes message rowids) -
+drop these objects before it, then recreate them and rebuild the index.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPGRADE = {
+    "postgresql": [
+        "ALTER TABLE messages ADD COLUMN content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED",
+        "CREATE INDEX ix_messages_content_tsv ON messages USING GIN (content_tsv)",
+    ],
+    "sqlite": [
+        "CREATE VIEW messages_search AS SELECT messages.rowid AS rowid, messages.content AS content, "
+        "'u' || chats.user_id AS owner FROM messages JOIN chats ON chats.chat_id = messages.chat_id",
+        "CREATE VIRTUAL TABLE messages_fts USING fts5("
+        "content, owner, content='messages_search', content_rowid='rowid', tokenize='porter unicode61')",
+        "CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN "
+        "INSERT INTO messages_fts(rowid, content, owner) "
+        "SELECT new.rowid, new.content, 'u' || user_id FROM chats WHERE chat_id = new.chat_id; END",
+        "CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content, owner) "
+        "SELECT 'delete', old.rowid, old.content, 'u' || user_id FROM chats WHERE chat_id = old.chat_id; END",
+        "CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content, owner) "
+        "SELECT 'delete', old.rowid, old.content, 'u' || user_id FROM chats WHERE chat_id = old.chat_id; "
+        "INSERT INTO messages_fts(rowid, content, owner) "
+        "SELECT new.rowid, new.content, 'u' || user_id FROM chats WHERE chat_id = new.chat_id; END",
+        # Index the messages that already exist
+        "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+    ],
+}
+
+DOWNGRADE = {
+    "postgresql": [
+        "DROP INDEX ix_messages_content_tsv",
+        "ALTER TABLE messages DROP COLUMN content_tsv",
+    ],
+    "sqlite": [
+        "DROP TRIGGER messages_fts_update",
+        "DROP TRIGGER messages_fts_delete",
+        "DROP TRIGGER messages_fts_insert",
+        "DROP TABLE messages_fts",
+        "DROP VIEW messages_search",
+    ],
+}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
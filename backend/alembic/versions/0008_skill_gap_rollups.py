@@ -0,0 +1,86 @@
+"""Skill gap rollups and analysis_data indexes
+
+Adds skill_gap_rollups (per-user daily skill gap totals, see
+app.db.skill_gap_store) and fills it from the existing AI messages, plus a
+partial index on messages with skill gaps and, on PostgreSQL, a GIN index
+over analysis_data.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SKILL_GAPS_PRESENT = {
+    "postgresql": "(analysis_data -> 'skill_gaps' -> 0) IS NOT NULL",
+    "sqlite": "json_extract(analysis_data, '$.skill_gaps[0]') IS NOT NULL",
+}
+
+# Frozen copy of skill_gap_store.ROLLUP_REBUILD_SQL as of this revision
+BACKFILL = {
+    "postgresql": """
+        INSERT INTO skill_gap_rollups (user_id, skill, day, samples, current_level_sum, target_level_sum)
+        SELECT chats.user_id, gap ->> 'skill', messages.created_at::date, count(*),
+               sum((gap ->> 'current_level')::int), sum((gap ->> 'target_level')::int)
+        FROM messages
+        JOIN chats ON chats.chat_id = messages.chat_id
+        CROSS JOIN LATERAL jsonb_array_elements(messages.analysis_data -> 'skill_gaps') AS gap
+        WHERE messages.sender = 'AI' AND messages.analysis_data @> '{"skill_gaps": [{}]}'
+        GROUP BY 1, 2, 3
+    """,
+    "sqlite": """
+        INSERT INTO skill_gap_rollups (user_id, skill, day, samples, current_level_sum, target_level_sum)
+        SELECT chats.user_id, json_extract(gap.value, '$.skill'), date(messages.created_at), count(*),
+               sum(json_extract(gap.value, '$.current_level')), sum(json_extract(gap.value, '$.target_level'))
+        FROM messages
+        JOIN chats ON chats.chat_id = messages.chat_id
+        JOIN json_each(messages.analysis_data, '$.skill_gaps') AS gap
+        WHERE messages.sender = 'AI' AND json_extract(messages.analysis_data, '$.skill_gaps[0]') IS NOT NULL
+        GROUP BY 1, 2, 3
+    """,
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    op.create_table(
+        'skill_gap_rollups',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('skill', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('current_level_sum', sa.Integer(), nullable=False),
+        sa.Column('target_level_sum', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'skill', 'day'),
+    )
+    op.create_index(
+        'ix_messages_skill_gaps', 'messages', ['chat_id', 'created_at'],
+        postgresql_where=sa.text(SKILL_GAPS_PRESENT["postgresql"]),
+        sqlite_where=sa.text(SKILL_GAPS_PRESENT["sqlite"])
+    )
+    if dialect == "postgresql":
+        op.create_index(
+            'ix_messages_analysis_data', 'messages', ['analysis_data'],
+            postgresql_using='gin', postgresql_ops={'analysis_data': 'jsonb_path_ops'}
+        )
+    if dialect in BACKFILL:
+        op.execute(BACKFILL[dialect])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_messages_analysis_data', table_name='messages')
+    op.drop_index('ix_messages_skill_gaps', table_name='messages')
+    op.drop_table('skill_gap_rollups')
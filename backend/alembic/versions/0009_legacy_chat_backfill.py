@@ -0,0 +1,46 @@
+"""Checkpoints for the legacy chat_messages backfill
+
+Adds backfill_checkpoints and the keyset index the backfill
+(python -m app.migrate_legacy_chats) reads chat_messages through.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'backfill_checkpoints',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('position', JSONB, nullable=True),
+        sa.Column('rows_copied', sa.Integer(), nullable=False),
+        sa.Column('chats_created', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index(
+        'ix_chat_messages_user_created', 'chat_messages', ['user_id', 'created_at', 'message_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_user_created', table_name='chat_messages')
+    op.drop_table('backfill_checkpoints')
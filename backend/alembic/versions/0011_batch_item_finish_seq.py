@@ -0,0 +1,49 @@
+"""Commit-ordered sequence of finished batch items
+
+Adds resume_batch_items.finish_seq (1, 2, ... per job, assigned when an
+item's outcome is recorded) and pages results by it instead of finished_at,
+which is taken before the commit and so can land behind a reader's cursor.
+Items finished before this revision are numbered by finished_at.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('resume_batch_items') as batch_op:
+        batch_op.add_column(sa.Column('finish_seq', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE resume_batch_items
+        SET finish_seq = (
+            SELECT numbered.seq FROM (
+                SELECT item_id, row_number() OVER (PARTITION BY job_id ORDER BY finished_at, item_id) AS seq
+                FROM resume_batch_items
+                WHERE finished_at IS NOT NULL
+            ) AS numbered
+            WHERE numbered.item_id = resume_batch_items.item_id
+        )
+        WHERE finished_at IS NOT NULL
+    """)
+    op.drop_index('ix_resume_batch_items_job_finished', table_name='resume_batch_items')
+    op.create_index('ix_resume_batch_items_job_seq', 'resume_batch_items', ['job_id', 'finish_seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resume_batch_items_job_seq', table_name='resume_batch_items')
+    op.create_index('ix_resume_batch_items_job_finished', 'resume_batch_items', ['job_id', 'finished_at', 'item_id'])
+    with op.batch_alter_table('resume_batch_items') as batch_op:
+        batch_op.drop_column('finish_seq')
@@ -1,3 +1,9 @@
+import os
+
+# Vercel entry point: serverless profile unless configured otherwise
+# (see Settings.SERVERLESS)
+os.environ.setdefault("SERVERLESS", "true")
+
 from app.main import app
 
 handler = app
@@ -1,10 +1,57 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import login, users, chat, analysis
+import importlib
+from typing import Iterable, Tuple
 
-api_router = APIRouter()
+from fastapi import APIRouter, FastAPI
 
-# Include all endpoint routers with their prefixes and tags
-api_router.include_router(login.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
-api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
-api_router.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
+# Endpoint modules (app.api.v1.endpoints.<name>) with their prefixes and tags
+ENDPOINT_ROUTERS: Tuple[Tuple[str, str, list], ...] = (
+    ("login", "/auth", ["Authentication"]),
+    ("users", "/users", ["Users"]),
+    ("chat", "/chat", ["Chat"]),
+    ("analysis", "/analysis", ["Analysis"]),
+)
+
+
+def _endpoint_router(name: str) -> APIRouter:
+    return importlib.import_module(f"app.api.v1.endpoints.{name}").router
+
+
+def build_api_router() -> APIRouter:
+    """All endpoint routers with their prefixes and tags (imports every endpoint module)."""
+    api_router = APIRouter()
+    for name, prefix, tags in ENDPOINT_ROUTERS:
+        api_router.include_router(_endpoint_router(name), prefix=prefix, tags=tags)
+    return api_router
+
+
+class LazyEndpointRouters:
+    """
+    ASGI middleware that includes an endpoint module's router into the app on
+    the first request under its prefix, so a cold start only imports the
+    modules (and their dependencies) the request needs.
+
+    Requests for the OpenAPI schema or docs include every router first.
+    """
+
+    def __init__(self, app, fastapi_app: FastAPI, prefix: str, eager_paths: Iterable[str] = ()):
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.pending = {prefix + router_prefix: (name, router_prefix, tags) for name, router_prefix, tags in ENDPOINT_ROUTERS}
+        self.prefix = prefix
+        self.eager_paths = set(eager_paths)
+
+    def _include(self, group_prefix: str) -> None:
+        name, router_prefix, tags = self.pending.pop(group_prefix)
+        self.fastapi_app.include_router(_endpoint_router(name), prefix=self.prefix + router_prefix, tags=tags)
+
+    async def __call__(self, scope, receive, send):
+        if self.pending and scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path in self.eager_paths:
+                for group_prefix in list(self.pending):
+                    self._include(group_prefix)
+            else:
+                for group_prefix in list(self.pending):
+                    if path == group_prefix or path.startswith(group_prefix + "/"):
+                        self._include(group_prefix)
+        await self.app(scope, receive, send)
@@ -1,78 +1,429 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form
-from sqlalchemy.orm import Session
+import hashlib
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
 
-from app.db.session import get_db
-from app.db.models import User
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import decode_sequence_cursor, encode_sequence_cursor
+from app.db.analysis_store import get_analysis, store_analysis
+from app.db.resume_batch_store import add_item, create_job
+from app.db.skill_gap_store import GRANULARITIES, skill_gap_trend
+from app.db.session import get_async_db
+from app.db.models import Chat, Message, MessageSender, ResumeAnalysis, ResumeBatchItem, ResumeBatchJob, User
 from app.api.v1.endpoints.users import get_current_user
+from app.schemas.analysis import ROICandidate, ROIRequest, SkillGapRequest
+from app.services.resume import analyzer_version, analyze_resume_file, analyze_resume_text, file_analyzer_version
+from app.services.resume_batch import resume_batch_worker
+from app.services.roi import get_roi_model
+from app.services.skill_gaps import get_role_requirements
 
 router = APIRouter()
 
+# How many of the user's latest AI messages skill levels are inferred from
+# when a skill gap request doesn't list the user's skills
+SKILL_HISTORY_MESSAGES = 50
+
+
+async def _read_upload(file: UploadFile, digest) -> int:
+    """
+    Feed an upload into a hash in chunks, without holding it in memory.
+    
+    Rejects uploads over RESUME_MAX_UPLOAD_BYTES with 413 - before reading
+    anything when the size is already known, otherwise as soon as the limit
+    is crossed. Oversized request bodies are rejected earlier, before they
+    are received (app.core.body_limit); this check catches a single file
+    over the limit within an allowed body.
+    
+    Returns:
+        The upload size in bytes
+    """
+    max_bytes = settings.RESUME_MAX_UPLOAD_BYTES
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Resume file exceeds the {max_bytes} byte upload limit"
+    )
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+    
+    size = 0
+    while chunk := await file.read(settings.RESUME_UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        digest.update(chunk)
+    return size
+
+
+def _analysis_key(file_digest: Optional[bytes], extracted_text: Optional[str]) -> str:
+    """
+    Content hash of an analyze-resume request: SHA-256 over fixed-size parts
+    (presence byte + SHA-256 of the file, then of the text), so no file and
+    text split can collide with another.
+    """
+    text_digest = hashlib.sha256(extracted_text.encode("utf-8")).digest() if extracted_text else None
+    key = hashlib.sha256()
+    for part in (file_digest, text_digest):
+        key.update(b"\0" if part is None else b"\1" + part)
+    return key.hexdigest()
+
 
 @router.post("/analyze-resume")
 async def analyze_resume(
     file: UploadFile | None = File(None),
     extracted_text: str | None = Form(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze user's resume and provide career insights.
     
     This is a protected endpoint that requires authentication.
     
-    TODO: Implement resume parsing and analysis logic. Currently accepts an uploaded file and optional client-side extracted text.
-    This could include:
-    - Skills extraction
-    - Experience analysis
-    - Career trajectory prediction
-    - Salary estimation
+    Accepts an uploaded file and optional client-side extracted text. The
+    upload is hashed (SHA-256) in chunks, and analysis results are stored by
+    the hash of file and text and the analyzer version, so re-uploading the same resume returns
+    the stored result (`"cached": true`) without analyzing it again.
+    Without extracted_text, the file is parsed server-side like batch items
+    (text formats only; 415 otherwise).
     """
-    # Basic placeholder: return meta information and (if provided) the extracted text length
     file_info = None
+    file_digest = None
     if file is not None:
-        contents = await file.read()
+        digest = hashlib.sha256()
         file_info = {
             "filename": file.filename,
             "content_type": file.content_type,
-            "size": len(contents),
+            "size": await _read_upload(file, digest),
         }
-
+        file_digest = digest.digest()
+    content_hash = _analysis_key(file_digest, extracted_text)
+    # The file's own text is analyzed when none was extracted client-side
+    parse_file = file is not None and not extracted_text
+    version = file_analyzer_version() if parse_file else analyzer_version()
+    
+    analysis = await get_analysis(db, content_hash, version)
+    cached = analysis is not None
+    if not cached:
+        if parse_file:
+            await file.seek(0)
+            analyze, args = analyze_resume_file, (await file.read(), file.content_type)
+        else:
+            analyze, args = analyze_resume_text, (extracted_text,)
+        # CPU-bound on long resumes - keep it off the event loop, and hold
+        # back batch work meanwhile
+        try:
+            with resume_batch_worker.interactive():
+                analysis = await run_in_threadpool(analyze, *args)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"{exc}; send the resume text as extracted_text"
+            )
+        await store_analysis(db, content_hash, version, analysis)
+        await db.commit()
+    
     return {
-        "message": "Resume analysis endpoint - placeholder response",
+        "message": "Resume analysis complete",
         "user_id": str(current_user.user_id),
         "file": file_info,
-        "extracted_text_length": len(extracted_text) if extracted_text else 0,
+        "content_hash": content_hash,
+        "analyzer_version": version,
+        "cached": cached,
+        **analysis,
+    }
+
+
+def _job_progress(job: ResumeBatchJob) -> dict:
+    processed = job.completed_items + job.failed_items
+    if processed >= job.total_items:
+        job_status = "completed"
+    elif processed:
+        job_status = "running"
+    else:
+        job_status = "queued"
+    return {
+        "job_id": str(job.job_id),
+        "status": job_status,
+        "total": job.total_items,
+        "completed": job.completed_items,
+        "failed": job.failed_items,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+async def _get_job(db: AsyncSession, job_id: UUID, user_id: UUID) -> ResumeBatchJob:
+    """Fetch a batch job owned by the user, or raise 404."""
+    job = await db.scalar(
+        select(ResumeBatchJob).where(ResumeBatchJob.job_id == job_id, ResumeBatchJob.user_id == user_id)
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch job not found"
+        )
+    return job
+
+
+@router.post("/batch-jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_job(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Queue a batch of resumes for analysis.
+    
+    This is a protected endpoint that requires authentication.
+    
+    Files are stored with the job and analyzed in the background by a
+    process pool; poll `GET /batch-jobs/{job_id}` for progress and page
+    through `GET /batch-jobs/{job_id}/results` as items complete. Files whose
+    content was analyzed before are completed immediately.
+    Text formats are parsed server-side; other formats fail per item.
+    Files are limited to RESUME_MAX_UPLOAD_BYTES each and
+    RESUME_BATCH_MAX_BYTES together (413).
+    """
+    if len(files) > settings.RESUME_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.RESUME_BATCH_MAX_FILES} files per batch"
+        )
+    max_total = settings.RESUME_BATCH_MAX_BYTES
+    batch_too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch exceeds the {max_total} byte upload limit"
+    )
+    if sum(file.size or 0 for file in files) > max_total:
+        raise batch_too_large
+    
+    version = file_analyzer_version()
+    job_id = await create_job(db, current_user.user_id, len(files))
+    cached = 0
+    total = 0
+    for position, file in enumerate(files):
+        digest = hashlib.sha256()
+        size = await _read_upload(file, digest)
+        total += size
+        if total > max_total:
+            raise batch_too_large
+        content_hash = digest.hexdigest()
+        done = await get_analysis(db, content_hash, version) is not None
+        cached += done
+        # One file in memory at a time: its row is sent before the next is read
+        content = None
+        if not done:
+            await file.seek(0)
+            content = await file.read()
+        await add_item(
+            db, job_id, position, file.filename, file.content_type, size, content, content_hash,
+            analyzer_version=version if done else None, finish_seq=cached if done else None
+        )
+    if cached:
+        job = await db.get(ResumeBatchJob, job_id)
+        job.completed_items = cached
+    await db.commit()
+    resume_batch_worker.wake()
+    
+    return {
+        "message": "Batch job queued",
+        "job_id": str(job_id),
+        "total": len(files),
+        "cached": cached,
+    }
+
+
+@router.get("/batch-jobs/{job_id}")
+async def get_batch_job(
+    job_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Progress of a batch job: queued, running or completed, with item counts.
+    
+    This is a protected endpoint that requires authentication.
+    """
+    return _job_progress(await _get_job(db, job_id, current_user.user_id))
+
+
+@router.get("/batch-jobs/{job_id}/results")
+async def get_batch_job_results(
+    job_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Finished items of a batch job, in the order they finished.
+    
+    This is a protected endpoint that requires authentication.
+    
+    - **limit**: Page size (1-200)
+    - **cursor**: `next_cursor` from the previous call
+    
+    Keep polling with the returned `next_cursor` to receive items as they
+    complete; it only stops advancing once every item has been returned.
+    Items are numbered as their outcome commits, so an item that finishes
+    late is never skipped.
+    """
+    position = None
+    if cursor is not None:
+        position = decode_sequence_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    job = await _get_job(db, job_id, current_user.user_id)
+    
+    query = (
+        select(
+            ResumeBatchItem.item_id, ResumeBatchItem.position, ResumeBatchItem.filename,
+            ResumeBatchItem.status, ResumeBatchItem.error, ResumeBatchItem.content_hash,
+            ResumeBatchItem.finish_seq, ResumeAnalysis.result
+        )
+        .outerjoin(ResumeAnalysis, and_(
+            ResumeAnalysis.content_hash == ResumeBatchItem.content_hash,
+            ResumeAnalysis.analyzer_version == ResumeBatchItem.analyzer_version
+        ))
+        .where(ResumeBatchItem.job_id == job.job_id, ResumeBatchItem.finish_seq.isnot(None))
+        .order_by(ResumeBatchItem.finish_seq)
+        .limit(limit)
+    )
+    if position is not None:
+        query = query.where(ResumeBatchItem.finish_seq > position)
+    rows = (await db.execute(query)).all()
+    
+    next_cursor = encode_sequence_cursor(rows[-1].finish_seq) if rows else cursor
+    return {
+        **_job_progress(job),
+        "items": [
+            {
+                "item_id": str(row.item_id),
+                "position": row.position,
+                "filename": row.filename,
+                "status": row.status,
+                "error": row.error,
+                "content_hash": row.content_hash,
+                "result": row.result,
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
     }
 
 
+async def _recent_skill_mentions(db: AsyncSession, user_id) -> list[dict]:
+    """Skills extracted from the user's latest chat messages (analysis_data["skills"])."""
+    result = await db.execute(
+        select(Message.analysis_data)
+        .join(Chat, Chat.chat_id == Message.chat_id)
+        .where(
+            Chat.user_id == user_id,
+            Message.sender == MessageSender.AI.value,
+            Message.analysis_data.isnot(None)
+        )
+        .order_by(Message.created_at.desc())
+        .limit(SKILL_HISTORY_MESSAGES)
+    )
+    return [
+        skill
+        for analysis_data in result.scalars()
+        for skill in (analysis_data or {}).get("skills", [])
+    ]
+
+
 @router.post("/skill-gap-analysis")
 async def skill_gap_analysis(
-    target_role: str,
+    target_role: str | None = None,
+    request: SkillGapRequest | None = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze skill gaps between current profile and target role.
     
     This is a protected endpoint that requires authentication.
     
-    - **target_role**: The desired career role/position
+    - **target_role**: The desired career role/position (id, name or alias).
+      When omitted, gaps are reported for the best-fit role.
+    - **skills** (optional body): Current level per skill; inferred from
+      the user's recent chats when omitted
+    - **top_k** (optional body): How many best-fit roles to return
+    
+    The user's skills are scored against every role in one vectorized pass,
+    returning ranked skill gaps and the best-fit roles.
+    """
+    request = request or SkillGapRequest()
+    requirements = get_role_requirements()
+    
+    role_index = None
+    if target_role:
+        role_index = requirements.find_role(target_role)
+        if role_index is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown target role: {target_role}"
+            )
+    
+    if request.skills is not None:
+        current = requirements.skill_vector(request.skills)
+    else:
+        current = requirements.skill_vector_from_mentions(
+            await _recent_skill_mentions(db, current_user.user_id)
+        )
+    
+    return {
+        "message": f"Skill gap analysis for role: {target_role or 'best fit'}",
+        "user_id": str(current_user.user_id),
+        **requirements.analyze(current, role_index, top_k=request.top_k),
+    }
+
+
+@router.get("/skill-gap-trend")
+async def get_skill_gap_trend(
+    days: int = Query(90, ge=1, le=730),
+    granularity: str = Query("week", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+    skill: List[str] | None = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    How the user's skill gaps evolved over their chats.
+    
+    This is a protected endpoint that requires authentication.
+    
+    - **days**: How far back to look (default: 90, max: 730)
+    - **granularity**: `day`, `week` (starting Monday) or `month`
+    - **skill** (repeatable): Only these skills; all skills when omitted
     
-    TODO: Implement skill gap analysis logic.
+    For each skill, returns per period the number of samples and the
+    average current and target level recorded in AI messages' analysis
+    data. Served from per-user daily rollups, so the cost does not grow
+    with the number of messages.
     """
+    since = (datetime.utcnow() - timedelta(days=days - 1)).date()
     return {
-        "message": f"Skill gap analysis for role: {target_role}",
         "user_id": str(current_user.user_id),
-        "skill_gaps": []  # Placeholder
+        "since": since.isoformat(),
+        "granularity": granularity,
+        "skills": await skill_gap_trend(db, current_user.user_id, since, granularity, skill),
     }
 
 
 @router.post("/roi-calculation")
 async def calculate_roi(
-    investment_amount: float,
-    target_role: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    investment_amount: float | None = Query(None, gt=0),
+    target_role: str | None = None,
+    request: ROIRequest | None = None,
+    current_user: User = Depends(get_current_user)
 ):
     """
     Calculate ROI for career investment (courses, certifications, etc.).
@@ -81,13 +432,59 @@ async def calculate_roi(
     
     - **investment_amount**: Cost of career investment
     - **target_role**: Target career role
+    - **candidates** (optional body): Several investments/roles to compare in
+      one call, instead of the query parameters
+    - **paths**, **horizon_years**, **seed** (optional body): Simulation size,
+      years of earnings counted, and a seed for reproducible results
     
-    TODO: Implement ROI calculation logic.
+    Placement, time to hire, salary trajectories and course cost are simulated
+    with a vectorized Monte Carlo model; each result has the expected (mean)
+    return and ROI, p10/p50/p90 percentiles, the payback period and placement
+    probability.
     """
+    if request is None:
+        if investment_amount is None or not target_role:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide investment_amount and target_role, or a list of candidates"
+            )
+        request = ROIRequest(candidates=[ROICandidate(investment_amount=investment_amount, target_role=target_role)])
+    
+    if len(request.candidates) > settings.ROI_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.ROI_MAX_CANDIDATES} candidates per request"
+        )
+    paths = request.paths or settings.ROI_DEFAULT_PATHS
+    if paths > settings.ROI_MAX_PATHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.ROI_MAX_PATHS} paths per candidate"
+        )
+    
+    model = get_roi_model()
+    candidates = []
+    for candidate in request.candidates:
+        role_index = model.requirements.find_role(candidate.target_role)
+        if role_index is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown target role: {candidate.target_role}"
+            )
+        candidates.append({
+            "role_index": role_index,
+            "investment_amount": candidate.investment_amount,
+            "current_salary": candidate.current_salary,
+        })
+    
+    # CPU-bound for large path counts - keep it off the event loop
+    results = await run_in_threadpool(model.simulate, candidates, paths, request.horizon_years, request.seed)
+    
     return {
-        "message": "ROI calculation endpoint - to be implemented",
+        "message": "ROI calculation complete",
         "user_id": str(current_user.user_id),
         "investment": investment_amount,
         "target_role": target_role,
-        "roi": {}  # Placeholder
+        "roi": results[0],
+        "results": results,
     }
@@ -1,24 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import json
+import uuid
+from datetime import datetime
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.etags import cache_headers, etag_matches, not_modified, weak_etag
+from app.core.pagination import encode_cursor, decode_cursor, encode_score_cursor, decode_score_cursor
+from app.core.responses import model_fields, model_response, row_dicts
+from app.db.chat_store import (
+    bump_chats_version, chat_counters_available, chats_version_available, chat_write_behind, new_chat_row, new_message_row, write_chat_rows
+)
+from app.db.legacy_chats import chat_history, history_served_from_chats
+from app.db.search_store import search_messages
+from app.db.skill_gap_store import remove_chat_skill_gaps
+from app.db.session import get_async_db, AsyncSessionLocal
+from app.db.summary_store import summary_columns_available
 from app.db.models import User, Chat, Message, ChatMessage, MessageSender
 from app.schemas.chat import (
     ChatMessageRead, ChatRequest, ChatResponse,
-    ChatRead, ChatSummary, MessageRead
+    ChatRead, MessageRead, ChatPage, MessagePage,
+    MessageSearchHit, MessageSearchPage
 )
 from app.api.v1.endpoints.users import get_current_user
+from app.services.context import build_chat_context
+from app.services.llm import generate_response, build_analysis_data
+from app.services.summaries import chat_summarizer
 
 router = APIRouter()
 
+# Read paths select these columns, in response field order, and return the
+# rows as dicts through model_response (see app.core.responses)
+CHAT_READ_COLUMNS = [getattr(Chat, field) for field in model_fields(ChatRead)]
+MESSAGE_READ_COLUMNS = [getattr(Message, field) for field in model_fields(MessageRead)]
+LEGACY_MESSAGE_COLUMNS = [getattr(ChatMessage, field) for field in model_fields(ChatMessageRead)]
+
+CHAT_READ_ADAPTER = TypeAdapter(ChatRead)
+CHAT_PAGE_ADAPTER = TypeAdapter(ChatPage)
+MESSAGE_PAGE_ADAPTER = TypeAdapter(MessagePage)
+CHAT_HISTORY_ADAPTER = TypeAdapter(List[ChatMessageRead])
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """Decode an optional ?cursor= value, rejecting malformed cursors with 400."""
+    if cursor is None:
+        return None
+    position = decode_cursor(cursor)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return position
+
+
+async def _resolve_chat(
+    db: AsyncSession,
+    chat_id: Optional[UUID],
+    user_id: UUID
+) -> Tuple[UUID, List[dict], Optional[str]]:
+    """
+    Check that an existing chat belongs to the user, or prepare a new chat row.
+    
+    Returns the chat_id, the chat rows to insert (empty for an existing chat)
+    and the chat's context summary.
+    """
+    if chat_id:
+        existing_chat = (await db.execute(
+            select(Chat.chat_id, Chat.context_summary).where(
+                Chat.chat_id == chat_id,
+                Chat.user_id == user_id
+            )
+        )).first()
+        if existing_chat is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat session not found"
+            )
+        return chat_id, [], existing_chat.context_summary
+    
+    # New chat session (inserted together with its first messages)
+    chat_row = new_chat_row(user_id, {"channel": "web", "topic": "career_guidance"})
+    return chat_row["chat_id"], [chat_row], None
+
+
+async def _chat_context(
+    db: AsyncSession,
+    chat_id: UUID,
+    chat_rows: List[dict],
+    summary: Optional[str],
+    user_message: str
+) -> dict[str, Any]:
+    """Model context for the turn: summary + recent messages (none for a new chat)."""
+    return await build_chat_context(db, None if chat_rows else chat_id, user_message, summary)
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def send_chat_message(
     chat_request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a chat message and get AI response.
@@ -31,76 +118,131 @@ async def send_chat_message(
     - **chat_id**: Optional - existing chat session ID
     
     Returns the AI's response along with chat_id and message_id.
+    For incremental output use POST /chat/stream.
+    
+    The whole turn (new chat, user message, AI message, chat counters) is
+    written in one transaction. With CHAT_WRITE_BEHIND_ENABLED, turns from
+    concurrent requests are batched into a shared transaction instead.
     """
     # Get or create chat session
-    if chat_request.chat_id:
-        chat = db.query(Chat).filter(
-            Chat.chat_id == chat_request.chat_id,
-            Chat.user_id == current_user.user_id
-        ).first()
-        if not chat:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Chat session not found"
-            )
+    chat_id, chat_rows, summary = await _resolve_chat(db, chat_request.chat_id, current_user.user_id)
+    
+    # Rolling summary + last messages, not the whole transcript
+    context = await _chat_context(db, chat_id, chat_rows, summary, chat_request.message)
+    user_message = new_message_row(chat_id, "USER", chat_request.message)
+    
+    # TODO: Integrate with your AI/LLM logic here (see app.services.llm)
+    ai_response_text = "".join([
+        token async for token in generate_response(chat_request.message, context=context["messages"])
+    ])
+    analysis_data = build_analysis_data(chat_request.message)
+    
+    ai_message = new_message_row(chat_id, "AI", ai_response_text, analysis_data)
+    
+    # Save the turn
+    if settings.CHAT_WRITE_BEHIND_ENABLED:
+        await chat_write_behind.submit(chat_rows, [user_message, ai_message])
     else:
-        # Create new chat session
-        chat = Chat(
-            user_id=current_user.user_id,
-            chat_metadata={"channel": "web", "topic": "career_guidance"}
-        )
-        db.add(chat)
-        db.commit()
-        db.refresh(chat)
-    
-    # Save user message
-    user_message = Message(
-        chat_id=chat.chat_id,
-        sender="USER",
-        content=chat_request.message
-    )
-    db.add(user_message)
-    db.commit()
-    
-    # TODO: Integrate with your AI/LLM logic here
-    ai_response_text = f"AI response to: {chat_request.message}"
-    
-    # Example analysis data
-    analysis_data = {
-        "skill_gaps": [
-            {"skill": "Python", "current_level": 3, "target_level": 5},
-            {"skill": "Machine Learning", "current_level": 2, "target_level": 4}
-        ],
-        "roi_calculation": {
-            "investment": 5000,
-            "expected_return": 25000,
-            "roi_percentage": 400
-        }
-    }
-    
-    # Save AI response
-    ai_message = Message(
-        chat_id=chat.chat_id,
-        sender="AI",
-        content=ai_response_text,
-        analysis_data=analysis_data
-    )
-    db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
+        await write_chat_rows(db, chat_rows, [user_message, ai_message])
+        await db.commit()
+    # Summaries are generated in the background (app.services.summaries)
+    chat_summarizer.notify(chat_id, 2)
     
     return ChatResponse(
         message=ai_response_text,
-        chat_id=chat.chat_id,
-        message_id=ai_message.message_id,
+        chat_id=chat_id,
+        message_id=ai_message["message_id"],
         analysis_data=analysis_data
     )
 
 
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_ai_response(
+    chat_id: UUID,
+    user_message: str,
+    context: List[dict[str, str]]
+) -> AsyncIterator[str]:
+    """
+    Stream the AI response as SSE events: start, token*, analysis, done.
+    
+    Tokens are pulled from the model only as fast as the client consumes them
+    (each yield waits for the ASGI send), so a slow client applies backpressure
+    to generation instead of buffering the response in memory.
+    
+    The AI message is written once, after the last token, in its own session
+    (the request's session is closed before the body is streamed). If the
+    client disconnects mid-stream, generation is stopped and the partial
+    response is saved so the transcript stays consistent.
+    """
+    message_id = uuid.uuid4()
+    chunks: List[str] = []
+    tokens = generate_response(user_message, context=context)
+    
+    try:
+        yield _sse_event("start", {"chat_id": str(chat_id), "message_id": str(message_id)})
+        async for token in tokens:
+            chunks.append(token)
+            yield _sse_event("token", {"text": token})
+    except BaseException:
+        # Client went away (cancellation/GeneratorExit): keep what was generated
+        await tokens.aclose()
+        if chunks:
+            with anyio.CancelScope(shield=True):
+                async with AsyncSessionLocal() as db:
+                    partial_message = new_message_row(chat_id, "AI", "".join(chunks), message_id=message_id)
+                    await write_chat_rows(db, [], [partial_message])
+                    await db.commit()
+            chat_summarizer.notify(chat_id)
+        raise
+    
+    analysis_data = build_analysis_data(user_message)
+    async with AsyncSessionLocal() as db:
+        ai_message = new_message_row(chat_id, "AI", "".join(chunks), analysis_data, message_id=message_id)
+        await write_chat_rows(db, [], [ai_message])
+        await db.commit()
+    chat_summarizer.notify(chat_id)
+    
+    yield _sse_event("analysis", analysis_data)
+    yield _sse_event("done", {"message_id": str(message_id)})
+
+
+@router.post("/chat/stream")
+async def stream_chat_message(
+    chat_request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send a chat message and stream the AI response as Server-Sent Events.
+    
+    Same request body as POST /chat. The response is `text/event-stream` with events:
+    - **start**: `{"chat_id", "message_id"}`
+    - **token**: `{"text"}` - one per response fragment
+    - **analysis**: the analysis_data object, sent once the AI message is saved
+    - **done**: `{"message_id"}`
+    """
+    chat_id, chat_rows, summary = await _resolve_chat(db, chat_request.chat_id, current_user.user_id)
+    context = await _chat_context(db, chat_id, chat_rows, summary, chat_request.message)
+    
+    await write_chat_rows(db, chat_rows, [new_message_row(chat_id, "USER", chat_request.message)])
+    await db.commit()
+    chat_summarizer.notify(chat_id)
+    
+    return StreamingResponse(
+        _stream_ai_response(chat_id, chat_request.message, context["messages"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/chat-history", response_model=List[ChatMessageRead])
 async def get_chat_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = 50
 ):
     """
@@ -112,68 +254,162 @@ async def get_chat_history(
     - **limit**: Maximum number of messages to return (default: 50)
     
     Returns a flat list of chat messages ordered by creation time.
+    Once the legacy backfill (python -m app.migrate_legacy_chats) is complete,
+    the list is projected from the user's chats instead of chat_messages.
     """
-    messages = db.query(ChatMessage)\
-        .filter(ChatMessage.user_id == current_user.user_id)\
-        .order_by(ChatMessage.created_at.desc())\
-        .limit(limit)\
-        .all()
+    if await history_served_from_chats(db):
+        return model_response(CHAT_HISTORY_ADAPTER, await chat_history(db, current_user.user_id, limit))
+
+    result = await db.execute(
+        select(*LEGACY_MESSAGE_COLUMNS)
+        .where(ChatMessage.user_id == current_user.user_id)
+        .order_by(ChatMessage.created_at.desc())
+        .limit(limit)
+    )
     
-    return messages
+    return model_response(CHAT_HISTORY_ADAPTER, row_dicts(result))
 
 
-@router.get("/chats", response_model=List[ChatSummary])
+@router.get("/chats", response_model=ChatPage)
 async def get_user_chats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    limit: int = 20
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get the current user's chat sessions, newest first.
+    
+    Returns a page of chat sessions with summary information.
+    Runs a single query: message counts come from the denormalized
+    Chat.message_count, or from a grouped count if that column is absent.
+    
+    The weak ETag is the user's chats_version; a matching If-None-Match gets
+    304 after that one primary-key lookup.
+    
+    - **limit**: Maximum number of chats to return (default: 20, max: 100)
+    - **cursor**: next_cursor from the previous page (keyset on started_at, chat_id)
+    """
+    position = _parse_cursor(cursor)
+    
+    # Version before the page: a concurrent write can only make the page newer
+    # than its ETag (refetched on the next poll), never older
+    etag = None
+    if await chats_version_available(db):
+        version = await db.scalar(select(User.chats_version).where(User.user_id == current_user.user_id))
+        etag = weak_etag(current_user.user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    columns = [Chat.chat_id, Chat.user_id, Chat.started_at, Chat.ended_at, Chat.context_summary]
+    if await chat_counters_available(db):
+        query = select(*columns, Chat.message_count)
+    else:
+        query = select(*columns, func.count(Message.message_id).label("message_count"))\
+            .outerjoin(Message, Message.chat_id == Chat.chat_id)\
+            .group_by(Chat.chat_id)
+    
+    query = query.where(Chat.user_id == current_user.user_id)
+    if position is not None:
+        query = query.where(tuple_(Chat.started_at, Chat.chat_id) < tuple_(*position))
+    
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(
+        query
+        .order_by(Chat.started_at.desc(), Chat.chat_id.desc())
+        .limit(limit + 1)
+    )
+    chats = row_dicts(result)
+    
+    next_cursor = None
+    if len(chats) > limit:
+        chats = chats[:limit]
+        next_cursor = encode_cursor(chats[-1]["started_at"], chats[-1]["chat_id"])
+    
+    return model_response(CHAT_PAGE_ADAPTER, {"items": chats, "next_cursor": next_cursor}, cache_headers(etag))
+
+
+@router.get("/search", response_model=MessageSearchPage)
+async def search_chat_messages(
+    q: str = Query(..., min_length=1, max_length=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None
 ):
     """
-    Get all chat sessions for the current user.
+    Full-text search across all of the current user's chat messages.
     
-    Returns a list of chat sessions with summary information.
+    Results are ranked by relevance, each with a short snippet where the
+    matched terms are wrapped in `<mark></mark>` (the rest is HTML-escaped).
+    Words match in any inflection ("developer" finds "developers"); on
+    PostgreSQL, "quoted phrases", `or` and `-excluded` words are supported too.
     
-    - **limit**: Maximum number of chats to return (default: 20)
+    - **q**: Search text
+    - **limit**: Maximum number of results to return (default: 20, max: 50)
+    - **cursor**: next_cursor from the previous page (keyset on score, message_id)
     """
-    chats = db.query(Chat)\
-        .filter(Chat.user_id == current_user.user_id)\
-        .order_by(Chat.started_at.desc())\
-        .limit(limit)\
-        .all()
+    position = None
+    if cursor is not None:
+        position = decode_score_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
     
-    # Build summary with message count
-    chat_summaries = []
-    for chat in chats:
-        message_count = db.query(Message).filter(Message.chat_id == chat.chat_id).count()
-        chat_summaries.append(ChatSummary(
-            chat_id=chat.chat_id,
-            user_id=chat.user_id,
-            started_at=chat.started_at,
-            ended_at=chat.ended_at,
-            context_summary=chat.context_summary,
-            message_count=message_count
-        ))
+    # Fetch one extra row to know whether another page exists
+    hits = await search_messages(db, current_user.user_id, q, limit + 1, after=position)
     
-    return chat_summaries
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_score_cursor(hits[-1]["score"], hits[-1]["message_id"])
+    
+    return MessageSearchPage(
+        items=[MessageSearchHit(**hit) for hit in hits],
+        next_cursor=next_cursor
+    )
 
 
 @router.get("/chats/{chat_id}", response_model=ChatRead)
 async def get_chat_by_id(
     chat_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
-    Get a specific chat session with all messages.
+    Get a specific chat session (without its messages).
     
     - **chat_id**: The chat session ID
     
-    Returns the chat session with all messages.
+    Returns the chat session. Use GET /chats/{chat_id}/messages to page
+    through the transcript. The weak ETag changes with the chat's summary
+    and end; a matching If-None-Match gets 304 from a primary-key lookup of
+    those columns.
     """
-    chat = db.query(Chat).filter(
-        Chat.chat_id == chat_id,
-        Chat.user_id == current_user.user_id
-    ).first()
+    etag = None
+    if await summary_columns_available(db):
+        version = (await db.execute(
+            select(Chat.summary_message_count, Chat.summary_updated_at, Chat.ended_at).where(
+                Chat.chat_id == chat_id,
+                Chat.user_id == current_user.user_id
+            )
+        )).first()
+        if version is not None:
+            etag = weak_etag(chat_id, *version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    
+    result = await db.execute(
+        select(*CHAT_READ_COLUMNS).where(
+            Chat.chat_id == chat_id,
+            Chat.user_id == current_user.user_id
+        )
+    )
+    chat = result.first()
     
     if not chat:
         raise HTTPException(
@@ -181,24 +417,76 @@ async def get_chat_by_id(
             detail="Chat session not found"
         )
     
-    return chat
+    return model_response(CHAT_READ_ADAPTER, dict(zip(result.keys(), chat)), cache_headers(etag))
+
+
+@router.get("/chats/{chat_id}/messages", response_model=MessagePage)
+async def get_chat_messages(
+    chat_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """
+    Get a page of messages from a chat session, oldest first.
+    
+    - **chat_id**: The chat session ID
+    - **limit**: Maximum number of messages to return (default: 50, max: 200)
+    - **cursor**: next_cursor from the previous page (keyset on created_at, message_id)
+    """
+    position = _parse_cursor(cursor)
+    
+    chat_exists = await db.scalar(
+        select(Chat.chat_id).where(
+            Chat.chat_id == chat_id,
+            Chat.user_id == current_user.user_id
+        )
+    )
+    if chat_exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    
+    query = select(*MESSAGE_READ_COLUMNS).where(Message.chat_id == chat_id)
+    if position is not None:
+        query = query.where(tuple_(Message.created_at, Message.message_id) > tuple_(*position))
+    
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(
+        query
+        .order_by(Message.created_at, Message.message_id)
+        .limit(limit + 1)
+    )
+    messages = row_dicts(result)
+    
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1]["created_at"], messages[-1]["message_id"])
+    
+    return model_response(MESSAGE_PAGE_ADAPTER, {"items": messages, "next_cursor": next_cursor})
 
 
 @router.delete("/chats/{chat_id}")
 async def delete_chat(
     chat_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a chat session and all its messages.
     
     - **chat_id**: The chat session ID
     """
-    chat = db.query(Chat).filter(
-        Chat.chat_id == chat_id,
-        Chat.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Chat).where(
+            Chat.chat_id == chat_id,
+            Chat.user_id == current_user.user_id
+        )
+    )
+    chat = result.scalars().first()
     
     if not chat:
         raise HTTPException(
@@ -206,7 +494,9 @@ async def delete_chat(
             detail="Chat session not found"
         )
     
-    db.delete(chat)
-    db.commit()
+    await remove_chat_skill_gaps(db, chat_id)
+    await db.delete(chat)
+    await bump_chats_version(db, user_ids=[current_user.user_id])
+    await db.commit()
     
     return {"message": "Chat session deleted successfully"}
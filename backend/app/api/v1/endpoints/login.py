@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.core.config import settings
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.db.session import get_db
+from app.core.security import (
+    verify_password, get_password_hash, create_access_token,
+    password_needs_rehash, password_hash_pool, PasswordHashPoolBusy
+)
+from app.db.session import get_async_db
 from app.db.models import User
 from app.schemas.user import UserCreate, UserRead
 from app.schemas.token import Token
@@ -13,8 +17,23 @@ from app.schemas.token import Token
 router = APIRouter()
 
 
+async def _run_password_hashing(fn, *args):
+    """
+    Run a password hashing function on the bounded hashing pool,
+    failing fast with 503 when the pool is saturated.
+    """
+    try:
+        return await password_hash_pool.run(fn, *args)
+    except PasswordHashPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     
@@ -23,7 +42,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     - **full_name**: Optional full name
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User.user_id).where(User.email == user_data.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,7 +50,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user with hashed password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await _run_password_hashing(get_password_hash, user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -39,17 +58,17 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/token", response_model=Token)
-def login(
+async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login endpoint (OAuth2 password flow).
@@ -60,10 +79,10 @@ def login(
     Returns JWT access token that will be stored in HttpOnly cookie.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = (await db.execute(select(User).where(User.email == form_data.username))).scalars().first()
     
     # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await _run_password_hashing(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -77,6 +96,15 @@ def login(
             detail="User account is inactive"
         )
     
+    # Transparently upgrade legacy hashes / old iteration counts.
+    # Skipped (and retried on a later login) if the hashing pool is busy.
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await password_hash_pool.run(get_password_hash, form_data.password)
+            await db.commit()
+        except PasswordHashPoolBusy:
+            pass
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
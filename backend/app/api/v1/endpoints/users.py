@@ -1,24 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie
-from sqlalchemy.orm import Session
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Cookie, Header, Response
+from sqlalchemy import select, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from typing import Optional
 
+from app.core.cache import token_cache, user_cache
+from app.core.etags import cache_headers, etag_matches, not_modified, weak_etag
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db.models import User
 from app.schemas.user import UserRead
 
 router = APIRouter()
 
 
+def _user_snapshot(user: User) -> dict:
+    """Column values of a user (except deferred ones), safe to share between requests."""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs if not attr.deferred}
+
+
+async def _user_from_snapshot(db: AsyncSession, snapshot: dict) -> User:
+    """
+    Rebuild a cached user as a persistent instance of this session without a query
+    (SQLAlchemy's merge(load=False) caching pattern).
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
 async def get_current_user(
     access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Dependency to get the current authenticated user from JWT cookie.
     
     This function is used as a dependency in protected endpoints.
     Usage: @router.get("/protected", dependencies=[Depends(get_current_user)])
+    
+    Decoded tokens and resolved users are cached in-process (see app.core.cache),
+    so most requests skip both JWT verification and the user lookup. Updating or
+    deactivating a user invalidates its entry; other workers pick the change up
+    within USER_CACHE_TTL_SECONDS.
     """
     # Check if token exists
     if not access_token:
@@ -31,14 +56,18 @@ async def get_current_user(
     # Remove "Bearer " prefix if present
     token = access_token.replace("Bearer ", "")
     
-    # Decode and verify token
-    payload = decode_token(token)
+    # Decode and verify token (cached until the token expires)
+    payload = token_cache.get(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        payload = decode_token(token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if "exp" in payload:
+            token_cache.set(token, payload, ttl=payload["exp"] - time.time())
     
     # Extract email from token
     email: str = payload.get("sub")
@@ -49,8 +78,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.email == email).first()
+    # Get user from cache, falling back to the database
+    snapshot = user_cache.get(email)
+    if snapshot is not None:
+        return await _user_from_snapshot(db, snapshot)
+    
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,14 +98,30 @@ async def get_current_user(
             detail="User account is inactive"
         )
     
+    # Only active users are cached
+    user_cache.set(email, _user_snapshot(user))
+    
     return user
 
 
 @router.get("/me", response_model=UserRead)
-async def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get current authenticated user's information.
     
-    This is a protected endpoint that requires authentication.
+    This is a protected endpoint that requires authentication. The weak ETag
+    comes from the (usually cached) user itself, so a matching If-None-Match
+    gets 304 without a query.
     """
+    etag = weak_etag(
+        current_user.user_id, current_user.updated_at,
+        current_user.email, current_user.full_name, current_user.is_active
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     return current_user
@@ -0,0 +1,206 @@
+"""
+Admission control: per route group concurrency limits and load shedding.
+
+Each route group (auth, chat, analysis) admits a bounded number of
+concurrent requests; the next ones wait in a bounded FIFO queue. A request
+is rejected immediately with 429 and Retry-After when its group's queue is
+full, or when queued requests have recently been waiting longer than the
+wait budget; one that does queue gives up after the budget. So an overloaded
+group fails fast instead of holding sockets and DB connections, and does not
+starve the other groups.
+
+Independently of the groups, requests are shed with 503 while connection
+checkouts from the DB pool are slow (see app.db.pool): first reads, which
+clients can cheaply retry, then everything. Paths outside the groups
+(/health, /) are never limited.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.db.pool import PoolCheckoutMonitor
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted; answer with status_code and Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": self.detail},
+            status_code=self.status_code,
+            headers={"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+        )
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` concurrent holders; up to `queue_size` more wait (FIFO)
+    for at most `max_wait` seconds. Not thread-safe - use from one event loop.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait: float, weight: float = 0.2):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.weight = weight
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Moving average of how long admitted requests waited
+        self._queue_wait = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def queue_wait(self) -> float:
+        return self._queue_wait
+
+    def _observe(self, waited: float) -> None:
+        self._queue_wait = self._queue_wait * (1 - self.weight) + waited * self.weight
+
+    def _reject(self, detail: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(429, detail, max(self._queue_wait, 1))
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Raises:
+            AdmissionRejected: If the queue is full, recent waits exceed
+                max_wait, or this request waited max_wait
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._observe(0.0)
+            return
+        if len(self._waiters) >= self.queue_size or (self._waiters and self._queue_wait > self.max_wait):
+            # Queue full, or it has recently been too slow to be worth joining
+            raise self._reject(f"Too many concurrent {self.name} requests")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._observe(time.monotonic() - started)
+            raise self._reject(f"Too many concurrent {self.name} requests")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the client went away
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self._observe(time.monotonic() - started)
+
+    def release(self) -> None:
+        """Free a slot, handing it to the oldest waiter that is still waiting."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionControl:
+    """
+    ASGI middleware applying ConcurrencyLimiters by path prefix and shedding
+    on DB pool checkout wait.
+
+    Args:
+        groups: (path prefix, limiter) pairs; the first matching prefix wins
+        pool_monitor: Checkout wait of the DB pools
+        shed_reads_after: Pool wait (seconds) above which reads get 503
+        shed_all_after: Pool wait (seconds) above which all requests get 503
+    """
+
+    def __init__(
+        self,
+        app,
+        groups: Iterable[Tuple[str, ConcurrencyLimiter]],
+        pool_monitor: PoolCheckoutMonitor,
+        shed_reads_after: float,
+        shed_all_after: float
+    ):
+        self.app = app
+        self.groups = list(groups)
+        self.pool_monitor = pool_monitor
+        self.shed_reads_after = shed_reads_after
+        self.shed_all_after = shed_all_after
+
+    def limiter_for(self, path: str) -> Optional[ConcurrencyLimiter]:
+        for prefix, limiter in self.groups:
+            if path == prefix or path.startswith(prefix + "/"):
+                return limiter
+        return None
+
+    def _shed(self, method: str) -> Optional[AdmissionRejected]:
+        pool_wait = self.pool_monitor.wait_seconds()
+        threshold = self.shed_reads_after if method in SAFE_METHODS else self.shed_all_after
+        if pool_wait > threshold:
+            return AdmissionRejected(503, "Service overloaded, please retry", pool_wait)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self._shed(scope["method"])
+        if rejection is None:
+            try:
+                await limiter.acquire()
+            except AdmissionRejected as rejected:
+                rejection = rejected
+        if rejection is not None:
+            await rejection.response()(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def route_group_limiters() -> List[Tuple[str, ConcurrencyLimiter]]:
+    """
+    The API's route groups as (path prefix, limiter), sized from settings;
+    the first matching prefix wins. Streamed chat turns hold their slot
+    until the stream ends, so they get their own group and open streams
+    never crowd out the other chat requests.
+    """
+    def limiter(name: str, limit: int) -> ConcurrencyLimiter:
+        return ConcurrencyLimiter(name, limit, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_MAX_WAIT_SECONDS)
+
+    api = settings.API_V1_STR
+    auth = limiter("auth", settings.ADMISSION_AUTH_CONCURRENCY)
+    return [
+        (f"{api}/auth", auth),
+        (f"{api}/users", auth),
+        (f"{api}/chat/chat/stream", limiter("chat_stream", settings.ADMISSION_CHAT_STREAM_CONCURRENCY)),
+        (f"{api}/chat", limiter("chat", settings.ADMISSION_CHAT_CONCURRENCY)),
+        (f"{api}/analysis", limiter("analysis", settings.ADMISSION_ANALYSIS_CONCURRENCY)),
+    ]
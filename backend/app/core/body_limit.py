@@ -0,0 +1,92 @@
+"""
+Request body size limits for upload endpoints, enforced before the body is read.
+
+Starlette spools a whole multipart body before the endpoint runs, so a size
+check in the endpoint only fires after the upload was received. BodySizeLimit
+answers 413 from the Content-Length header instead, and for bodies without
+one (chunked) stops reading as soon as the limit is crossed. The endpoints
+keep their own per-file checks.
+"""
+from typing import Iterable, List, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+
+class BodySizeLimit:
+    """
+    ASGI middleware rejecting request bodies over a per-path limit with 413.
+
+    Args:
+        limits: (exact path, max body bytes) pairs; other paths are not limited
+    """
+
+    def __init__(self, app, limits: Iterable[Tuple[str, int]]):
+        self.app = app
+        self.limits = dict(limits)
+
+    @staticmethod
+    def _too_large(max_bytes: int) -> JSONResponse:
+        return JSONResponse(
+            {"detail": f"Request body exceeds the {max_bytes} byte limit"},
+            status_code=413,
+            headers={"Connection": "close"}
+        )
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            if not content_length.isdigit() or int(content_length) > max_bytes:
+                await self._too_large(max_bytes)(scope, receive, send)
+                return
+            await self.app(scope, receive, send)
+            return
+
+        # No Content-Length: count the body as the endpoint reads it
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def receive_wrapper():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # The endpoint sees a disconnect; we answer instead
+                    rejected = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if rejected:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception:
+            if not rejected:
+                raise
+        if rejected and not response_started:
+            await self._too_large(max_bytes)(scope, receive, send)
+
+
+def upload_body_limits() -> List[Tuple[str, int]]:
+    """The upload endpoints' body limits, from the file limits plus form overhead."""
+    api = settings.API_V1_STR
+    overhead = settings.RESUME_FORM_OVERHEAD_BYTES
+    return [
+        (f"{api}/analysis/analyze-resume", settings.RESUME_MAX_UPLOAD_BYTES + overhead),
+        (f"{api}/analysis/batch-jobs", settings.RESUME_BATCH_MAX_BYTES + overhead),
+    ]
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi.responses import Response
+
+# Per-user data behind a cookie: only the browser may cache it, and it has to
+# revalidate (If-None-Match) before every reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*version: Any) -> str:
+    """
+    Weak ETag for a representation identified by version parts.
+
+    Args:
+        version: Values that change whenever the response would, e.g. the
+            user id and a version counter (include the user id - different
+            users can share a URL and a counter value)
+
+    Returns:
+        The header value, e.g. W/"3f2a..."
+    """
+    digest = hashlib.blake2b(repr(version).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: Optional[str] = None) -> dict[str, str]:
+    """Cache-Control (and ETag, when known) for a per-user response."""
+    headers = {"Cache-Control": CACHE_CONTROL, "Vary": "Cookie"}
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match."""
+    return Response(status_code=304, headers=cache_headers(etag))
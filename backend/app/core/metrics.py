@@ -0,0 +1,287 @@
+"""
+Prometheus metrics, exposed at /metrics.
+
+- HTTPMetrics (ASGI middleware): request count and latency histogram per
+  route template, requests in flight per route group and SQL statements per
+  request.
+- instrument_engine: counts the statements each request executes (one
+  context variable lookup per statement).
+- Pool checkout wait is observed by the timed pools (app.db.pool); pool
+  size, connections in use and overflow, cache hits/misses and admission
+  control state are read by collectors.
+
+Subsystems register a collector with register_collector(name, callback):
+callbacks copy their state into metrics and run on every scrape and every
+METRICS_REFRESH_SECONDS in each worker, so request paths pay nothing.
+
+With several workers (uvicorn --workers N), set PROMETHEUS_MULTIPROC_DIR to
+an empty directory before starting: every worker writes its metrics there
+and /metrics, whichever worker serves it, aggregates all of them.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+HTTP_REQUESTS = Counter(
+    "apex_http_requests_total", "HTTP requests by route template and status",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "apex_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "apex_http_requests_in_flight", "HTTP requests being processed, by route group",
+    ["group"], multiprocess_mode="livesum"
+)
+HTTP_QUERIES = Histogram(
+    "apex_http_request_queries", "SQL statements executed per HTTP request",
+    ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "apex_db_pool_checkout_wait_seconds", "Time waited for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+DB_POOL_SIZE = Gauge(
+    "apex_db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_IN_USE = Gauge(
+    "apex_db_pool_connections_in_use", "Connections checked out of the pool",
+    ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "apex_db_pool_overflow", "Connections open beyond the pool size",
+    ["engine"], multiprocess_mode="livesum"
+)
+CACHE_HITS = Counter("apex_cache_hits_total", "In-process cache hits", ["cache"])
+CACHE_MISSES = Counter("apex_cache_misses_total", "In-process cache misses", ["cache"])
+ADMISSION_IN_FLIGHT = Gauge(
+    "apex_admission_in_flight", "Requests holding an admission slot, by route group",
+    ["group"], multiprocess_mode="livesum"
+)
+ADMISSION_QUEUED = Gauge(
+    "apex_admission_queued", "Requests waiting for an admission slot, by route group",
+    ["group"], multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Counter(
+    "apex_admission_rejected_total", "Requests rejected with 429 by route group", ["group"]
+)
+
+# Statements executed by the current request (set by HTTPMetrics)
+_request_queries: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+# Named collector callbacks, see register_collector
+_collectors: Dict[str, Callable[[], None]] = {}
+
+
+def register_collector(name: str, callback: Callable[[], None]) -> None:
+    """
+    Register (or replace) a callback that copies a subsystem's state into
+    metrics. It runs on every scrape and periodically in each worker, never
+    on a request path; keep it cheap and non-blocking.
+    """
+    _collectors[name] = callback
+
+
+def collect() -> None:
+    """Run every registered collector (errors in one don't stop the others)."""
+    for name, callback in list(_collectors.items()):
+        try:
+            callback()
+        except Exception:
+            logger.exception("Metrics collector %s failed", name)
+
+
+class CounterDelta:
+    """Advances a Counter to follow a monotonically growing value read elsewhere."""
+
+    def __init__(self, counter: Counter):
+        self.counter = counter
+        self._last: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        last = self._last.get(labels, 0)
+        if value > last:
+            self.counter.labels(*labels).inc(value - last)
+        self._last[labels] = value
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+def instrument_engine(engine) -> None:
+    """Count the statements of each request on a (sync) engine; idempotent."""
+    if not event.contains(engine, "before_cursor_execute", _count_statement):
+        event.listen(engine, "before_cursor_execute", _count_statement)
+
+
+def pool_collector(engines: Iterable[Tuple[str, object]]) -> Callable[[], None]:
+    """Collector for the size, checked-out and overflow connections of queue pools."""
+    engines = list(engines)
+
+    def collect_pools() -> None:
+        for name, engine in engines:
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue  # NullPool/StaticPool: nothing pooled
+            DB_POOL_SIZE.labels(name).set(pool.size())
+            DB_POOL_IN_USE.labels(name).set(pool.checkedout())
+            DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+    return collect_pools
+
+
+# The caches are process-wide, so are the values their counters have reached
+_cache_hits, _cache_misses = CounterDelta(CACHE_HITS), CounterDelta(CACHE_MISSES)
+
+
+def collect_caches() -> None:
+    """Collector for the hit/miss counters of every TTLCache (app.core.cache)."""
+    from app.core.cache import cache_stats
+
+    for name, stats in cache_stats().items():
+        _cache_hits.set((name,), stats["hits"])
+        _cache_misses.set((name,), stats["misses"])
+
+
+def admission_collector(groups: Iterable[Tuple[str, object]]) -> Callable[[], None]:
+    """Collector for admission control limiters (app.core.admission), by limiter name."""
+    limiters = {limiter.name: limiter for _, limiter in groups}
+    rejected = CounterDelta(ADMISSION_REJECTED)
+
+    def collect_admission() -> None:
+        for name, limiter in limiters.items():
+            ADMISSION_IN_FLIGHT.labels(name).set(limiter.in_flight)
+            ADMISSION_QUEUED.labels(name).set(limiter.queued)
+            rejected.set((name,), limiter.rejected)
+
+    return collect_admission
+
+
+def metrics_response() -> Response:
+    """Prometheus text exposition of this process's (or, in multiprocess mode, all workers') metrics."""
+    collect()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+class MetricsRefresher:
+    """Runs the collectors every `interval` seconds, so every worker's values stay current."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            collect()
+
+    def start(self) -> None:
+        """Start refreshing (call from the event loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop refreshing; in multiprocess mode, drop this worker's live gauges."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if MULTIPROCESS:
+            multiprocess.mark_process_dead(os.getpid())
+
+
+metrics_refresher = MetricsRefresher(settings.METRICS_REFRESH_SECONDS)
+
+
+class HTTPMetrics:
+    """
+    ASGI middleware recording request count, latency and statement count
+    per route template (e.g. /api/v1/chat/chats/{chat_id}), and requests in
+    flight per route group.
+
+    Args:
+        groups: (group name, path prefix) pairs for the in-flight gauge;
+            other paths count as "other"
+    """
+
+    def __init__(self, app, groups: Iterable[Tuple[str, str]] = ()):
+        self.app = app
+        self.groups = list(groups)
+
+    def group_for(self, path: str) -> str:
+        for name, prefix in self.groups:
+            if path == prefix or path.startswith(prefix + "/"):
+                return name
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(self.group_for(scope["path"]))
+        queries = [0]
+        token = _request_queries.set(queries)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            _request_queries.reset(token)
+            # The router stores the matched route in the scope; unmatched
+            # paths (404s, rejected by admission control) share one label
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route, str(status[0])).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_QUERIES.labels(route).observe(queries[0])
@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """
+    Encode a keyset position (timestamp, id) as an opaque URL-safe cursor.
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        row_id: Primary key of the last row (tie-breaker for equal timestamps)
+
+    Returns:
+        The cursor string to pass back as ?cursor=
+    """
+    raw = json.dumps([timestamp.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        The (timestamp, id) position, or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_score_cursor(score: float, row_id: UUID) -> str:
+    """
+    Encode a ranked-results position (score, id) as an opaque URL-safe cursor.
+
+    Args:
+        score: Relevance score of the last row on the page
+        row_id: Primary key of the last row (tie-breaker for equal scores)
+
+    Returns:
+        The cursor string to pass back as ?cursor=
+    """
+    raw = json.dumps([score, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> Optional[Tuple[float, UUID]]:
+    """
+    Decode a cursor produced by encode_score_cursor.
+
+    Returns:
+        The (score, id) position, or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(score), UUID(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_sequence_cursor(sequence: int) -> str:
+    """
+    Encode a position in a numbered sequence as an opaque URL-safe cursor.
+
+    Args:
+        sequence: Sequence number of the last row on the page
+
+    Returns:
+        The cursor string to pass back as ?cursor=
+    """
+    raw = json.dumps([sequence], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sequence_cursor(cursor: str) -> Optional[int]:
+    """
+    Decode a cursor produced by encode_sequence_cursor.
+
+    Returns:
+        The sequence number, or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (sequence,) = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(sequence, int):
+            return None
+        return sequence
+    except (ValueError, TypeError):
+        return None
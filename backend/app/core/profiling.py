@@ -0,0 +1,223 @@
+"""
+Per-request SQL profiling (opt-in: SQL_PROFILING_ENABLED).
+
+Engine events time every statement into the profile of the request that
+executed it. When the request completes, SQLProfiler logs (logger
+"app.core.profiling"):
+
+- the request's statement count and total database time;
+- statements whose shape (the SQL with placeholders and IN lists
+  normalized) ran at least SQL_PROFILING_REPEAT_THRESHOLD times: the
+  signature of an N+1 loop;
+- statements slower than SQL_SLOW_QUERY_MS, with the shape of their bind
+  parameters (types and counts, never values).
+
+With DEBUG it also sends a Server-Timing header (db time and statement
+count) that browser dev tools show next to the request.
+
+assert_max_queries guards an endpoint's statement count in tests (see
+tests/test_query_counts.py):
+
+    with assert_max_queries(2):
+        await client.get("/api/v1/chat/chats")
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Statements of the current request (set by SQLProfiler)
+_request_profile: contextvars.ContextVar[Optional["QueryProfile"]] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+# Active profile_queries() blocks: they see every statement, from any task or thread
+_captures: List["QueryProfile"] = []
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and every placeholder (and IN list of them) as ?."""
+    shape = _PLACEHOLDER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types of the bind parameters, runs of one type collapsed (e.g. "(UUID x 500, int)")."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0])}" if rows else "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if not parameters:
+        return "()"
+    runs: List[Tuple[str, int]] = []
+    for value in parameters:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1] = (name, runs[-1][1] + 1)
+        else:
+            runs.append((name, 1))
+    return "(" + ", ".join(name if count == 1 else f"{name} x {count}" for name, count in runs) + ")"
+
+
+class QueryProfile:
+    """Statements executed by one request (or profile_queries block). Thread-safe."""
+
+    def __init__(self, slow_query_ms: Optional[float] = None):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.slow: List[Tuple[float, str, str]] = []  # (ms, shape, parameter shape)
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters: Any, executemany: bool, elapsed_ms: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+            if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+                self.slow.append((elapsed_ms, shape, parameter_shape(parameters, executemany)))
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report(self) -> str:
+        """Statement shapes with their counts, most frequent first."""
+        lines = [f"{self.count} statements, {self.total_ms:.1f} ms"]
+        lines.extend(f"  {count} x {shape}" for shape, count in self.shapes.most_common())
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is None or (_request_profile.get() is None and not _captures):
+        return
+    context._profiling_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_profiling_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.record(statement, parameters, executemany, elapsed_ms)
+    for capture in list(_captures):
+        if capture is not profile:
+            capture.record(statement, parameters, executemany, elapsed_ms)
+
+
+def instrument_engine(engine) -> None:
+    """Time statements on a (sync) engine for profiling; idempotent."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_app_engines() -> None:
+    """Instrument the application's sync and async engines."""
+    from app.db.session import async_engine, engine
+
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Profile every statement executed on the application's engines while the
+    block runs, from any request, task or thread (keep background workers
+    off when the numbers matter).
+    """
+    instrument_app_engines()
+    profile = QueryProfile()
+    _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        _captures.remove(profile)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryProfile]:
+    """
+    Fail (AssertionError) if the block executes more than `max_queries`
+    statements, listing the statements it executed.
+
+    Like profile_queries it counts every statement executed meanwhile,
+    including other tasks' - e.g. a write-behind flush (app.db.chat_store) or
+    the chat summarizer - so run it with the background workers off.
+    """
+    with profile_queries() as profile:
+        yield profile
+    if profile.count > max_queries:
+        raise AssertionError(f"Expected at most {max_queries} SQL statements, got {profile.report()}")
+
+
+class SQLProfiler:
+    """
+    ASGI middleware giving each request a QueryProfile and reporting it
+    when the request completes.
+
+    Args:
+        repeat_threshold: Executions of one statement shape reported as N+1
+        slow_query_ms: Statements at least this slow are logged
+        server_timing: Add a Server-Timing header with the database time
+    """
+
+    def __init__(self, app, repeat_threshold: int, slow_query_ms: float, server_timing: bool = False):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.slow_query_ms = slow_query_ms
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(self.slow_query_ms)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={profile.total_ms:.1f};desc="{profile.count} queries", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]}
+            await send(message)
+
+        token = _request_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_profile.reset(token)
+            self._report(scope, profile)
+
+    def _report(self, scope, profile: QueryProfile) -> None:
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        request = f"{scope['method']} {route}"
+        if profile.count:
+            logger.info("%s: %d statements, %.1f ms", request, profile.count, profile.total_ms)
+        for shape, count in profile.repeated(self.repeat_threshold):
+            logger.warning("%s: possible N+1, %d x %s", request, count, shape)
+        for elapsed_ms, shape, parameters in profile.slow:
+            logger.warning("%s: slow query (%.1f ms) %s params=%s", request, elapsed_ms, shape, parameters)
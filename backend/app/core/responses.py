@@ -0,0 +1,64 @@
+"""
+Fast JSON responses.
+
+FastAPI's default path for a response_model validates the returned objects
+(reading ORM attributes one by one with from_attributes), converts the
+result with jsonable_encoder and encodes it with the stdlib json module.
+For a large page of messages with nested analysis_data that dominates the
+request.
+
+- FastJSONResponse (the app's default_response_class) encodes with orjson
+  when it is installed.
+- Read paths that select plain columns build dicts straight from the row
+  tuples (row_dicts) and return them with model_response, which skips the
+  response_model pass: orjson encodes the dicts as they are, and without
+  orjson a TypeAdapter compiled once per response type validates and
+  encodes them in pydantic-core.
+"""
+from typing import Any, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Result
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when available (same output for JSON-compatible content)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def model_fields(model: type[BaseModel]) -> List[str]:
+    """A response model's field names, in the order pydantic would serialize them."""
+    return list(model.model_fields)
+
+
+def row_dicts(result: Result, keys: Optional[Sequence[str]] = None) -> List[dict[str, Any]]:
+    """Rows as plain dicts, keyed by `keys` (default: the selected column labels)."""
+    keys = tuple(keys or result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def model_response(adapter: TypeAdapter, content: Any, headers: Optional[dict[str, str]] = None) -> Response:
+    """
+    JSON response for content that already has the shape of adapter's type,
+    e.g. dicts from row_dicts with the keys in model_fields order (so both
+    encoders produce the same bytes).
+
+    Returned from an endpoint, the route's response_model only documents it.
+    """
+    if orjson is not None:
+        body = orjson.dumps(content, option=ORJSON_OPTIONS)
+    else:
+        body = adapter.dump_json(adapter.validate_python(content))
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,10 +1,93 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 import hashlib
+import hmac
 import secrets
+import threading
 from app.core.config import settings
 
+T = TypeVar("T")
+
+PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+
+# Hashes stored before the algorithm/iterations were recorded ("salt$hash")
+LEGACY_PASSWORD_HASH_ITERATIONS = 100000
+
+
+class PasswordHashPoolBusy(Exception):
+    """Raised when the password hashing pool has no free worker or queue slot."""
+
+
+class PasswordHashPool:
+    """
+    Size-limited executor for password hashing.
+    
+    PBKDF2 is CPU-bound, so a login burst would otherwise occupy the threadpool
+    that every sync route shares. Work runs on a dedicated thread pool
+    (hashlib releases the GIL while hashing) and is awaited from async routes,
+    so no shared threadpool thread waits on it; at most ``workers + queue_size``
+    calls are admitted at once and the rest are rejected immediately.
+    """
+    
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash"
+                )
+            return self._executor
+    
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        Run fn(*args) on the pool and await the result.
+        
+        Raises:
+            PasswordHashPoolBusy: If all workers and queue slots are taken
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashPoolBusy()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._slots.release()
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads (a new pool is started on next use)."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
+
+def _parse_password_hash(hashed_password: str) -> Tuple[str, int, bytes, str]:
+    """
+    Split a stored hash into (algorithm, iterations, salt, hash).
+    
+    Accepts both "algorithm$iterations$salt$hash" and the legacy "salt$hash".
+    """
+    parts = hashed_password.split('$')
+    if len(parts) == 2:
+        salt, stored_hash = parts
+        return PASSWORD_HASH_ALGORITHM, LEGACY_PASSWORD_HASH_ITERATIONS, bytes.fromhex(salt), stored_hash
+    algorithm, iterations, salt, stored_hash = parts
+    return algorithm, int(iterations), bytes.fromhex(salt), stored_hash
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -17,14 +100,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    # Split the stored hash to get salt and hash
     try:
-        salt, stored_hash = hashed_password.split('$')
-        # Hash the provided password with the same salt
-        password_hash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'), 
-                                            bytes.fromhex(salt), 100000)
+        algorithm, iterations, salt, stored_hash = _parse_password_hash(hashed_password)
+        if algorithm != PASSWORD_HASH_ALGORITHM:
+            return False
+        # Hash the provided password with the same salt and cost
+        password_hash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'),
+                                            salt, iterations)
         # Compare hashes
-        return password_hash.hex() == stored_hash
+        return hmac.compare_digest(password_hash.hex(), stored_hash)
     except Exception:
         return False
 
@@ -37,14 +121,25 @@ def get_password_hash(password: str) -> str:
         password: The plain text password to hash
         
     Returns:
-        The hashed password in format: salt$hash
+        The hashed password in format: algorithm$iterations$salt$hash
     """
+    iterations = settings.PASSWORD_HASH_ITERATIONS
     # Generate a random salt
     salt = secrets.token_bytes(32)
     # Hash the password
-    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
-    # Return salt and hash separated by $
-    return f"{salt.hex()}${password_hash.hex()}"
+    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{PASSWORD_HASH_ALGORITHM}${iterations}${salt.hex()}${password_hash.hex()}"
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash uses an old format or a different cost
+    than PASSWORD_HASH_ITERATIONS (and should be upgraded on next login).
+    """
+    if hashed_password.count('$') != 3:
+        return True
+    algorithm, iterations, _, _ = hashed_password.split('$')
+    return algorithm != PASSWORD_HASH_ALGORITHM or int(iterations) != settings.PASSWORD_HASH_ITERATIONS
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,57 @@
+"""
+Content-addressed store for resume analysis results.
+
+Results are keyed by the SHA-256 of the uploaded content plus the analyzer
+version, so re-uploading the same resume returns the stored result without
+re-parsing or re-analyzing it. Lookups go through an in-process LRU first and
+fall back to the resume_analyses table (shared by all workers).
+"""
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models import ResumeAnalysis
+
+# Results never change for a given (hash, version), so the TTL only bounds memory churn
+_analysis_cache = TTLCache(
+    "resume_analysis",
+    maxsize=settings.RESUME_ANALYSIS_CACHE_SIZE,
+    ttl=24 * 60 * 60
+)
+
+
+async def get_analysis(db: AsyncSession, content_hash: str, analyzer_version: str) -> Optional[dict[str, Any]]:
+    """Return the stored analysis for this content, or None."""
+    key = (content_hash, analyzer_version)
+    result = _analysis_cache.get(key)
+    if result is not None:
+        return result
+
+    result = await db.scalar(
+        select(ResumeAnalysis.result).where(
+            ResumeAnalysis.content_hash == content_hash,
+            ResumeAnalysis.analyzer_version == analyzer_version
+        )
+    )
+    if result is not None:
+        _analysis_cache.set(key, result)
+    return result
+
+
+async def store_analysis(db: AsyncSession, content_hash: str, analyzer_version: str, result: dict[str, Any]) -> None:
+    """
+    Store an analysis result (committed by the caller).
+
+    Concurrent uploads of the same content may race; the first insert wins.
+    """
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    await db.execute(
+        dialect_insert(ResumeAnalysis)
+        .values(content_hash=content_hash, analyzer_version=analyzer_version, result=result)
+        .on_conflict_do_nothing()
+    )
+    _analysis_cache.set((content_hash, analyzer_version), result)
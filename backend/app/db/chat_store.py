@@ -0,0 +1,269 @@
+"""
+Write path for chat sessions and messages.
+
+Rows are built client-side (UUIDs and timestamps generated here), so a chat
+turn can be written with plain INSERTs in a single transaction - no
+refresh/RETURNING round trips. The denormalized Chat.message_count and
+Chat.last_message_at counters, and the owners' User.chats_version, are
+maintained in the same transaction.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import bindparam, insert, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.models import Chat, Message, User
+from app.db.session import AsyncSessionLocal
+from app.db.skill_gap_store import record_skill_gaps
+
+logger = logging.getLogger(__name__)
+
+# Whether chats.message_count/last_message_at exist (alembic revision 0002).
+# Checked once per process; until then chat lists fall back to a grouped count.
+_chat_counters_available: Optional[bool] = None
+
+
+async def chat_counters_available(db: AsyncSession) -> bool:
+    """Check (once) whether the denormalized chat counter columns exist."""
+    global _chat_counters_available
+    if _chat_counters_available is None:
+        connection = await db.connection()
+        columns = await connection.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("chats")}
+        )
+        _chat_counters_available = {"message_count", "last_message_at"} <= columns
+    return _chat_counters_available
+
+
+# Whether users.chats_version exists (alembic revision 0010).
+# Checked once per process; until then chat lists are served without an ETag.
+_chats_version_available: Optional[bool] = None
+
+
+async def chats_version_available(db: AsyncSession) -> bool:
+    """Check (once) whether the per-user chats version column exists."""
+    global _chats_version_available
+    if _chats_version_available is None:
+        connection = await db.connection()
+        columns = await connection.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("users")}
+        )
+        _chats_version_available = "chats_version" in columns
+    return _chats_version_available
+
+
+async def bump_chats_version(
+    db: AsyncSession,
+    user_ids: Iterable[uuid.UUID] = (),
+    chat_ids: Iterable[uuid.UUID] = ()
+) -> None:
+    """Advance the chats_version of the given users and of the given chats' owners (no commit)."""
+    if not await chats_version_available(db):
+        return
+    users = User.__table__
+    conditions = []
+    user_ids, chat_ids = set(user_ids), set(chat_ids)
+    if user_ids:
+        conditions.append(users.c.user_id.in_(user_ids))
+    if chat_ids:
+        conditions.append(users.c.user_id.in_(select(Chat.user_id).where(Chat.chat_id.in_(chat_ids))))
+    if conditions:
+        await db.execute(update(users).where(or_(*conditions)).values(chats_version=users.c.chats_version + 1))
+
+
+def new_chat_row(user_id: uuid.UUID, chat_metadata: Optional[dict] = None) -> dict:
+    """Column values for a new chat session."""
+    return {
+        "chat_id": uuid.uuid4(),
+        "user_id": user_id,
+        "started_at": datetime.utcnow(),
+        "chat_metadata": chat_metadata,
+    }
+
+
+def new_message_row(
+    chat_id: uuid.UUID,
+    sender: str,
+    content: str,
+    analysis_data: Optional[dict[str, Any]] = None,
+    message_id: Optional[uuid.UUID] = None
+) -> dict:
+    """Column values for a new message."""
+    return {
+        "message_id": message_id or uuid.uuid4(),
+        "chat_id": chat_id,
+        "sender": sender,
+        "content": content,
+        "analysis_data": analysis_data,
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def write_chat_rows(db: AsyncSession, chat_rows: List[dict], message_rows: List[dict]) -> None:
+    """
+    Insert new chats and messages and bump the chat counters.
+
+    Uses multi-row INSERTs (one per table) and one executemany UPDATE for the
+    counters of pre-existing chats, adds AI messages' skill gaps to the
+    trend rollups and bumps the owners' chats_version. Does not commit - the
+    caller owns the transaction.
+    """
+    counters: dict[uuid.UUID, list] = {}
+    for row in message_rows:
+        count_and_last = counters.setdefault(row["chat_id"], [0, row["created_at"]])
+        count_and_last[0] += 1
+        count_and_last[1] = max(count_and_last[1], row["created_at"])
+
+    has_counters = await chat_counters_available(db)
+    if chat_rows:
+        if has_counters:
+            # New chats are inserted with their final counts instead of being updated
+            chat_rows = [dict(row) for row in chat_rows]
+            for row in chat_rows:
+                count, last_message_at = counters.pop(row["chat_id"], (0, None))
+                row["message_count"] = count
+                row["last_message_at"] = last_message_at
+        await db.execute(insert(Chat), chat_rows)
+    if message_rows:
+        await db.execute(insert(Message), message_rows)
+        await record_skill_gaps(db, message_rows, {row["chat_id"]: row["user_id"] for row in chat_rows})
+
+    if has_counters and counters:
+        await db.execute(
+            update(Chat.__table__)
+            .where(Chat.__table__.c.chat_id == bindparam("counter_chat_id"))
+            .values(
+                message_count=Chat.__table__.c.message_count + bindparam("counter_count"),
+                last_message_at=bindparam("counter_last_message_at")
+            ),
+            [
+                {"counter_chat_id": chat_id, "counter_count": count, "counter_last_message_at": last}
+                for chat_id, (count, last) in counters.items()
+            ]
+        )
+
+    # New chats' owners are known; those of pre-existing chats are looked up
+    new_chats = {row["chat_id"]: row["user_id"] for row in chat_rows}
+    await bump_chats_version(
+        db,
+        user_ids=new_chats.values(),
+        chat_ids={row["chat_id"] for row in message_rows} - new_chats.keys()
+    )
+
+
+class ChatWriteBehind:
+    """
+    Coalesces chat/message inserts from concurrent requests.
+
+    Requests hand their rows to submit() and wait; a background task flushes
+    everything queued every ``flush_interval`` seconds (or as soon as
+    ``max_batch`` rows are waiting) with multi-row INSERTs in a single
+    transaction, so N concurrent turns cost one commit instead of N.
+    submit() returns once the batch is committed, so writes stay durable
+    before the response is sent; the trade-off is up to one flush interval
+    of added latency. If the batch fails (e.g. a chat was deleted before
+    the flush), each turn is retried in its own transaction and only the
+    turns that fail again see the error.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, flush_interval: float, max_batch: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: List[tuple[List[dict], List[dict], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def submit(self, chat_rows: List[dict], message_rows: List[dict]) -> None:
+        """Queue rows for the next flush and wait until they are committed."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((chat_rows, message_rows, future))
+        self._pending_rows += len(chat_rows) + len(message_rows)
+        if self._pending_rows >= self.max_batch:
+            self._wakeup.set()
+        await future
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write everything queued so far in one transaction (per turn if that fails)."""
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if not batch:
+            return
+        chat_rows = [row for rows, _, _ in batch for row in rows]
+        message_rows = [row for _, rows, _ in batch for row in rows]
+        try:
+            await self._write(chat_rows, message_rows)
+        except Exception as exc:
+            if len(batch) == 1:
+                logger.exception("Write-behind flush of %d messages failed", len(message_rows))
+                _resolve(batch, exc)
+                return
+            logger.warning(
+                "Write-behind flush of %d turns failed (%s), writing them one by one", len(batch), exc
+            )
+            await self._write_each(batch)
+        else:
+            _resolve(batch, None)
+
+    async def _write(self, chat_rows: List[dict], message_rows: List[dict]) -> None:
+        async with self.session_factory() as db:
+            await write_chat_rows(db, chat_rows, message_rows)
+            await db.commit()
+
+    async def _write_each(self, batch: List[tuple[List[dict], List[dict], asyncio.Future]]) -> None:
+        """Write each turn in its own transaction, failing only the turns that fail."""
+        for entry in batch:
+            chat_rows, message_rows, _ = entry
+            try:
+                await self._write(chat_rows, message_rows)
+            except Exception as exc:
+                logger.exception("Write-behind write of %d messages failed", len(message_rows))
+                _resolve([entry], exc)
+            else:
+                _resolve([entry], None)
+
+    async def stop(self) -> None:
+        """Flush whatever is still queued and stop the background task."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+def _resolve(batch: Iterable[tuple[List[dict], List[dict], asyncio.Future]], exc: Optional[Exception]) -> None:
+    for _, _, future in batch:
+        if future.done():
+            continue
+        if exc is None:
+            future.set_result(None)
+        else:
+            future.set_exception(exc)
+
+
+# Used by POST /chat/chat when CHAT_WRITE_BEHIND_ENABLED is set
+chat_write_behind = ChatWriteBehind(
+    AsyncSessionLocal,
+    flush_interval=settings.CHAT_WRITE_BEHIND_FLUSH_MS / 1000,
+    max_batch=settings.CHAT_WRITE_BEHIND_MAX_BATCH
+)
@@ -0,0 +1,247 @@
+"""
+Backfill of the legacy chat_messages table into chats/messages, and the
+compatibility projection GET /chat/chat-history is served from afterwards.
+
+chat_messages is read in keyset order (user_id, created_at, message_id)
+through ix_chat_messages_user_created, one batch per transaction. A user's
+consecutive messages form one synthetic chat session until a gap longer
+than session_gap; the session still open at the end of a batch is recorded
+in the checkpoint and continued by the next batch. Each batch writes its
+chats, its messages (COPY on PostgreSQL, executemany on SQLite), the skill
+gap rollups and the checkpoint in one transaction, so an interrupted run
+resumes exactly after the last committed batch.
+
+Legacy message ids are kept, and chat ids are derived from the first
+message of each session (uuid5), so copied rows can be traced back.
+"""
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from sqlalchemy import insert, inspect, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.chat_store import bump_chats_version, chat_counters_available
+from app.db.models import BackfillCheckpoint, Chat, ChatMessage, Message
+from app.db.skill_gap_store import record_skill_gaps
+from app.db.summary_store import summary_columns_available
+
+BACKFILL_NAME = "legacy_chat_messages"
+
+CHAT_ID_NAMESPACE = uuid.UUID("5b0c8f1e-3d7a-4c1b-9a53-2f6e8d4b7c10")
+LEGACY_CHAT_METADATA = {"channel": "legacy", "topic": "career_guidance"}
+
+# Legacy rows without a timestamp are dated here, i.e. sort as the oldest
+MISSING_TIMESTAMP = datetime(1970, 1, 1)
+
+MESSAGE_COLUMNS = ("message_id", "chat_id", "sender", "content", "created_at", "analysis_data")
+
+# Until the backfill is complete, how often request paths re-check it
+HISTORY_RECHECK_SECONDS = 60
+
+
+async def fill_missing_timestamps(db: AsyncSession) -> int:
+    """Date legacy rows without created_at (keyset pagination needs a value). Returns the rows updated."""
+    result = await db.execute(
+        update(ChatMessage).where(ChatMessage.created_at.is_(None)).values(created_at=MISSING_TIMESTAMP)
+    )
+    return result.rowcount
+
+
+async def load_checkpoint(db: AsyncSession) -> BackfillCheckpoint:
+    """The backfill's checkpoint, created (not committed) on the first run."""
+    checkpoint = await db.get(BackfillCheckpoint, BACKFILL_NAME)
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(name=BACKFILL_NAME, rows_copied=0, chats_created=0)
+        db.add(checkpoint)
+    return checkpoint
+
+
+async def _insert_messages(db: AsyncSession, rows: List[dict[str, Any]]) -> None:
+    if db.bind.dialect.name != "postgresql":
+        await db.execute(insert(Message), rows)
+        return
+    # COPY on the session's own connection, so it is part of the batch
+    # transaction (already begun by the batch's SELECT)
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        Message.__tablename__,
+        columns=MESSAGE_COLUMNS,
+        records=[
+            (
+                row["message_id"], row["chat_id"], row["sender"], row["content"], row["created_at"],
+                None if row["analysis_data"] is None else json.dumps(row["analysis_data"])
+            )
+            for row in rows
+        ]
+    )
+
+
+async def copy_batch(
+    db: AsyncSession,
+    checkpoint: BackfillCheckpoint,
+    batch_size: int,
+    session_gap: timedelta,
+    summarize: bool = False
+) -> int:
+    """
+    Copy the next batch of legacy messages and advance the checkpoint (no commit).
+
+    Args:
+        checkpoint: From load_checkpoint, in the same session
+        session_gap: Longest pause between two messages of the same session
+        summarize: Leave the new chats to the background summarizer; by
+            default they are marked as summarized, so a large backfill does
+            not queue a summary for every old session
+
+    Returns:
+        How many messages were copied (fewer than batch_size on the last batch)
+    """
+    position = checkpoint.position
+    query = select(
+        ChatMessage.message_id, ChatMessage.user_id, ChatMessage.sender,
+        ChatMessage.content, ChatMessage.created_at, ChatMessage.analysis_data
+    )
+    if position is not None:
+        query = query.where(
+            tuple_(ChatMessage.user_id, ChatMessage.created_at, ChatMessage.message_id) > tuple_(
+                uuid.UUID(position["user_id"]),
+                datetime.fromisoformat(position["created_at"]),
+                uuid.UUID(position["message_id"])
+            )
+        )
+    rows = (await db.execute(
+        query.order_by(ChatMessage.user_id, ChatMessage.created_at, ChatMessage.message_id).limit(batch_size)
+    )).all()
+    if not rows:
+        return 0
+
+    # Session bookkeeping: chat_id -> [user_id, message count, first, last created_at]
+    sessions: dict[uuid.UUID, list] = {}
+    open_chat: Optional[uuid.UUID] = None
+    open_user: Optional[uuid.UUID] = None
+    last_at: Optional[datetime] = None
+    if position is not None:
+        open_chat = uuid.UUID(position["chat_id"])
+        open_user = uuid.UUID(position["user_id"])
+        last_at = datetime.fromisoformat(position["created_at"])
+
+    message_rows = []
+    for row in rows:
+        if open_chat is None or row.user_id != open_user or row.created_at - last_at > session_gap:
+            open_chat = uuid.uuid5(CHAT_ID_NAMESPACE, str(row.message_id))
+            open_user = row.user_id
+        session = sessions.setdefault(open_chat, [open_user, 0, row.created_at, row.created_at])
+        session[1] += 1
+        session[3] = row.created_at
+        last_at = row.created_at
+        message_rows.append({
+            "message_id": row.message_id,
+            "chat_id": open_chat,
+            "sender": row.sender.value,
+            "content": row.content,
+            "created_at": row.created_at,
+            "analysis_data": row.analysis_data,
+        })
+
+    has_counters = await chat_counters_available(db)
+    has_summary_columns = has_counters and not summarize and await summary_columns_available(db)
+    continued = uuid.UUID(position["chat_id"]) if position is not None else None
+
+    chat_rows = []
+    for chat_id, (user_id, count, first, last) in sessions.items():
+        if chat_id == continued:
+            continue
+        chat_row = {
+            "chat_id": chat_id, "user_id": user_id, "started_at": first, "ended_at": last,
+            "chat_metadata": LEGACY_CHAT_METADATA,
+        }
+        if has_counters:
+            chat_row.update(message_count=count, last_message_at=last)
+        if has_summary_columns:
+            chat_row["summary_message_count"] = count
+        chat_rows.append(chat_row)
+    if chat_rows:
+        await db.execute(insert(Chat), chat_rows)
+
+    if continued in sessions:
+        # The session left open by the previous batch goes on
+        _, count, _, last = sessions[continued]
+        table = Chat.__table__
+        values = {"ended_at": last}
+        if has_counters:
+            values.update(message_count=table.c.message_count + count, last_message_at=last)
+        if has_summary_columns:
+            values["summary_message_count"] = table.c.summary_message_count + count
+        await db.execute(update(table).where(table.c.chat_id == continued).values(values))
+
+    await _insert_messages(db, message_rows)
+    await record_skill_gaps(db, message_rows, {chat_id: session[0] for chat_id, session in sessions.items()})
+    await bump_chats_version(db, user_ids={session[0] for session in sessions.values()})
+
+    last_row = rows[-1]
+    checkpoint.position = {
+        "user_id": str(last_row.user_id),
+        "created_at": last_row.created_at.isoformat(),
+        "message_id": str(last_row.message_id),
+        "chat_id": str(message_rows[-1]["chat_id"]),
+    }
+    checkpoint.rows_copied += len(rows)
+    checkpoint.chats_created += len(chat_rows)
+    checkpoint.updated_at = datetime.utcnow()
+    if len(rows) < batch_size:
+        checkpoint.completed_at = checkpoint.updated_at
+    return len(rows)
+
+
+# Set once the backfill is known to be complete; until then re-checked
+# every HISTORY_RECHECK_SECONDS
+_history_from_chats = False
+_history_checked_at = 0.0
+
+
+async def history_served_from_chats(db: AsyncSession) -> bool:
+    """Whether legacy history comes from chats/messages: the backfill is complete, or chat_messages is gone."""
+    global _history_from_chats, _history_checked_at
+    if _history_from_chats or time.monotonic() - _history_checked_at < HISTORY_RECHECK_SECONDS:
+        return _history_from_chats
+    _history_checked_at = time.monotonic()
+
+    connection = await db.connection()
+    tables = await connection.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+    if ChatMessage.__tablename__ not in tables:
+        _history_from_chats = True
+    elif BackfillCheckpoint.__tablename__ in tables:
+        completed_at = await db.scalar(
+            select(BackfillCheckpoint.completed_at).where(BackfillCheckpoint.name == BACKFILL_NAME)
+        )
+        _history_from_chats = completed_at is not None
+    return _history_from_chats
+
+
+async def chat_history(db: AsyncSession, user_id: uuid.UUID, limit: int) -> List[dict[str, Any]]:
+    """
+    The user's latest messages across all chats, newest first, in the legacy
+    chat_messages shape (ChatMessageRead).
+    """
+    chats = select(Chat.chat_id).where(Chat.user_id == user_id)
+    if await chat_counters_available(db):
+        # The newest `limit` messages can only be in the `limit` most recently active chats
+        chats = chats.where(Chat.last_message_at.isnot(None)).order_by(Chat.last_message_at.desc()).limit(limit)
+    result = await db.execute(
+        select(Message.content, Message.message_id, Message.sender, Message.created_at, Message.analysis_data)
+        .where(Message.chat_id.in_(chats.scalar_subquery()))
+        .order_by(Message.created_at.desc(), Message.message_id.desc())
+        .limit(limit)
+    )
+    # Keys in ChatMessageRead field order
+    return [
+        {
+            "content": content, "message_id": message_id, "user_id": user_id,
+            "sender": sender, "created_at": created_at, "analysis_data": analysis_data,
+        }
+        for content, message_id, sender, created_at, analysis_data in result
+    ]
@@ -1,10 +1,24 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, Date, DateTime, Integer, Text, ForeignKey, Enum, CheckConstraint, JSON, Uuid, LargeBinary
+from sqlalchemy import event, inspect, text, DDL, FetchedValue, Index
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 from app.db.base import Base
+from app.core.cache import user_cache
+
+
+# JSONB on PostgreSQL, plain JSON on SQLite (local development and tests).
+# Uuid renders as native UUID on PostgreSQL and CHAR(32) on SQLite.
+JSONB = JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+# Messages whose analysis_data has at least one skill gap, per dialect (the
+# predicate of ix_messages_skill_gaps; queries must repeat it verbatim to use it)
+SKILL_GAPS_PRESENT = {
+    "postgresql": "(analysis_data -> 'skill_gaps' -> 0) IS NOT NULL",
+    "sqlite": "json_extract(analysis_data, '$.skill_gaps[0]') IS NOT NULL",
+}
 
 
 class MessageSender(str, enum.Enum):
@@ -19,7 +33,7 @@ class User(Base):
     """
     __tablename__ = "users"
     
-    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=True)
@@ -27,13 +41,32 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Bumped whenever one of the user's chats is created, gets messages, is
+    # summarized or is deleted (alembic revision 0010); the version behind the
+    # ETag of GET /chat/chats. Deferred and server-defaulted like the chat counters.
+    chats_version = deferred(Column(Integer, nullable=False, server_default="0"))
+    
     # Relationships
     chats = relationship("Chat", back_populates="user", cascade="all, delete-orphan")
     
+    # Don't fetch chats_version via RETURNING on insert (it may not exist yet)
+    __mapper_args__ = {"eager_defaults": False}
+    
     def __repr__(self):
         return f"<User {self.email}>"
 
 
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    """
+    Drop the cached copy of a user as soon as it is updated or deleted
+    (e.g. deactivated), including under its previous email.
+    """
+    for email in {target.email, *inspect(target).attrs.email.history.deleted}:
+        user_cache.invalidate(email)
+
+
 class Chat(Base):
     """
     Chat session model for storing conversation sessions.
@@ -41,14 +74,25 @@ class Chat(Base):
     """
     __tablename__ = "chats"
     
-    chat_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    chat_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     ended_at = Column(DateTime, nullable=True)
     
     # AI-generated summary of the conversation
     context_summary = Column(Text, nullable=True)
     
+    # Denormalized counters, maintained in the same transaction that inserts messages
+    # (alembic revision 0002). Deferred and server-defaulted so the model keeps working
+    # against a database that has not been migrated yet.
+    message_count = deferred(Column(Integer, nullable=False, server_default="0"))
+    last_message_at = deferred(Column(DateTime, nullable=True, server_default=FetchedValue()))
+    
+    # How many messages context_summary covers, maintained by the background
+    # summarizer (alembic revision 0006; see app.services.summaries)
+    summary_message_count = deferred(Column(Integer, nullable=False, server_default="0"))
+    summary_updated_at = deferred(Column(DateTime, nullable=True, server_default=FetchedValue()))
+    
     # JSONB column for storing extra metadata
     # Example: {"topic": "career advice", "intent": "skill gap analysis", "channel": "web"}
     # Note: using 'chat_metadata' instead of 'metadata' to avoid SQLAlchemy reserved name
@@ -58,6 +102,21 @@ class Chat(Base):
     user = relationship("User", back_populates="chats")
     messages = relationship("Message", back_populates="chat", cascade="all, delete-orphan", order_by="Message.created_at")
     
+    # Don't fetch server defaults via RETURNING on insert (the counter columns
+    # may not exist yet, and are deferred anyway)
+    __mapper_args__ = {"eager_defaults": False}
+    
+    __table_args__ = (
+        # Keyset pagination of a user's chats, newest first
+        Index("ix_chats_user_started", "user_id", "started_at", "chat_id"),
+        # Chats with messages not yet covered by context_summary (partial - stays small)
+        Index(
+            "ix_chats_summary_pending", "last_message_at",
+            postgresql_where=text("message_count > summary_message_count"),
+            sqlite_where=text("message_count > summary_message_count")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Chat {self.chat_id} - User {self.user_id}>"
 
@@ -68,8 +127,8 @@ class Message(Base):
     """
     __tablename__ = "messages"
     
-    message_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    chat_id = Column(UUID(as_uuid=True), ForeignKey("chats.chat_id", ondelete="CASCADE"), nullable=False)
+    message_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    chat_id = Column(Uuid, ForeignKey("chats.chat_id", ondelete="CASCADE"), nullable=False)
     sender = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -84,12 +143,69 @@ class Message(Base):
     # Add constraint to ensure sender is either 'USER' or 'AI'
     __table_args__ = (
         CheckConstraint("sender IN ('USER', 'AI')", name='check_sender_type'),
+        # Keyset pagination of a chat's transcript
+        Index("ix_messages_chat_created", "chat_id", "created_at", "message_id"),
+        # A chat's messages with skill gaps (partial - only those are indexed)
+        Index(
+            "ix_messages_skill_gaps", "chat_id", "created_at",
+            postgresql_where=text(SKILL_GAPS_PRESENT["postgresql"]),
+            sqlite_where=text(SKILL_GAPS_PRESENT["sqlite"])
+        ),
+        # Containment queries over analysis data (e.g. analysis_data @> '{"skill_gaps": [{}]}')
+        Index(
+            "ix_messages_analysis_data", "analysis_data",
+            postgresql_using="gin", postgresql_ops={"analysis_data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
     )
     
     def __repr__(self):
         return f"<Message {self.message_id} from {self.sender}>"
 
 
+# Full-text search over message content (alembic revision 0007; queried by
+# app.db.search_store). PostgreSQL keeps a generated tsvector column with a GIN
+# index, SQLite an FTS5 table kept in sync by triggers. Neither
+# is mapped, as each only exists on its own dialect; the DDL below also runs
+# on create_all().
+MESSAGE_SEARCH_CONFIG = "english"
+
+MESSAGE_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE messages ADD COLUMN content_tsv tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{MESSAGE_SEARCH_CONFIG}', content)) STORED",
+        "CREATE INDEX ix_messages_content_tsv ON messages USING GIN (content_tsv)",
+    ],
+    "sqlite": [
+        # The FTS5 table indexes each message's content plus an "owner" token
+        # (the user id), so scoping to a user intersects a short posting list
+        # instead of filtering every match for the term; the view supplies
+        # both columns for snippet() and rebuilds.
+        "CREATE VIEW messages_search AS SELECT messages.rowid AS rowid, messages.content AS content, "
+        "'u' || chats.user_id AS owner FROM messages JOIN chats ON chats.chat_id = messages.chat_id",
+        "CREATE VIRTUAL TABLE messages_fts USING fts5("
+        "content, owner, content='messages_search', content_rowid='rowid', tokenize='porter unicode61')",
+        "CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN "
+        "INSERT INTO messages_fts(rowid, content, owner) "
+        "SELECT new.rowid, new.content, 'u' || user_id FROM chats WHERE chat_id = new.chat_id; END",
+        "CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content, owner) "
+        "SELECT 'delete', old.rowid, old.content, 'u' || user_id FROM chats WHERE chat_id = old.chat_id; END",
+        "CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content, owner) "
+        "SELECT 'delete', old.rowid, old.content, 'u' || user_id FROM chats WHERE chat_id = old.chat_id; "
+        "INSERT INTO messages_fts(rowid, content, owner) "
+        "SELECT new.rowid, new.content, 'u' || user_id FROM chats WHERE chat_id = new.chat_id; END",
+    ],
+}
+
+for _dialect, _statements in MESSAGE_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Message.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+# The triggers go with the messages table; the FTS5 table and view have to be dropped explicitly
+for _statement in ("DROP TABLE IF EXISTS messages_fts", "DROP VIEW IF EXISTS messages_search"):
+    event.listen(Message.__table__, "after_drop", DDL(_statement).execute_if(dialect="sqlite"))
+
+
 # Legacy model - kept for backward compatibility, will be deprecated
 class ChatMessage(Base):
     """
@@ -98,12 +214,130 @@ class ChatMessage(Base):
     """
     __tablename__ = "chat_messages"
     
-    message_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    message_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     sender = Column(Enum(MessageSender), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     analysis_data = Column(JSONB, nullable=True)
     
+    __table_args__ = (
+        # Keyset order of the backfill into chats/messages (app.db.legacy_chats)
+        Index("ix_chat_messages_user_created", "user_id", "created_at", "message_id"),
+    )
+    
     def __repr__(self):
         return f"<ChatMessage {self.message_id} from {self.sender}>"
+
+
+class BackfillCheckpoint(Base):
+    """
+    Progress of a resumable data backfill, saved in the transaction of each
+    batch so an interrupted run resumes exactly where it stopped.
+    """
+    __tablename__ = "backfill_checkpoints"
+    
+    name = Column(String(64), primary_key=True)
+    position = Column(JSONB, nullable=True)
+    rows_copied = Column(Integer, nullable=False, default=0)
+    chats_created = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<BackfillCheckpoint {self.name} ({self.rows_copied} rows)>"
+
+
+class ResumeAnalysis(Base):
+    """
+    Resume analysis results, keyed by the SHA-256 of the uploaded content
+    and the analyzer version (see app.db.analysis_store).
+    """
+    __tablename__ = "resume_analyses"
+    
+    content_hash = Column(String(64), primary_key=True)
+    analyzer_version = Column(String(32), primary_key=True)
+    result = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ResumeAnalysis {self.content_hash[:12]} v{self.analyzer_version}>"
+
+
+class SkillGapRollup(Base):
+    """
+    Per-user daily totals of the skill gaps in AI messages' analysis_data
+    (see app.db.skill_gap_store), maintained in the transaction that writes
+    the messages so trends never rescan the JSON.
+    """
+    __tablename__ = "skill_gap_rollups"
+    
+    user_id = Column(Uuid, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    samples = Column(Integer, nullable=False)
+    current_level_sum = Column(Integer, nullable=False)
+    target_level_sum = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<SkillGapRollup {self.user_id} {self.skill} {self.day}>"
+
+
+class ResumeBatchJob(Base):
+    """
+    A batch of resumes submitted together (see app.services.resume_batch).
+    
+    Progress counters are bumped as each item finishes, so polling a job is a
+    single-row read.
+    """
+    __tablename__ = "resume_batch_jobs"
+    
+    job_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    total_items = Column(Integer, nullable=False)
+    completed_items = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_items = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ResumeBatchJob {self.job_id} ({self.completed_items + self.failed_items}/{self.total_items})>"
+
+
+class ResumeBatchItem(Base):
+    """
+    One resume in a batch job.
+    
+    The uploaded content is kept until the item is processed, so queued work
+    survives a worker restart. Results live in resume_analyses under
+    (content_hash, analyzer_version).
+    """
+    __tablename__ = "resume_batch_items"
+    
+    item_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    job_id = Column(Uuid, ForeignKey("resume_batch_jobs.job_id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    size = Column(Integer, nullable=False)
+    content = deferred(Column(LargeBinary, nullable=True))
+    content_hash = Column(String(64), nullable=False)
+    analyzer_version = Column(String(32), nullable=True)
+    status = Column(String(16), nullable=False, default="queued", server_default="queued")
+    error = Column(Text, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # 1, 2, ... in the order items of the job finished (commit order)
+    finish_seq = Column(Integer, nullable=True)
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'done', 'failed')", name='check_batch_item_status'),
+        # Claiming queued (and stale running) items
+        Index("ix_resume_batch_items_status_claimed", "status", "claimed_at"),
+        # Paging a job's finished items in completion order
+        Index("ix_resume_batch_items_job_seq", "job_id", "finish_seq"),
+    )
+    
+    def __repr__(self):
+        return f"<ResumeBatchItem {self.item_id} {self.status}>"
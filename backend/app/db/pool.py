@@ -0,0 +1,95 @@
+"""
+Connection pools that measure how long checkouts wait.
+
+When every pooled connection is busy, a request blocks in checkout (up to
+pool_timeout) before it runs a single query. TimedQueuePool and
+TimedAsyncAdaptedQueuePool report each checkout's wait to
+pool_checkout_monitor, which admission control (app.core.admission) uses to
+shed load before requests pile up on the pool.
+"""
+import threading
+import time
+from typing import Callable, List
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolCheckoutMonitor:
+    """
+    Recent connection checkout wait, shared by the process's engines.
+
+    An exponentially weighted average of completed checkouts that decays
+    with time (so it recovers while load is being shed and few checkouts
+    happen), or the age of the oldest checkout still waiting if that is
+    longer. Thread-safe: sync routes check out from the threadpool.
+
+    Listeners (e.g. a metrics histogram's observe) are called with the wait
+    of every finished checkout.
+    """
+
+    def __init__(self, weight: float = 0.2, half_life: float = 2.0):
+        self.weight = weight
+        self.half_life = half_life
+        self._average = 0.0
+        self._updated_at = time.monotonic()
+        self._waiting: dict[int, float] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self.listeners: List[Callable[[float], None]] = []
+
+    def _decayed(self, now: float) -> float:
+        return self._average * 0.5 ** ((now - self._updated_at) / self.half_life)
+
+    def start(self) -> int:
+        """Record a checkout that is about to wait; returns a token for finish()."""
+        with self._lock:
+            self._next_token += 1
+            self._waiting[self._next_token] = time.monotonic()
+            return self._next_token
+
+    def finish(self, token: int) -> float:
+        """Record the end of a checkout (connection obtained or timed out); returns its wait."""
+        now = time.monotonic()
+        with self._lock:
+            waited = now - self._waiting.pop(token, now)
+            self._average = self._decayed(now) * (1 - self.weight) + waited * self.weight
+            self._updated_at = now
+        for listener in self.listeners:
+            listener(waited)
+        return waited
+
+    def wait_seconds(self) -> float:
+        """Current checkout wait estimate in seconds."""
+        now = time.monotonic()
+        with self._lock:
+            oldest = min(self._waiting.values(), default=now)
+            return max(self._decayed(now), now - oldest)
+
+    def waiting(self) -> int:
+        """Checkouts currently waiting for a connection."""
+        with self._lock:
+            return len(self._waiting)
+
+
+pool_checkout_monitor = PoolCheckoutMonitor()
+
+
+class _TimedCheckout:
+    # QueuePool._do_get is where a checkout waits for a free connection
+    # (or opens a new one within max_overflow)
+    monitor = pool_checkout_monitor
+
+    def _do_get(self):
+        token = self.monitor.start()
+        try:
+            return super()._do_get()
+        finally:
+            self.monitor.finish(token)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool reporting checkout waits to pool_checkout_monitor."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool reporting checkout waits to pool_checkout_monitor."""
@@ -0,0 +1,176 @@
+"""
+Persistence for batch resume analysis jobs.
+
+Items move queued -> running -> done/failed. A worker claims the oldest
+job's next item with a conditional UPDATE (only one claimer wins, also
+across processes), and an item left running by a worker that died is
+claimed again once its claim is older than RESUME_BATCH_CLAIM_TIMEOUT_SECONDS.
+
+Finished items are numbered 1, 2, ... per job (finish_seq) from the job's
+counters, in the same transaction that bumps them: the job row stays locked
+until that transaction commits, so the numbers follow commit order and a
+reader paging by finish_seq never skips an item that commits late.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import ResumeBatchItem, ResumeBatchJob
+
+
+async def create_job(db: AsyncSession, user_id: uuid.UUID, total_items: int) -> uuid.UUID:
+    """Insert a job row (committed by the caller) and return its id."""
+    job_id = uuid.uuid4()
+    now = datetime.utcnow()
+    await db.execute(insert(ResumeBatchJob).values(
+        job_id=job_id,
+        user_id=user_id,
+        total_items=total_items,
+        completed_items=0,
+        failed_items=0,
+        created_at=now,
+        updated_at=now
+    ))
+    return job_id
+
+
+async def add_item(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    position: int,
+    filename: Optional[str],
+    content_type: Optional[str],
+    size: int,
+    content: Optional[bytes],
+    content_hash: str,
+    analyzer_version: Optional[str] = None,
+    finish_seq: Optional[int] = None
+) -> None:
+    """
+    Queue one file of a job (committed by the caller).
+
+    With analyzer_version set, the analysis is already stored and the item
+    is recorded as done without content, as the job's
+    finish_seq-th finished item (the caller counts them into
+    completed_items).
+    """
+    values = {
+        "item_id": uuid.uuid4(),
+        "job_id": job_id,
+        "position": position,
+        "filename": filename,
+        "content_type": content_type,
+        "size": size,
+        "content_hash": content_hash,
+    }
+    if analyzer_version is None:
+        values.update(content=content, status="queued")
+    else:
+        values.update(
+            analyzer_version=analyzer_version, status="done", finished_at=datetime.utcnow(), finish_seq=finish_seq
+        )
+    await db.execute(insert(ResumeBatchItem).values(**values))
+
+
+async def claim_item(db: AsyncSession, claim_timeout: float) -> Optional[Tuple[uuid.UUID, datetime]]:
+    """
+    Claim the next queued (or stale running) item and commit the claim.
+
+    Returns:
+        (item_id, claimed_at) - the claim token passed to finish_item - or
+        None when there is nothing to do
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=claim_timeout)
+    claimable = or_(
+        ResumeBatchItem.status == "queued",
+        and_(ResumeBatchItem.status == "running", ResumeBatchItem.claimed_at < stale_before)
+    )
+    # A few candidates, so workers racing for the same item can fall through
+    # to the next; oldest job first, then file order, so no job starves
+    # behind later ones
+    candidates = (await db.execute(
+        select(ResumeBatchItem.item_id)
+        .join(ResumeBatchJob, ResumeBatchJob.job_id == ResumeBatchItem.job_id)
+        .where(claimable)
+        .order_by(ResumeBatchJob.created_at, ResumeBatchJob.job_id, ResumeBatchItem.position)
+        .limit(8)
+    )).scalars().all()
+
+    for item_id in candidates:
+        claimed_at = datetime.utcnow()
+        result = await db.execute(
+            update(ResumeBatchItem)
+            .where(ResumeBatchItem.item_id == item_id, claimable)
+            .values(status="running", claimed_at=claimed_at)
+        )
+        if result.rowcount == 1:
+            await db.commit()
+            return item_id, claimed_at
+    await db.rollback()
+    return None
+
+
+async def finish_item(
+    db: AsyncSession,
+    item_id: uuid.UUID,
+    claimed_at: datetime,
+    analyzer_version: str,
+    error: Optional[str] = None
+) -> bool:
+    """
+    Record an item's outcome and bump its job's counters (committed by the caller).
+
+    The update only applies while the claim is still ours - if the item was
+    reclaimed as stale in the meantime, the other worker records it instead.
+    The item's finish_seq is the job's processed count after the bump.
+
+    Returns:
+        Whether the outcome was recorded
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(ResumeBatchItem)
+        .where(
+            ResumeBatchItem.item_id == item_id,
+            ResumeBatchItem.status == "running",
+            ResumeBatchItem.claimed_at == claimed_at
+        )
+        .values(
+            status="failed" if error else "done",
+            error=error,
+            analyzer_version=analyzer_version,
+            finished_at=now,
+            content=None
+        )
+        .returning(ResumeBatchItem.job_id)
+    )
+    job_id = result.scalar_one_or_none()
+    if job_id is None:
+        return False
+    counter = ResumeBatchJob.failed_items if error else ResumeBatchJob.completed_items
+    finish_seq = (await db.execute(
+        update(ResumeBatchJob)
+        .where(ResumeBatchJob.job_id == job_id)
+        .values({counter: counter + 1, ResumeBatchJob.updated_at: now})
+        .returning(ResumeBatchJob.completed_items + ResumeBatchJob.failed_items)
+    )).scalar_one()
+    await db.execute(
+        update(ResumeBatchItem).where(ResumeBatchItem.item_id == item_id).values(finish_seq=finish_seq)
+    )
+    return True
+
+
+async def release_item(db: AsyncSession, item_id: uuid.UUID, claimed_at: datetime) -> None:
+    """Put a claimed item back in the queue (committed by the caller)."""
+    await db.execute(
+        update(ResumeBatchItem)
+        .where(
+            ResumeBatchItem.item_id == item_id,
+            ResumeBatchItem.status == "running",
+            ResumeBatchItem.claimed_at == claimed_at
+        )
+        .values(status="queued", claimed_at=None)
+    )
@@ -0,0 +1,137 @@
+"""
+Full-text search over a user's chat messages.
+
+PostgreSQL matches against the generated messages.content_tsv column (GIN
+index) with websearch_to_tsquery, ranks with ts_rank_cd and highlights with
+ts_headline. SQLite uses the messages_fts FTS5 table with bm25 and
+snippet(). Both are created by alembic revision 0007 (and by create_all, see
+MESSAGE_SEARCH_DDL in app.db.models).
+
+Results are ordered by score (higher is better) then message_id, so pages
+are keyset-paginated on (score, message_id). Highlighted terms are marked
+with <mark></mark> in otherwise HTML-escaped snippets.
+"""
+import html
+import re
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column, or_, select, table, column
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.db.models import Chat, Message, MESSAGE_SEARCH_CONFIG
+
+# Private-use characters as highlight markers, swapped for <mark> tags after
+# the snippet has been HTML-escaped
+_START, _STOP = "\ue000", "\ue001"
+_ELLIPSIS = "…"
+
+# Approximate snippet length in words
+SNIPPET_WORDS = 16
+
+_TERM = re.compile(r"\w+")
+
+
+def has_search_terms(query: str) -> bool:
+    """Whether the query contains anything searchable (words, not just punctuation)."""
+    return _TERM.search(query) is not None
+
+
+def _fts5_query(user_id: uuid.UUID, query: str) -> str:
+    # Every term quoted, so user input never reaches FTS5 query syntax; terms
+    # are ANDed like websearch_to_tsquery does for plain words. The owner
+    # token (see MESSAGE_SEARCH_DDL) restricts matches to the user's messages.
+    terms = " ".join(f'"{term}"' for term in _TERM.findall(query))
+    return f'owner:"u{user_id.hex}" AND content:({terms})'
+
+
+def _postgres_search(user_id: uuid.UUID, query: str, limit: int, after: Optional[Tuple[float, uuid.UUID]]) -> Select:
+    config = literal_column(f"'{MESSAGE_SEARCH_CONFIG}'::regconfig")
+    tsquery = func.websearch_to_tsquery(config, query)
+    content_tsv = literal_column("messages.content_tsv")
+    score = func.ts_rank_cd(content_tsv, tsquery)
+
+    matches = (
+        select(
+            Message.message_id, Message.chat_id, Message.sender, Message.created_at,
+            Message.content, score.label("score")
+        )
+        .join(Chat, Chat.chat_id == Message.chat_id)
+        .where(Chat.user_id == user_id, content_tsv.op("@@")(tsquery))
+    )
+    if after is not None:
+        matches = matches.where(or_(score < after[0], and_(score == after[0], Message.message_id > after[1])))
+    matches = matches.order_by(score.desc(), Message.message_id).limit(limit).subquery()
+
+    # ts_headline re-parses the content, so only run it for the page's rows
+    options = (
+        f'StartSel="{_START}", StopSel="{_STOP}", FragmentDelimiter=" {_ELLIPSIS} ", '
+        f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=2"
+    )
+    return (
+        select(
+            matches.c.message_id, matches.c.chat_id, matches.c.sender, matches.c.created_at,
+            func.ts_headline(config, matches.c.content, tsquery, options).label("snippet"),
+            matches.c.score
+        )
+        .order_by(matches.c.score.desc(), matches.c.message_id)
+    )
+
+
+def _sqlite_search(user_id: uuid.UUID, query: str, limit: int, after: Optional[Tuple[float, uuid.UUID]]) -> Select:
+    fts = table("messages_fts", column("rowid"))
+    fts_table = literal_column("messages_fts")
+    # bm25() is lower-is-better; negate it so both dialects sort score
+    # descending. The owner column gets no weight.
+    score = -func.bm25(fts_table, 1.0, 0.0)
+
+    statement = (
+        select(
+            Message.message_id, Message.chat_id, Message.sender, Message.created_at,
+            func.snippet(fts_table, 0, _START, _STOP, _ELLIPSIS, SNIPPET_WORDS).label("snippet"),
+            score.label("score")
+        )
+        .select_from(fts)
+        .join(Message, literal_column("messages.rowid") == fts.c.rowid)
+        # Checked again on the (few) matches: the index is only as good as its triggers
+        .join(Chat, Chat.chat_id == Message.chat_id)
+        .where(fts_table.op("MATCH")(_fts5_query(user_id, query)), Chat.user_id == user_id)
+    )
+    if after is not None:
+        statement = statement.where(or_(score < after[0], and_(score == after[0], Message.message_id > after[1])))
+    return statement.order_by(score.desc(), Message.message_id).limit(limit)
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    return html.escape(snippet or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+async def search_messages(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    query: str,
+    limit: int,
+    after: Optional[Tuple[float, uuid.UUID]] = None
+) -> List[dict]:
+    """
+    Search the messages in the user's chats, best match first.
+
+    Args:
+        query: Search text; words are matched stemmed, and on PostgreSQL
+            websearch syntax ("quoted phrases", -excluded, or) is supported
+        limit: Maximum number of results
+        after: (score, message_id) of the last result of the previous page
+
+    Returns:
+        Dicts of message_id, chat_id, sender, created_at, snippet, score
+    """
+    if not has_search_terms(query):
+        return []
+    build = _postgres_search if db.bind.dialect.name == "postgresql" else _sqlite_search
+    rows: List[Row] = (await db.execute(build(user_id, query, limit, after))).all()
+    return [
+        {**row._mapping, "snippet": _highlight(row.snippet), "score": float(row.score)}
+        for row in rows
+    ]
@@ -1,23 +1,110 @@
-from sqlalchemy import create_engine
+import uuid
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.responses import orjson
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+
+
+def _serverless_engine_options(url: str) -> dict:
+    """
+    Pool options for the serverless profile: an instance serves few requests
+    and may be frozen between them, so it keeps at most
+    SERVERLESS_POOL_SIZE connections (none with NullPool) and leaves pooling
+    to an external pooler.
+    """
+    if settings.SERVERLESS_POOL_SIZE > 0:
+        options = {"pool_pre_ping": True, "pool_size": settings.SERVERLESS_POOL_SIZE, "max_overflow": 0}
+    else:
+        options = {"poolclass": NullPool}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    elif url.startswith("postgresql+asyncpg"):
+        # A transaction-mode pooler hands each transaction a different server
+        # connection, so asyncpg must not reuse named prepared statements
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+
+def _json_options() -> dict:
+    """Decode JSON columns (analysis_data, chat_metadata) with orjson when it is installed."""
+    if orjson is None:
+        return {}
+    return {"json_deserializer": orjson.loads}
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Connection pool options for the given database URL.
+
+    SQLite (used for local development and tests) has no server-side
+    connection limit, so the PostgreSQL pool sizing is not applied.
+    """
+    if settings.SERVERLESS:
+        return _serverless_engine_options(url)
+    # Queue pools that report checkout waits to admission control (app.db.pool)
+    poolclass = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+    if url.startswith("sqlite"):
+        if make_url(url).database in (None, "", ":memory:"):
+            return {"connect_args": {"check_same_thread": False}}
+        return {"connect_args": {"check_same_thread": False}, "poolclass": poolclass}
+    return {
+        "poolclass": poolclass,
+        "pool_pre_ping": True,  # Verify connections before using them
+        "pool_size": 10,        # Number of connections to keep open
+        "max_overflow": 20,     # Additional connections if pool is exhausted
+    }
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    """
+    Use WAL journaling on SQLite so concurrent requests don't fail with
+    "database is locked" (readers and the single writer no longer block each other).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=10,        # Number of connections to keep open
-    max_overflow=20      # Additional connections if pool is exhausted
-)
+
+# Create database engine (sync - used by sync routes such as registration/login)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL), **_json_options())
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async database engine (asyncpg for PostgreSQL, aiosqlite for SQLite)
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    **_engine_options(settings.get_async_database_url(), is_async=True),
+    **_json_options()
+)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _enable_sqlite_wal)
+    event.listen(async_engine.sync_engine, "connect", _enable_sqlite_wal)
+
+# Create async session factory.
+# expire_on_commit=False keeps loaded attributes usable after commit, since
+# async sessions cannot lazily refresh them.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def get_db():
     """
     Dependency function for FastAPI endpoints to get database session.
-    
+
     Usage:
         @app.get("/users/")
         def read_users(db: Session = Depends(get_db)):
@@ -28,3 +115,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function for async FastAPI endpoints to get an async database session.
+
+    Queries are awaited, so a slow query no longer blocks the event loop.
+
+    Usage:
+        @app.get("/users/")
+        async def read_users(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(User))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,303 @@
+"""
+Skill gap trends from the "skill_gaps" in AI messages' analysis_data.
+
+Each AI message with skill gaps adds, per skill, one sample with its current
+and target level to the user's skill_gap_rollups row for that day. The rows
+are upserted in the transaction that writes the messages (write_chat_rows)
+and decremented when a chat is deleted, so a trend query reads a few
+hundred small rows instead of every JSON blob the user has accumulated.
+Until alembic revision 0008 has been applied, trends are computed by
+scanning the messages instead.
+"""
+import math
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, inspect, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db.models import Chat, Message, MessageSender, SkillGapRollup, SKILL_GAPS_PRESENT
+
+GRANULARITIES = ("day", "week", "month")
+
+# (user_id, skill, day) -> [samples, current_level_sum, target_level_sum]
+Totals = dict[Tuple[uuid.UUID, str, date], List[int]]
+
+# A skill gap counts only if it is an object with a string "skill" and numeric
+# (JSON number, not boolean) "current_level" and "target_level"; fractional
+# levels are truncated toward zero. Older (e.g. backfilled legacy) analysis
+# data may not have this shape. _valid_gap and ROLLUP_REBUILD_SQL apply the
+# same rule, so a rebuild reproduces the incrementally maintained rollups.
+GAP_KEYS = ("skill", "current_level", "target_level")
+
+# Every user's rollups recomputed from the AI messages in one statement, per
+# dialect (alembic revision 0008 backfills with a frozen copy of an earlier
+# version). SQLite reads the gap fields through the element's path in the
+# message, which is NULL rather than an error for non-object elements.
+ROLLUP_REBUILD_SQL = {
+    "postgresql": """
+        INSERT INTO skill_gap_rollups (user_id, skill, day, samples, current_level_sum, target_level_sum)
+        SELECT chats.user_id, gap ->> 'skill', messages.created_at::date, count(*),
+               sum(trunc((gap ->> 'current_level')::numeric)::int),
+               sum(trunc((gap ->> 'target_level')::numeric)::int)
+        FROM messages
+        JOIN chats ON chats.chat_id = messages.chat_id
+        CROSS JOIN LATERAL jsonb_array_elements(messages.analysis_data -> 'skill_gaps') AS gap
+        WHERE messages.sender = 'AI' AND messages.analysis_data @> '{"skill_gaps": [{}]}'
+          AND jsonb_typeof(gap -> 'skill') = 'string'
+          AND jsonb_typeof(gap -> 'current_level') = 'number'
+          AND jsonb_typeof(gap -> 'target_level') = 'number'
+        GROUP BY 1, 2, 3
+    """,
+    "sqlite": """
+        INSERT INTO skill_gap_rollups (user_id, skill, day, samples, current_level_sum, target_level_sum)
+        SELECT chats.user_id, json_extract(messages.analysis_data, gap.fullkey || '.skill'),
+               date(messages.created_at), count(*),
+               sum(CAST(json_extract(messages.analysis_data, gap.fullkey || '.current_level') AS INTEGER)),
+               sum(CAST(json_extract(messages.analysis_data, gap.fullkey || '.target_level') AS INTEGER))
+        FROM messages
+        JOIN chats ON chats.chat_id = messages.chat_id
+        JOIN json_each(messages.analysis_data, '$.skill_gaps') AS gap
+        WHERE messages.sender = 'AI' AND json_extract(messages.analysis_data, '$.skill_gaps[0]') IS NOT NULL
+          AND json_type(messages.analysis_data, gap.fullkey || '.skill') = 'text'
+          AND json_type(messages.analysis_data, gap.fullkey || '.current_level') IN ('integer', 'real')
+          AND json_type(messages.analysis_data, gap.fullkey || '.target_level') IN ('integer', 'real')
+        GROUP BY 1, 2, 3
+    """,
+}
+
+# Whether the skill_gap_rollups table exists (alembic revision 0008).
+# Checked once per process; until then trends are computed from the messages.
+_rollups_available: Optional[bool] = None
+
+
+async def rollups_available(db: AsyncSession) -> bool:
+    """Check (once) whether the rollup table exists."""
+    global _rollups_available
+    if _rollups_available is None:
+        connection = await db.connection()
+        _rollups_available = await connection.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table(SkillGapRollup.__tablename__)
+        )
+    return _rollups_available
+
+
+async def rebuild_rollups(connection: AsyncConnection) -> bool:
+    """
+    Replace every rollup row with totals recomputed from the messages, in
+    SQL (no commit) - for bulk loads that bypass write_chat_rows.
+
+    Returns:
+        False (and nothing changed) on databases without a rebuild statement
+    """
+    statement = ROLLUP_REBUILD_SQL.get(connection.dialect.name)
+    if statement is None:
+        return False
+    await connection.execute(delete(SkillGapRollup))
+    await connection.execute(text(statement))
+    return True
+
+
+def _is_level(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _valid_gap(gap: Any) -> bool:
+    """Whether a skill_gaps element counts (see GAP_KEYS)."""
+    return (
+        isinstance(gap, dict) and set(GAP_KEYS) <= gap.keys() and isinstance(gap["skill"], str)
+        and _is_level(gap["current_level"]) and _is_level(gap["target_level"])
+    )
+
+
+def _skill_gaps(analysis_data: Any) -> List[dict[str, Any]]:
+    """The valid skill gaps in a message's analysis_data."""
+    gaps = analysis_data.get("skill_gaps") if isinstance(analysis_data, dict) else None
+    return [gap for gap in gaps if _valid_gap(gap)] if isinstance(gaps, list) else []
+
+
+def has_skill_gaps(message_row: dict[str, Any]) -> bool:
+    """Whether a message row (see new_message_row) contributes to the rollups."""
+    return message_row["sender"] == MessageSender.AI.value and bool(_skill_gaps(message_row.get("analysis_data")))
+
+
+def _add_totals(totals: Totals, user_id: uuid.UUID, created_at: datetime, skill_gaps: Iterable[dict[str, Any]]) -> None:
+    """Add valid gaps (from _skill_gaps) to the totals."""
+    day = created_at.date()
+    for gap in skill_gaps:
+        entry = totals.setdefault((user_id, gap["skill"], day), [0, 0, 0])
+        entry[0] += 1
+        entry[1] += int(gap["current_level"])
+        entry[2] += int(gap["target_level"])
+
+
+async def _chat_owners(db: AsyncSession, chat_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, uuid.UUID]:
+    result = await db.execute(select(Chat.chat_id, Chat.user_id).where(Chat.chat_id.in_(set(chat_ids))))
+    return {row.chat_id: row.user_id for row in result}
+
+
+async def record_skill_gaps(db: AsyncSession, message_rows: List[dict], chat_owners: dict[uuid.UUID, uuid.UUID]) -> None:
+    """
+    Add the skill gaps of new AI message rows to the rollups (no commit).
+
+    Args:
+        message_rows: Message rows being inserted; only AI rows with skill gaps count
+        chat_owners: user_id per chat_id where already known (e.g. new chats);
+            the owners of other chats are looked up
+    """
+    rows = [row for row in message_rows if has_skill_gaps(row)]
+    if not rows or not await rollups_available(db):
+        return
+    missing = {row["chat_id"] for row in rows} - chat_owners.keys()
+    if missing:
+        chat_owners = {**chat_owners, **await _chat_owners(db, missing)}
+
+    totals: Totals = {}
+    for row in rows:
+        _add_totals(totals, chat_owners[row["chat_id"]], row["created_at"], _skill_gaps(row["analysis_data"]))
+
+    # One row per key, so a single multi-row upsert never updates a row twice
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(SkillGapRollup).values([
+        {
+            "user_id": user_id, "skill": skill, "day": day,
+            "samples": samples, "current_level_sum": current_sum, "target_level_sum": target_sum,
+        }
+        for (user_id, skill, day), (samples, current_sum, target_sum) in totals.items()
+    ])
+    table = SkillGapRollup.__table__
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.skill, table.c.day],
+        set_={
+            "samples": table.c.samples + statement.excluded.samples,
+            "current_level_sum": table.c.current_level_sum + statement.excluded.current_level_sum,
+            "target_level_sum": table.c.target_level_sum + statement.excluded.target_level_sum,
+        }
+    ))
+
+
+def _scan_query(db: AsyncSession):
+    """AI messages with skill gaps, through the ix_messages_skill_gaps partial index."""
+    return (
+        select(Chat.user_id, Message.created_at, Message.analysis_data)
+        .join(Chat, Chat.chat_id == Message.chat_id)
+        .where(Message.sender == MessageSender.AI.value, text(SKILL_GAPS_PRESENT[db.bind.dialect.name]))
+    )
+
+
+async def remove_chat_skill_gaps(db: AsyncSession, chat_id: uuid.UUID) -> None:
+    """Subtract a chat's skill gaps from the rollups before the chat is deleted (no commit)."""
+    if not await rollups_available(db):
+        return
+    totals: Totals = {}
+    for row in await db.execute(_scan_query(db).where(Message.chat_id == chat_id)):
+        _add_totals(totals, row.user_id, row.created_at, _skill_gaps(row.analysis_data))
+    if not totals:
+        return
+
+    table = SkillGapRollup.__table__
+    await db.execute(
+        update(table)
+        .where(
+            table.c.user_id == bindparam("key_user_id"),
+            table.c.skill == bindparam("key_skill"),
+            table.c.day == bindparam("key_day")
+        )
+        .values(
+            samples=table.c.samples - bindparam("removed_samples"),
+            current_level_sum=table.c.current_level_sum - bindparam("removed_current"),
+            target_level_sum=table.c.target_level_sum - bindparam("removed_target")
+        ),
+        [
+            {
+                "key_user_id": user_id, "key_skill": skill, "key_day": day,
+                "removed_samples": samples, "removed_current": current_sum, "removed_target": target_sum,
+            }
+            for (user_id, skill, day), (samples, current_sum, target_sum) in totals.items()
+        ]
+    )
+    user_ids = {user_id for user_id, _, _ in totals}
+    await db.execute(delete(table).where(table.c.user_id.in_(user_ids), table.c.samples <= 0))
+
+
+def _period(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+async def _daily_totals(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    since: date,
+    skills: Optional[List[str]]
+) -> Iterable[Tuple[str, date, int, int, int]]:
+    if await rollups_available(db):
+        query = select(
+            SkillGapRollup.skill, SkillGapRollup.day, SkillGapRollup.samples,
+            SkillGapRollup.current_level_sum, SkillGapRollup.target_level_sum
+        ).where(SkillGapRollup.user_id == user_id, SkillGapRollup.day >= since)
+        if skills:
+            query = query.where(SkillGapRollup.skill.in_(skills))
+        return (await db.execute(query)).all()
+
+    # Unmigrated database: aggregate the JSON of every message in the window
+    totals: Totals = {}
+    result = await db.execute(
+        _scan_query(db).where(Chat.user_id == user_id, Message.created_at >= datetime.combine(since, datetime.min.time()))
+    )
+    for row in result:
+        gaps = _skill_gaps(row.analysis_data)
+        if skills:
+            gaps = [gap for gap in gaps if gap["skill"] in skills]
+        _add_totals(totals, user_id, row.created_at, gaps)
+    return [(skill, day, *sums) for (_, skill, day), sums in totals.items()]
+
+
+async def skill_gap_trend(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    since: date,
+    granularity: str = "day",
+    skills: Optional[List[str]] = None
+) -> List[dict[str, Any]]:
+    """
+    Average current and target level per skill and period, oldest period first.
+
+    Args:
+        since: First day included
+        granularity: "day", "week" (starting Monday) or "month"
+        skills: Only these skills (names as in analysis_data); all when None
+
+    Returns:
+        [{"skill", "points": [{"period", "samples", "avg_current_level",
+        "avg_target_level"}]}], skills with the most samples first
+    """
+    periods: dict[str, dict[date, List[int]]] = {}
+    for skill, day, samples, current_sum, target_sum in await _daily_totals(db, user_id, since, skills):
+        entry = periods.setdefault(skill, {}).setdefault(_period(day, granularity), [0, 0, 0])
+        entry[0] += samples
+        entry[1] += current_sum
+        entry[2] += target_sum
+
+    trend = [
+        {
+            "skill": skill,
+            "points": [
+                {
+                    "period": period.isoformat(),
+                    "samples": samples,
+                    "avg_current_level": round(current_sum / samples, 2),
+                    "avg_target_level": round(target_sum / samples, 2),
+                }
+                for period, (samples, current_sum, target_sum) in sorted(by_period.items())
+            ],
+        }
+        for skill, by_period in periods.items()
+    ]
+    trend.sort(key=lambda item: (-sum(point["samples"] for point in item["points"]), item["skill"]))
+    return trend
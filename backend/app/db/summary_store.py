@@ -0,0 +1,146 @@
+"""
+Persistence for background chat summaries (Chat.context_summary).
+
+Chat.summary_message_count records how many messages the stored summary
+covers, so pending work is "message_count > summary_message_count" and can
+be found through a small partial index by any worker process.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import inspect, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.chat_store import bump_chats_version
+from app.db.models import Chat, Message
+
+# Whether chats.summary_message_count exists (alembic revision 0006).
+# Checked once per process; summaries are not generated until it does.
+_summary_columns_available: Optional[bool] = None
+
+
+async def summary_columns_available(db: AsyncSession) -> bool:
+    """Check (once) whether the summary progress columns exist."""
+    global _summary_columns_available
+    if _summary_columns_available is None:
+        connection = await db.connection()
+        columns = await connection.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("chats")}
+        )
+        _summary_columns_available = {"message_count", "summary_message_count"} <= columns
+    return _summary_columns_available
+
+
+async def due_chats(db: AsyncSession, every_messages: int, idle_seconds: float, limit: int) -> List[Row]:
+    """
+    Chats whose summary should be refreshed, least recently active first.
+
+    A chat is due once every_messages new messages have accumulated since
+    its last summary, or when it has unsummarized messages and has been
+    quiet for idle_seconds - so a busy chat is summarized at most once per
+    every_messages messages.
+
+    Returns:
+        Rows of (chat_id, context_summary, summary_message_count, message_count)
+    """
+    pending = Chat.message_count > Chat.summary_message_count
+    result = await db.execute(
+        select(Chat.chat_id, Chat.context_summary, Chat.summary_message_count, Chat.message_count)
+        .where(
+            pending,
+            or_(
+                Chat.message_count - Chat.summary_message_count >= every_messages,
+                Chat.last_message_at <= datetime.utcnow() - timedelta(seconds=idle_seconds)
+            )
+        )
+        .order_by(Chat.last_message_at)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def recent_messages(db: AsyncSession, chat_id: uuid.UUID, count: int) -> List[Row]:
+    """
+    The last count messages of a chat, oldest first.
+
+    Reads the tail of ix_messages_chat_created backwards, so the cost does
+    not grow with the length of the chat.
+
+    Returns:
+        Rows of (sender, content, created_at)
+    """
+    result = await db.execute(
+        select(Message.sender, Message.content, Message.created_at)
+        .where(Message.chat_id == chat_id)
+        .order_by(Message.created_at.desc(), Message.message_id.desc())
+        .limit(count)
+    )
+    return list(reversed(result.all()))
+
+
+async def unsummarized_messages(
+    db: AsyncSession,
+    chat_id: uuid.UUID,
+    summarized_count: int,
+    max_messages: int
+) -> Tuple[int, List[Row]]:
+    """
+    The chat's current message count and its messages after the first
+    summarized_count (at most the newest max_messages), oldest first.
+
+    The count is read in the same statement as the messages, so both come
+    from one snapshot: messages written since the chat was found due are
+    either in the count and the tail, or in neither.
+
+    Returns:
+        (message_count, rows of (sender, content, created_at))
+    """
+    current_count = (
+        select(Chat.message_count).where(Chat.chat_id == chat_id).scalar_subquery().label("message_count")
+    )
+    result = await db.execute(
+        select(Message.sender, Message.content, Message.created_at, current_count)
+        .where(Message.chat_id == chat_id)
+        .order_by(Message.created_at.desc(), Message.message_id.desc())
+        .limit(max_messages)
+    )
+    rows = result.all()
+    if not rows:
+        return summarized_count, []
+    message_count = rows[0].message_count
+    return message_count, list(reversed(rows[:max(message_count - summarized_count, 0)]))
+
+
+async def save_summary(
+    db: AsyncSession,
+    chat_id: uuid.UUID,
+    summary: str,
+    previous_count: int,
+    message_count: int
+) -> bool:
+    """
+    Store a summary covering message_count messages (committed by the caller).
+
+    Only applies if nobody else stored a summary since previous_count was
+    read, so concurrent workers never overwrite a newer summary.
+
+    Returns:
+        Whether the summary was stored
+    """
+    result = await db.execute(
+        update(Chat)
+        .where(Chat.chat_id == chat_id, Chat.summary_message_count == previous_count)
+        .values(
+            context_summary=summary,
+            summary_message_count=message_count,
+            summary_updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    # The chat list shows the summary
+    await bump_chats_version(db, chat_ids=[chat_id])
+    return True
@@ -1,17 +1,42 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.admission import AdmissionControl, route_group_limiters
+from app.core.body_limit import BodySizeLimit, upload_body_limits
 from app.core.config import settings
-from app.api.v1.api import api_router
+from app.core import metrics
+from app.core.profiling import SQLProfiler, instrument_app_engines
+from app.core.responses import FastJSONResponse
+from app.core.security import password_hash_pool
+from app.api.v1.api import ENDPOINT_ROUTERS, LazyEndpointRouters, build_api_router
 from app.db.base import Base
-from app.db.session import engine
+from app.db.pool import pool_checkout_monitor
+from app.db.session import engine, async_engine
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan event handler for startup and shutdown.
+    
+    In the serverless profile (settings.SERVERLESS) startup does nothing:
+    the schema comes from migrations, caches fill on first use and the
+    background workers run elsewhere.
     """
+    if settings.SERVERLESS:
+        yield
+        await metrics.metrics_refresher.stop()
+        await async_engine.dispose()
+        password_hash_pool.shutdown()
+        return
+    
+    from app.db.chat_store import chat_write_behind
+    from app.services.resume_batch import resume_batch_worker
+    from app.services.roi import get_roi_model
+    from app.services.skill_gaps import get_role_requirements
+    from app.services.skills import get_skill_matcher
+    from app.services.summaries import chat_summarizer
+    
     # Startup
     try:
         from app.db import models
@@ -22,12 +47,59 @@ async def lifespan(app: FastAPI):
         print("⚠️ Server will start but database features will not work.")
         print("⚠️ Please check your DATABASE_URL in .env file")
     
+    # Compile the skill taxonomy matcher and load the role requirements and
+    # market data before the first request needs them
+    get_skill_matcher()
+    get_role_requirements()
+    get_roi_model()
+    
+    # Background workers (or run them separately: python -m app.worker)
+    if settings.RESUME_BATCH_WORKER_ENABLED:
+        resume_batch_worker.start()
+    if settings.CHAT_SUMMARY_WORKER_ENABLED:
+        chat_summarizer.start()
+    # Keep this worker's pool/cache gauges current for scrapes served by the others
+    if settings.METRICS_ENABLED and metrics.MULTIPROCESS:
+        metrics.metrics_refresher.start()
+    
     yield
     
     # Shutdown
+    await metrics.metrics_refresher.stop()
+    await chat_write_behind.stop()
+    await chat_summarizer.stop(drain_timeout=settings.CHAT_SUMMARY_DRAIN_SECONDS)
+    await resume_batch_worker.stop()
+    await async_engine.dispose()
+    password_hash_pool.shutdown()
     print("🔴 Shutting down application")
 
 
+def _setup_metrics(app: FastAPI, admission_groups) -> None:
+    """
+    Add the HTTP metrics middleware, instrument the engines, register the
+    collectors and the /metrics endpoint.
+    """
+    app.add_middleware(
+        metrics.HTTPMetrics,
+        groups=[(prefix.strip("/"), settings.API_V1_STR + prefix) for _, prefix, _ in ENDPOINT_ROUTERS]
+    )
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(async_engine.sync_engine)
+    if metrics.DB_POOL_CHECKOUT_WAIT.observe not in pool_checkout_monitor.listeners:
+        pool_checkout_monitor.listeners.append(metrics.DB_POOL_CHECKOUT_WAIT.observe)
+    metrics.register_collector("db_pool", metrics.pool_collector([("sync", engine), ("async", async_engine)]))
+    metrics.register_collector("cache", metrics.collect_caches)
+    if admission_groups:
+        metrics.register_collector("admission", metrics.admission_collector(admission_groups))
+    
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """
+        Prometheus exposition of request, DB pool, cache and admission metrics.
+        """
+        return metrics.metrics_response()
+
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -38,9 +110,38 @@ def create_app() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url=f"{settings.API_V1_STR}/docs",
         redoc_url=f"{settings.API_V1_STR}/redoc",
+        default_response_class=FastJSONResponse,
         lifespan=lifespan
     )
     
+    # Concurrency limits and load shedding (inside CORS, so rejections carry CORS headers)
+    admission_groups = route_group_limiters() if settings.ADMISSION_CONTROL_ENABLED else []
+    if settings.ADMISSION_CONTROL_ENABLED:
+        app.add_middleware(
+            AdmissionControl,
+            groups=admission_groups,
+            pool_monitor=pool_checkout_monitor,
+            shed_reads_after=settings.ADMISSION_SHED_READS_POOL_WAIT_SECONDS,
+            shed_all_after=settings.ADMISSION_SHED_ALL_POOL_WAIT_SECONDS
+        )
+    
+    # Upload size limits, checked before the body is read (inside CORS too)
+    app.add_middleware(BodySizeLimit, limits=upload_body_limits())
+    
+    # Request metrics (outside admission control, so rejected requests are counted too)
+    if settings.METRICS_ENABLED:
+        _setup_metrics(app, admission_groups)
+    
+    # Per-request SQL profiling (opt-in)
+    if settings.SQL_PROFILING_ENABLED:
+        instrument_app_engines()
+        app.add_middleware(
+            SQLProfiler,
+            repeat_threshold=settings.SQL_PROFILING_REPEAT_THRESHOLD,
+            slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+            server_timing=settings.DEBUG
+        )
+    
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -48,10 +149,19 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Retry-After", "Server-Timing"],
     )
     
-    # Include API router
-    app.include_router(api_router, prefix=settings.API_V1_STR)
+    # Include API router (serverless: each endpoint module on its first request)
+    if settings.SERVERLESS:
+        app.add_middleware(
+            LazyEndpointRouters,
+            fastapi_app=app,
+            prefix=settings.API_V1_STR,
+            eager_paths=[app.openapi_url, app.docs_url, app.redoc_url]
+        )
+    else:
+        app.include_router(build_api_router(), prefix=settings.API_V1_STR)
     
     @app.get("/")
     async def root():
@@ -0,0 +1,91 @@
+"""
+Backfill the legacy chat_messages table into chats/messages.
+
+    python -m app.migrate_legacy_chats [--batch-size 5000] [--session-gap-minutes 30]
+
+Run after alembic revision 0009. Each batch is committed together with its
+checkpoint, so the backfill can be interrupted (Ctrl-C / SIGTERM stop it
+after the current batch) and re-run at any time - it resumes where it
+stopped. Once it reports completion, GET /chat/chat-history is served from
+chats/messages (see app.db.legacy_chats) and chat_messages can be dropped.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from datetime import timedelta
+
+from app.db.legacy_chats import copy_batch, fill_missing_timestamps, load_checkpoint
+from app.db.session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger("app.migrate_legacy_chats")
+
+
+async def run(batch_size: int, session_gap: timedelta, summarize: bool) -> bool:
+    """
+    Copy batches until chat_messages is exhausted or SIGINT/SIGTERM.
+
+    Returns:
+        Whether the backfill is complete
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    async with AsyncSessionLocal() as db:
+        checkpoint = await load_checkpoint(db)
+        if checkpoint.completed_at is not None:
+            logger.info("Already complete: %d messages in %d chats", checkpoint.rows_copied, checkpoint.chats_created)
+            return True
+        dated = await fill_missing_timestamps(db)
+        if dated:
+            logger.info("Dated %d legacy messages without a timestamp", dated)
+        await db.commit()
+        if checkpoint.position is not None:
+            logger.info("Resuming after %d messages", checkpoint.rows_copied)
+
+    started = time.perf_counter()
+    copied = 0
+    complete = False
+    while not stop.is_set() and not complete:
+        async with AsyncSessionLocal() as db:
+            checkpoint = await load_checkpoint(db)
+            copied += await copy_batch(db, checkpoint, batch_size, session_gap, summarize)
+            complete = checkpoint.completed_at is not None
+            rows_copied, chats_created = checkpoint.rows_copied, checkpoint.chats_created
+            await db.commit()
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%d messages in %d chats (%.0f messages/s)",
+            rows_copied, chats_created, copied / elapsed if elapsed else 0
+        )
+
+    if complete:
+        logger.info("Backfill complete; chat_messages can be dropped")
+    else:
+        logger.info("Stopped; run again to resume")
+    await async_engine.dispose()
+    return complete
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=5000, help="Messages per batch/transaction")
+    parser.add_argument(
+        "--session-gap-minutes", type=float, default=30,
+        help="A pause longer than this between two messages starts a new chat session"
+    )
+    parser.add_argument(
+        "--summarize", action="store_true",
+        help="Let the background summarizer summarize the backfilled chats"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    complete = asyncio.run(run(args.batch_size, timedelta(minutes=args.session_gap_minutes), args.summarize))
+    raise SystemExit(0 if complete else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional
+
+from app.services.skill_gaps import MAX_LEVEL
+
+
+class SkillGapRequest(BaseModel):
+    """
+    Schema for skill gap analysis request.
+    
+    skills maps skill ids or names to the user's current level (0-5,
+    fractions allowed). When omitted, levels are inferred from the skills
+    mentioned in the user's recent chats.
+    """
+    skills: Optional[dict[str, Annotated[float, Field(ge=0, le=MAX_LEVEL)]]] = None
+    top_k: int = Field(5, ge=1, le=50)
+
+
+class ROICandidate(BaseModel):
+    """
+    A candidate career investment to simulate.
+    """
+    investment_amount: float = Field(..., gt=0)
+    target_role: str
+    current_salary: Optional[float] = Field(None, gt=0)  # Defaults to the market baseline
+
+
+class ROIRequest(BaseModel):
+    """
+    Schema for batched ROI calculation request.
+    
+    All candidates are simulated in one call; pass seed for reproducible results.
+    """
+    candidates: List[ROICandidate] = Field(..., min_length=1)
+    paths: Optional[int] = Field(None, ge=100)
+    horizon_years: Optional[int] = Field(None, ge=1, le=30)
+    seed: Optional[int] = None
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import UUID
 from typing import Optional, Any, List
 
+from app.core.config import settings
+
 
 class ChatMessageBase(BaseModel):
     """
@@ -36,7 +38,7 @@ class ChatRequest(BaseModel):
     """
     Schema for chat API request.
     """
-    message: str
+    message: str = Field(..., max_length=settings.CHAT_MESSAGE_MAX_CHARS)
     chat_id: Optional[UUID] = None  # Optional - will create new chat if not provided
 
 
@@ -85,12 +87,14 @@ class ChatCreate(ChatBase):
 
 
 class ChatRead(ChatBase):
-    """Schema for reading a chat session"""
+    """
+    Schema for reading a chat session.
+    Messages are not included - page through them with GET /chats/{chat_id}/messages.
+    """
     chat_id: UUID
     user_id: UUID
     started_at: datetime
     ended_at: Optional[datetime] = None
-    messages: List[MessageRead] = []
     
     class Config:
         from_attributes = True
@@ -107,3 +111,31 @@ class ChatSummary(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ChatPage(BaseModel):
+    """One page of chat summaries; pass next_cursor back as ?cursor= for the next page"""
+    items: List[ChatSummary]
+    next_cursor: Optional[str] = None
+
+
+class MessagePage(BaseModel):
+    """One page of messages; pass next_cursor back as ?cursor= for the next page"""
+    items: List[MessageRead]
+    next_cursor: Optional[str] = None
+
+
+class MessageSearchHit(BaseModel):
+    """One search result: the matching message with a highlighted snippet"""
+    message_id: UUID
+    chat_id: UUID
+    sender: str  # "USER" or "AI"
+    created_at: datetime
+    snippet: str  # HTML-escaped, matched terms wrapped in <mark></mark>
+    score: float  # relevance, higher is better
+
+
+class MessageSearchPage(BaseModel):
+    """One page of search results, best match first; pass next_cursor back as ?cursor= for the next page"""
+    items: List[MessageSearchHit]
+    next_cursor: Optional[str] = None
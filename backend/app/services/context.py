@@ -0,0 +1,78 @@
+"""
+Model context for a chat turn.
+
+Instead of the whole transcript, the context is the chat's rolling summary
+(Chat.context_summary, maintained incrementally by app.services.summaries)
+plus only the last CHAT_CONTEXT_MAX_MESSAGES messages, read with a tail
+query on the (chat_id, created_at) index - so building it costs the same
+for the 10th and the 10,000th turn. Everything is fitted into a token budget.
+"""
+import uuid
+from typing import Any, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.summary_store import recent_messages
+from app.services.tokens import count_tokens, truncate_tokens
+
+ROLES = {"USER": "user", "AI": "assistant"}
+
+# Per-message framing tokens (role markers etc.) in chat model formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+async def build_chat_context(
+    db: AsyncSession,
+    chat_id: Optional[uuid.UUID],
+    user_message: str,
+    summary: Optional[str] = None,
+    max_messages: Optional[int] = None,
+    token_budget: Optional[int] = None
+) -> dict[str, Any]:
+    """
+    Build the model input for a new user message.
+    
+    Budget priority: the new message, then the summary (at most half of
+    what is left), then recent messages newest first - older messages that
+    don't fit are dropped.
+    
+    Args:
+        chat_id: The chat, or None for a chat with no stored messages yet
+        summary: The chat's context_summary
+        
+    Returns:
+        {"messages": [{"role", "content"}, ...] ending with the new message,
+        "token_count", "omitted_messages"}
+    """
+    max_messages = max_messages or settings.CHAT_CONTEXT_MAX_MESSAGES
+    token_budget = token_budget or settings.CHAT_CONTEXT_TOKEN_BUDGET
+    
+    user_message = truncate_tokens(user_message, token_budget - MESSAGE_OVERHEAD_TOKENS)
+    remaining = token_budget - count_tokens(user_message) - MESSAGE_OVERHEAD_TOKENS
+    
+    summary_message = None
+    if summary and remaining > MESSAGE_OVERHEAD_TOKENS:
+        # Keep the newest part of the summary if it must be cut
+        summary = truncate_tokens(summary, remaining // 2 - MESSAGE_OVERHEAD_TOKENS, keep_end=True).strip()
+        if summary:
+            summary_message = {"role": "system", "content": f"Conversation so far: {summary}"}
+            remaining -= count_tokens(summary_message["content"]) + MESSAGE_OVERHEAD_TOKENS
+    
+    history = await recent_messages(db, chat_id, max_messages) if chat_id is not None else []
+    included: List[dict[str, str]] = []
+    for message in reversed(history):
+        cost = count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+        if cost > remaining:
+            break
+        remaining -= cost
+        included.append({"role": ROLES.get(message.sender, "user"), "content": message.content})
+    included.reverse()
+    
+    messages = ([summary_message] if summary_message else []) + included
+    messages.append({"role": "user", "content": user_message})
+    return {
+        "messages": messages,
+        "token_count": token_budget - remaining,
+        "omitted_messages": len(history) - len(included),
+    }
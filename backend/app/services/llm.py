@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.roi import get_roi_model
+from app.services.skill_gaps import get_role_requirements
+from app.services.skills import extract_skills
+from app.services.tokens import count_tokens, truncate_tokens
+
+
+async def generate_response(
+    message: str,
+    token_delay: float = 0.0,
+    context: Optional[List[dict[str, str]]] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the AI response to a user message, token by token.
+    
+    TODO: Replace with the real model client. This local fake echoes the
+    message back word by word so the streaming and non-streaming chat paths
+    (and tests) work without a model.
+    
+    Args:
+        message: The user's message
+        token_delay: Seconds to wait between tokens (simulates generation time)
+        context: Model input from app.services.context.build_chat_context
+            (summary + recent messages + this message); ignored by the fake
+        
+    Yields:
+        Response text fragments; joined together they form the full response
+    """
+    words = f"AI response to: {message}".split(" ")
+    for index, word in enumerate(words):
+        await asyncio.sleep(token_delay)
+        yield word if index == 0 else f" {word}"
+
+
+_LATEST_QUESTION = "Latest question: "
+
+
+async def summarize_conversation(
+    previous_summary: Optional[str],
+    messages: Iterable[Tuple[str, str]]
+) -> str:
+    """
+    Fold new messages into a running conversation summary.
+    
+    Incremental: only the messages since the previous summary are passed in,
+    never the full transcript.
+    
+    TODO: Replace with the real model client. This local fake keeps a list
+    of the skills discussed and the latest user question.
+    
+    Args:
+        previous_summary: Summary of the earlier messages, if any
+        messages: (sender, content) of the messages since that summary, oldest first
+        
+    Returns:
+        The updated summary
+    """
+    lines = [
+        line for line in (previous_summary or "").splitlines()
+        if line and not line.startswith(_LATEST_QUESTION)
+    ]
+    latest_question = None
+    for sender, content in messages:
+        if sender != "USER":
+            continue
+        latest_question = content
+        skills = [skill["skill"] for skill in extract_skills(content)]
+        if skills:
+            lines.append(f"Discussed {', '.join(skills)}.")
+    if latest_question:
+        if len(latest_question) > 200:
+            latest_question = latest_question[:197] + "..."
+        lines.append(f"{_LATEST_QUESTION}{latest_question}")
+    
+    # Bounded by CHAT_SUMMARY_MAX_TOKENS: the oldest lines are dropped first
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > settings.CHAT_SUMMARY_MAX_TOKENS:
+        lines.pop(0)
+    return truncate_tokens("\n".join(lines), settings.CHAT_SUMMARY_MAX_TOKENS, keep_end=True)
+
+
+def build_analysis_data(message: str) -> dict[str, Any]:
+    """
+    Structured analysis attached to the AI message (Message.analysis_data).
+    
+    "skills" are extracted from the message with the skill taxonomy matcher;
+    "skill_gaps" and "roi_calculation" (a small Monte Carlo run at the
+    market's default investment) are for the best-fit role for those skills,
+    and empty when no skills are mentioned.
+    """
+    skills = extract_skills(message)
+    skill_gaps = []
+    roi_calculation = None
+    if skills:
+        requirements = get_role_requirements()
+        current = requirements.skill_vector_from_mentions(skills)
+        analysis = requirements.analyze(current, top_k=1)
+        skill_gaps = analysis["skill_gaps"]
+        
+        model = get_roi_model()
+        role_index = requirements.find_role(analysis["target_role"]["role_id"])
+        (roi,) = model.simulate(
+            [{"role_index": role_index, "investment_amount": model.default_investment}],
+            paths=settings.ROI_CHAT_PATHS
+        )
+        roi_calculation = {
+            "investment": roi["investment"],
+            "expected_return": roi["expected_return"],
+            "roi_percentage": roi["roi_percentage"],
+            "payback_months": roi["percentiles"]["payback_months"]["p50"],
+            "target_role": roi["target_role"]["role"],
+        }
+    return {
+        "skills": skills,
+        "skill_gaps": skill_gaps,
+        "roi_calculation": roi_calculation
+    }
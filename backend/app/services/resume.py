@@ -0,0 +1,73 @@
+import os
+from typing import Any, Optional
+
+from app.services.skills import get_skill_matcher
+
+# Bump whenever analyze_resume_text changes its output, so cached results
+# from older analyzers are not served (see app.db.analysis_store)
+_ANALYZER_REVISION = "2"
+
+# Bump whenever extract_resume_text changes (results of analyze_resume_file
+# are stored under file_analyzer_version)
+_PARSER_REVISION = "1"
+
+# Content types parsed as text; anything else needs client-side extraction
+_TEXT_CONTENT_TYPES = {"application/json", "application/rtf", "application/octet-stream", ""}
+
+
+def analyzer_version() -> str:
+    """Version of the resume analyzer, including the skill taxonomy version."""
+    return f"{_ANALYZER_REVISION}+taxonomy.{get_skill_matcher().taxonomy_version}"
+
+
+def file_analyzer_version() -> str:
+    """Version of analyze_resume_file: the analyzer version plus the parser revision."""
+    return f"{analyzer_version()}+parse.{_PARSER_REVISION}"
+
+
+def extract_resume_text(content: bytes, content_type: Optional[str]) -> str:
+    """
+    Extract the text of an uploaded resume file.
+    
+    Only text formats are parsed server-side (PDF/DOCX text is extracted
+    client-side and sent as extracted_text).
+    
+    Raises:
+        ValueError: If the file is not a text format
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if not content_type.startswith("text/") and content_type not in _TEXT_CONTENT_TYPES:
+        raise ValueError(f"Unsupported resume file type: {content_type}")
+    return content.decode("utf-8", errors="replace")
+
+
+def init_worker_process(niceness: int) -> None:
+    """Process pool initializer: lower the process priority and compile the matcher."""
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+    get_skill_matcher()
+
+
+def analyze_resume_file(content: bytes, content_type: Optional[str]) -> dict[str, Any]:
+    """Parse and analyze an uploaded resume file (runs in the batch process pool)."""
+    return analyze_resume_text(extract_resume_text(content, content_type))
+
+
+def analyze_resume_text(extracted_text: Optional[str]) -> dict[str, Any]:
+    """
+    Analyze resume text and return career insights.
+    
+    The result must depend only on the text, since it is cached by content hash.
+    "skills" uses the same shape as Message.analysis_data["skills"].
+    
+    TODO: Extend the analysis. This could include:
+    - Experience analysis
+    - Career trajectory prediction
+    - Salary estimation
+    """
+    matcher = get_skill_matcher()
+    return {
+        "extracted_text_length": len(extracted_text) if extracted_text else 0,
+        "skills": matcher.extract(extracted_text) if extracted_text else [],
+        "skill_taxonomy_version": matcher.taxonomy_version,
+    }
@@ -0,0 +1,201 @@
+"""
+Background worker for batch resume analysis jobs.
+
+Items queued by POST /analysis/batch-jobs are claimed from the database and
+parsed + analyzed in a process pool, so a batch of hundreds of resumes never
+competes with request handling for the event loop or the GIL. Interactive
+work keeps priority: the pool is capped at RESUME_BATCH_WORKERS processes
+running at a raised nice value, and no new batch item is started while an
+interactive resume analysis is in progress in this process.
+"""
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Iterator, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db.analysis_store import get_analysis, store_analysis
+from app.db.models import ResumeBatchItem
+from app.db.resume_batch_store import claim_item, finish_item, release_item
+from app.db.session import AsyncSessionLocal
+from app.services.resume import analyze_resume_file, file_analyzer_version, init_worker_process
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeBatchWorker:
+    """
+    Claims queued batch items and analyzes them, up to ``workers`` at a time.
+
+    Job state lives in the database, so any number of worker processes can
+    share the queue and a restarted worker picks up where it left off.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        workers: int,
+        poll_interval: float,
+        claim_timeout: float,
+        niceness: int = 0
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.niceness = niceness
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._interactive_idle: Optional[asyncio.Event] = None
+        self._interactive = 0
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start claiming and processing queued items (call from the event loop)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._slots = asyncio.Semaphore(self.workers)
+        self._wakeup = asyncio.Event()
+        self._interactive_idle = asyncio.Event()
+        if self._interactive == 0:
+            self._interactive_idle.set()
+        self._task = asyncio.create_task(self._run())
+
+    def wake(self) -> None:
+        """Check the queue now instead of at the next poll (after queueing items)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @contextlib.contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Hold back new batch items while an interactive analysis runs."""
+        self._interactive += 1
+        if self._interactive_idle is not None:
+            self._interactive_idle.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if self._interactive == 0 and self._interactive_idle is not None:
+                self._interactive_idle.set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the parent runs threads (thread pools, aiosqlite)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_process,
+                initargs=(self.niceness,)
+            )
+        return self._pool
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self._slots.acquire()
+            claimed = None
+            try:
+                await self._interactive_idle.wait()
+                if self._stopping:
+                    break
+                async with self.session_factory() as db:
+                    claimed = await claim_item(db, self.claim_timeout)
+            except Exception:
+                logger.exception("Claiming a batch resume item failed")
+            finally:
+                if claimed is None:
+                    self._slots.release()
+
+            if claimed is None:
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._process(*claimed))
+            self._in_flight.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _process(self, item_id: UUID, claimed_at: datetime) -> None:
+        version = file_analyzer_version()
+        try:
+            async with self.session_factory() as db:
+                row = (await db.execute(
+                    select(ResumeBatchItem.content, ResumeBatchItem.content_type, ResumeBatchItem.content_hash)
+                    .where(ResumeBatchItem.item_id == item_id)
+                )).one()
+                # Don't hold a connection while the pool works
+                await db.rollback()
+
+                error = None
+                if row.content_hash and await get_analysis(db, row.content_hash, version) is None:
+                    loop = asyncio.get_running_loop()
+                    try:
+                        result = await loop.run_in_executor(
+                            self._get_pool(), analyze_resume_file, row.content, row.content_type
+                        )
+                    except BrokenProcessPool:
+                        # A crashed pool process: start a fresh pool for the next items
+                        self._pool = None
+                        error = "Analysis worker process crashed"
+                    except Exception as exc:
+                        error = str(exc) or type(exc).__name__
+                    else:
+                        await store_analysis(db, row.content_hash, version, result)
+
+                await finish_item(db, item_id, claimed_at, version, error)
+                await db.commit()
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release(item_id, claimed_at))
+            raise
+        except Exception:
+            logger.exception("Batch resume item %s failed", item_id)
+            await self._release(item_id, claimed_at)
+
+    async def _release(self, item_id: UUID, claimed_at: datetime) -> None:
+        """Requeue an item we could not finish, so it isn't stuck until the claim times out."""
+        try:
+            async with self.session_factory() as db:
+                await release_item(db, item_id, claimed_at)
+                await db.commit()
+        except Exception:
+            logger.exception("Requeueing batch resume item %s failed", item_id)
+
+    async def stop(self) -> None:
+        """Stop claiming items, let in-flight ones finish and shut the pool down."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._interactive_idle.set()
+            await self._task
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+resume_batch_worker = ResumeBatchWorker(
+    AsyncSessionLocal,
+    workers=settings.RESUME_BATCH_WORKERS,
+    poll_interval=settings.RESUME_BATCH_POLL_SECONDS,
+    claim_timeout=settings.RESUME_BATCH_CLAIM_TIMEOUT_SECONDS,
+    niceness=settings.RESUME_BATCH_NICENESS
+)
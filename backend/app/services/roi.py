@@ -0,0 +1,220 @@
+"""
+Monte Carlo ROI simulation for career investments (courses, certifications).
+
+Each candidate investment is simulated over many paths at once with NumPy:
+course cost overruns, whether and when the person gets hired into the target
+role, the starting salary there and yearly salary growth are sampled per
+path, and compared against staying on the current salary. Market assumptions per role live in
+app/data/role_market.json.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.skill_gaps import RoleRequirements, get_role_requirements
+
+ROLE_MARKET_PATH = Path(__file__).resolve().parent.parent / "data" / "role_market.json"
+
+PERCENTILES = (10, 50, 90)
+
+# Upper bound on candidates x paths x years floats sampled at once; larger
+# batches are simulated in chunks of candidates to bound memory
+MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def _percentiles(values: np.ndarray, **kwargs) -> np.ndarray:
+    """p10/p50/p90 along the paths axis, shape (len(PERCENTILES), candidates)."""
+    return np.percentile(values, PERCENTILES, axis=1, **kwargs)
+
+
+def _summary(values: np.ndarray, digits: int) -> dict[str, Optional[float]]:
+    return {
+        f"p{percentile}": round(float(value), digits) if np.isfinite(value) else None
+        for percentile, value in zip(PERCENTILES, values)
+    }
+
+
+class ROIModel:
+    """
+    Salary market assumptions for every role, aligned with RoleRequirements rows.
+
+    Per path, the simulation samples:
+    - the course cost: the quoted amount with a lognormal overrun (mean-preserving)
+    - placement: hired into the role with the role's placement_probability;
+      paths that are never hired keep the current salary and earn no uplift
+    - time to hire: gamma distributed (shape 2) around the role's months_to_hire
+    - the starting salary: lognormal around the role's median salary
+    - yearly growth: normal around the role's annual growth
+
+    Returns are the extra earnings over the horizon compared with the current
+    salary growing at the baseline rate; income before the hire is unchanged.
+    """
+
+    def __init__(self, market: dict[str, Any], requirements: RoleRequirements):
+        self.version: str = market["version"]
+        self.requirements = requirements
+        self.baseline_salary = float(market["baseline"]["current_salary"])
+        self.baseline_growth = float(market["baseline"]["annual_growth"])
+        defaults = market["defaults"]
+        self.default_investment = float(defaults["investment_amount"])
+        self.default_horizon_years = int(defaults["horizon_years"])
+        self.cost_sigma = float(defaults["cost_sigma"])
+        self.growth_sigma = float(defaults["growth_sigma"])
+
+        role_count = len(requirements.roles)
+        self.median_salary = np.zeros(role_count, dtype=np.float32)
+        self.salary_sigma = np.zeros(role_count, dtype=np.float32)
+        self.annual_growth = np.zeros(role_count, dtype=np.float32)
+        self.months_to_hire = np.zeros(role_count, dtype=np.float32)
+        self.placement_probability = np.zeros(role_count, dtype=np.float32)
+        for index, role in enumerate(requirements.roles):
+            if role["role_id"] not in market["roles"]:
+                raise ValueError(f"No market data for role {role['role_id']!r}")
+            role_market = market["roles"][role["role_id"]]
+            self.median_salary[index] = role_market["median_salary"]
+            self.salary_sigma[index] = role_market["salary_sigma"]
+            self.annual_growth[index] = role_market["annual_growth"]
+            self.months_to_hire[index] = role_market["months_to_hire"]
+            self.placement_probability[index] = role_market["placement_probability"]
+
+    @classmethod
+    def from_file(cls, path: Path = ROLE_MARKET_PATH) -> "ROIModel":
+        """Load market assumptions for the bundled roles."""
+        with open(path, encoding="utf-8") as market_file:
+            return cls(json.load(market_file), get_role_requirements())
+
+    def simulate(
+        self,
+        candidates: Sequence[dict[str, Any]],
+        paths: int,
+        horizon_years: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> List[dict[str, Any]]:
+        """
+        Simulate the ROI of each candidate investment.
+
+        Args:
+            candidates: {"role_index", "investment_amount", "current_salary"
+                (optional)} per candidate; role_index is a RoleRequirements row
+            paths: Monte Carlo paths per candidate
+            horizon_years: Years of earnings counted as return
+            seed: Seed for reproducible results (None = fresh randomness)
+
+        Returns:
+            One result per candidate, in order: the mean "expected_return" and
+            "roi_percentage" over the paths (the shape stored under
+            "roi_calculation" in Message.analysis_data) plus p10/p50/p90
+            percentiles and payback
+        """
+        horizon_years = horizon_years or self.default_horizon_years
+        rng = np.random.default_rng(seed)
+        chunk = max(1, MAX_CHUNK_ELEMENTS // (paths * horizon_years))
+        results = []
+        for start in range(0, len(candidates), chunk):
+            results.extend(self._simulate_chunk(candidates[start:start + chunk], paths, horizon_years, rng))
+        return results
+
+    def _simulate_chunk(
+        self,
+        candidates: Sequence[dict[str, Any]],
+        paths: int,
+        years: int,
+        rng: np.random.Generator
+    ) -> List[dict[str, Any]]:
+        f32 = np.float32
+        count = len(candidates)
+        rows = np.array([candidate["role_index"] for candidate in candidates])
+        investment = np.array([candidate["investment_amount"] for candidate in candidates], dtype=f32)
+        current = np.array(
+            [candidate.get("current_salary") or self.baseline_salary for candidate in candidates],
+            dtype=f32
+        )
+
+        # Shapes: (candidates, paths) per path, (years, candidates, paths) per
+        # year - years leading, so the cumulative ops run over contiguous rows
+        cost = investment[:, None] * np.exp(
+            f32(self.cost_sigma) * rng.standard_normal((count, paths), dtype=f32) - f32(self.cost_sigma ** 2 / 2)
+        )
+        placed = rng.random((count, paths), dtype=f32) < self.placement_probability[rows][:, None]
+        hire_years = rng.standard_gamma(2.0, size=(count, paths), dtype=f32) * (self.months_to_hire[rows] / 24)[:, None]
+        starting_salary = self.median_salary[rows][:, None] * np.exp(
+            self.salary_sigma[rows][:, None] * rng.standard_normal((count, paths), dtype=f32)
+        )
+        growth = 1 + self.annual_growth[rows][:, None] + f32(self.growth_sigma) * rng.standard_normal(
+            (years, count, paths), dtype=f32
+        )
+        growth[0] = 1
+        target_salary = starting_salary * np.cumprod(growth, axis=0)
+
+        year = np.arange(years, dtype=f32)[:, None, None]
+        baseline_salary = current[:, None] * (1 + f32(self.baseline_growth)) ** year
+        # Share of each year spent in the new role (none if never placed), and
+        # the salary uplift over the baseline
+        employed = np.clip(year + 1 - hire_years, 0, 1) * placed
+        uplift = target_salary - baseline_salary
+        gain = employed * uplift
+
+        cumulative = np.cumsum(gain, axis=0)
+        total_return = cumulative[-1].copy()
+        cumulative -= cost
+        net_return = total_return - cost
+        roi_percentage = net_return / cost * 100
+
+        # Payback: the first year the cumulative gain covers the cost, interpolated
+        # within that year (the uplift accrues evenly from the hire date on)
+        paid = cumulative >= 0
+        paid_back = paid.any(axis=0)
+        first_year = paid.argmax(axis=0)[None]
+        before = np.where(
+            first_year > 0,
+            np.take_along_axis(cumulative, np.maximum(first_year - 1, 0), axis=0),
+            -cost
+        )[0]
+        accrual_start = np.maximum(first_year[0].astype(f32), hire_years)
+        rate = np.take_along_axis(uplift, first_year, axis=0)[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            payback_years = accrual_start - before / rate
+        payback_months = np.where(paid_back, payback_years * 12, np.inf)
+
+        # Means, not medians: when most paths are never placed the median path
+        # is just the lost investment
+        mean_return = total_return.mean(axis=1, dtype=np.float64)
+        mean_roi = roi_percentage.mean(axis=1, dtype=np.float64)
+        return_percentiles = _percentiles(total_return)
+        net_percentiles = _percentiles(net_return)
+        roi_percentiles = _percentiles(roi_percentage)
+        # inverted_cdf picks actual samples, so unpaid (inf) paths don't produce NaN
+        payback_percentiles = _percentiles(payback_months, method="inverted_cdf")
+        payback_probability = paid_back.mean(axis=1)
+
+        results = []
+        for index, candidate in enumerate(candidates):
+            role = self.requirements.roles[candidate["role_index"]]
+            results.append({
+                "target_role": dict(role),
+                "investment": float(candidate["investment_amount"]),
+                "current_salary": float(current[index]),
+                "expected_return": round(float(mean_return[index]), 2),
+                "roi_percentage": round(float(mean_roi[index]), 1),
+                "percentiles": {
+                    "return": _summary(return_percentiles[:, index], 2),
+                    "net_return": _summary(net_percentiles[:, index], 2),
+                    "roi_percentage": _summary(roi_percentiles[:, index], 1),
+                    "payback_months": _summary(payback_percentiles[:, index], 1),
+                },
+                "payback_probability": round(float(payback_probability[index]), 4),
+                "placement_probability": round(float(self.placement_probability[candidate["role_index"]]), 4),
+                "horizon_years": years,
+                "paths": paths,
+                "market_version": self.version,
+            })
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_roi_model() -> ROIModel:
+    """The model for the bundled market data, loaded on first use (warmed at startup)."""
+    return ROIModel.from_file()
@@ -0,0 +1,210 @@
+"""
+Skill gap scoring against the role requirements in app/data/role_requirements.json.
+
+Role requirements are held as a dense roles x skills matrix of target levels
+(columns follow the skill taxonomy order, 0 = not required), so scoring a
+user's skill vector against every role is a single vectorized NumPy
+operation instead of a Python loop per role and skill.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from app.services.skills import get_skill_matcher
+
+ROLE_REQUIREMENTS_PATH = Path(__file__).resolve().parent.parent / "data" / "role_requirements.json"
+
+MAX_LEVEL = 5
+
+# A skill mentioned in a resume or chat shows familiarity, not mastery, so
+# levels inferred from mention counts are capped below the top of the scale
+MAX_MENTION_LEVEL = 3
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _level(value: float) -> float:
+    """A level as reported in skill gaps: whole levels as int, fractions to 2 decimals."""
+    level = round(float(value), 2)
+    return int(level) if level.is_integer() else level
+
+
+def level_from_mentions(mentions: int) -> int:
+    """Skill level inferred from how often a skill is mentioned (1 mention = level 2)."""
+    return min(1 + mentions, MAX_MENTION_LEVEL)
+
+
+class RoleRequirements:
+    """
+    Target skill levels for a set of roles, as a roles x skills matrix.
+
+    Scores are coverage ratios: a role's fit is the share of its required
+    skill levels the user already meets, ``1 - sum(max(target - current, 0)) / sum(target)``.
+    """
+
+    def __init__(
+        self,
+        roles: List[dict[str, str]],
+        skills: List[dict[str, str]],
+        targets: np.ndarray,
+        version: str,
+        role_aliases: Optional[List[Iterable[str]]] = None
+    ):
+        targets = np.ascontiguousarray(targets, dtype=np.float32)
+        if targets.shape != (len(roles), len(skills)):
+            raise ValueError(f"Target matrix shape {targets.shape} does not match {len(roles)} roles x {len(skills)} skills")
+        self.version = version
+        self.roles = roles
+        self.skills = skills
+        self.targets = targets
+        # Guard roles without requirements against division by zero (they always fit)
+        self._required_total = np.maximum(targets.sum(axis=1), np.float32(1e-9))
+
+        self._skill_lookup: dict[str, int] = {}
+        for index, skill in enumerate(skills):
+            self._skill_lookup[skill["skill_id"]] = index
+            self._skill_lookup.setdefault(_normalize(skill["skill"]), index)
+
+        self._role_lookup: dict[str, int] = {}
+        for index, role in enumerate(roles):
+            names = [role["role_id"], role["role"], *(role_aliases[index] if role_aliases else ())]
+            for name in names:
+                self._role_lookup.setdefault(_normalize(name), index)
+
+    @classmethod
+    def from_file(cls, path: Path = ROLE_REQUIREMENTS_PATH) -> "RoleRequirements":
+        """Load role requirements, with skill columns taken from the skill taxonomy."""
+        with open(path, encoding="utf-8") as requirements_file:
+            data = json.load(requirements_file)
+        skills = [
+            {"skill_id": skill["skill_id"], "skill": skill["skill"]}
+            for skill in get_skill_matcher().skills
+        ]
+        columns = {skill["skill_id"]: index for index, skill in enumerate(skills)}
+
+        targets = np.zeros((len(data["roles"]), len(skills)), dtype=np.float32)
+        for row, role in enumerate(data["roles"]):
+            for skill_id, level in role["skills"].items():
+                if skill_id not in columns:
+                    raise ValueError(f"Role {role['id']!r} requires unknown skill {skill_id!r}")
+                if not 1 <= level <= MAX_LEVEL:
+                    raise ValueError(f"Role {role['id']!r} has out-of-range level {level} for {skill_id!r}")
+                targets[row, columns[skill_id]] = level
+
+        return cls(
+            roles=[{"role_id": role["id"], "role": role["name"]} for role in data["roles"]],
+            skills=skills,
+            targets=targets,
+            version=data["version"],
+            role_aliases=[role.get("aliases", []) for role in data["roles"]]
+        )
+
+    def find_role(self, name: str) -> Optional[int]:
+        """Row index of a role given its id, name or an alias (case-insensitive)."""
+        return self._role_lookup.get(_normalize(name))
+
+    def skill_vector(self, levels: Mapping[str, float]) -> np.ndarray:
+        """
+        Current skill levels as a vector over the skill columns.
+
+        Args:
+            levels: Level per skill, keyed by skill id or name; unknown skills are ignored
+
+        Returns:
+            float32 array with one entry per skill (0 = no known level);
+            levels are clamped to 0..MAX_LEVEL
+        """
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        for name, level in levels.items():
+            index = self._skill_lookup.get(name)
+            if index is None:
+                index = self._skill_lookup.get(_normalize(name))
+            if index is not None:
+                vector[index] = max(vector[index], min(max(float(level), 0.0), MAX_LEVEL))
+        return vector
+
+    def skill_vector_from_mentions(self, skills: Iterable[dict[str, Any]]) -> np.ndarray:
+        """Skill vector from extracted skills ({"skill_id", "mentions", ...} as in analysis_data)."""
+        mentions: dict[str, int] = {}
+        for skill in skills:
+            mentions[skill["skill_id"]] = mentions.get(skill["skill_id"], 0) + skill.get("mentions", 1)
+        return self.skill_vector({skill_id: level_from_mentions(count) for skill_id, count in mentions.items()})
+
+    def fit_scores(self, current: np.ndarray) -> np.ndarray:
+        """Fit score (0-1) of the skill vector for every role at once."""
+        missing = np.maximum(self.targets - current, 0).sum(axis=1)
+        return 1.0 - missing / self._required_total
+
+    def best_fit_roles(self, current: np.ndarray, top_k: int = 5) -> List[dict[str, Any]]:
+        """The top_k roles by fit score, best first."""
+        return self._rank(self.fit_scores(current), top_k)
+
+    def _rank(self, scores: np.ndarray, top_k: int) -> List[dict[str, Any]]:
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        # Stable tie-break on row order so equal scores rank deterministically
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [
+            {**self.roles[index], "fit_score": round(float(scores[index]), 4)}
+            for index in ranked
+        ]
+
+    def skill_gaps(self, current: np.ndarray, role_index: int) -> List[dict[str, Any]]:
+        """
+        Skills where the vector falls short of a role's targets, largest gap first.
+
+        Returns:
+            List of {"skill", "current_level", "target_level"} - the shape
+            stored under "skill_gaps" in Message.analysis_data; levels are
+            the ones the gap was computed from (fractional levels included)
+        """
+        targets = self.targets[role_index]
+        gaps = targets - current
+        (short,) = np.nonzero(gaps > 0)
+        ranked = short[np.lexsort((short, -targets[short], -gaps[short]))]
+        return [
+            {
+                "skill": self.skills[index]["skill"],
+                "current_level": _level(current[index]),
+                "target_level": _level(targets[index]),
+            }
+            for index in ranked
+        ]
+
+    def analyze(self, current: np.ndarray, role_index: Optional[int] = None, top_k: int = 5) -> dict[str, Any]:
+        """
+        Best-fit roles plus ranked gaps for one role.
+
+        Gaps are computed for role_index if given, otherwise for the best-fit role.
+        """
+        scores = self.fit_scores(current)
+        best_fit = self._rank(scores, top_k)
+        if role_index is None and len(scores):
+            role_index = int(np.argmax(scores))
+        target = None
+        gaps: List[dict[str, Any]] = []
+        if role_index is not None:
+            target = {**self.roles[role_index], "fit_score": round(float(scores[role_index]), 4)}
+            gaps = self.skill_gaps(current, role_index)
+        return {
+            "target_role": target,
+            "skill_gaps": gaps,
+            "best_fit_roles": best_fit,
+            "role_requirements_version": self.version,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_role_requirements() -> RoleRequirements:
+    """Requirements for the bundled roles, loaded on first use (warmed at startup)."""
+    return RoleRequirements.from_file()
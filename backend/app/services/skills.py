@@ -0,0 +1,191 @@
+"""
+Skill extraction over the versioned skill taxonomy (app/data/skill_taxonomy.json).
+
+All skill names and aliases are compiled once into an Aho-Corasick automaton,
+stored as a dense transition table in flat arrays, so a text is scanned in a
+single pass that is linear in its length regardless of how many skills the
+taxonomy holds.
+"""
+import json
+import re
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Tuple
+
+TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace runs (applied to patterns and texts alike)."""
+    return _WHITESPACE.sub(" ", text.lower())
+
+
+class _CharIds(dict):
+    """str.translate table mapping pattern characters to ids and everything else to 0."""
+
+    def __missing__(self, key):
+        return 0
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over a skill taxonomy.
+
+    The automaton is a complete DFA: ``_delta[state + char_id]`` is the next
+    state, with states pre-multiplied by the alphabet size so the scan loop
+    needs one array lookup per character. Characters that appear in no pattern
+    share char id 0. Matches are whole-word, case-insensitive and resolved
+    leftmost-longest (so "C++" wins over "C").
+    """
+
+    def __init__(self, taxonomy: dict[str, Any]):
+        self.taxonomy_version: str = taxonomy["version"]
+        self.skills: List[dict[str, str]] = []
+        patterns: List[str] = []
+        pattern_skills: List[int] = []
+
+        for skill in taxonomy["skills"]:
+            skill_index = len(self.skills)
+            self.skills.append({"skill_id": skill["id"], "skill": skill["name"], "category": skill["category"]})
+            names = list(skill.get("aliases", []))
+            if skill.get("match_name", True):
+                names.insert(0, skill["name"])
+            for name in dict.fromkeys(_normalize(name).strip() for name in names):
+                if name:
+                    patterns.append(name)
+                    pattern_skills.append(skill_index)
+
+        alphabet = sorted({char for pattern in patterns for char in pattern})
+        if len(alphabet) >= 255:
+            raise ValueError("Skill taxonomy uses too many distinct characters")
+        self._char_ids = _CharIds({ord(char): index + 1 for index, char in enumerate(alphabet)})
+        self._alphabet_size = size = len(alphabet) + 1
+
+        self._pattern_skills = array("i", pattern_skills)
+        self._pattern_lengths = array("i", (len(pattern) for pattern in patterns))
+        self._pattern_word_start = bytearray(pattern[0].isalnum() for pattern in patterns)
+        self._pattern_word_end = bytearray(pattern[-1].isalnum() for pattern in patterns)
+
+        # Build the trie (construction only - matching uses the flat arrays below)
+        children: List[dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for pattern_index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                char_id = self._char_ids[ord(char)]
+                if char_id not in children[state]:
+                    children[state][char_id] = len(children)
+                    children.append({})
+                    outputs.append([])
+                state = children[state][char_id]
+            outputs[state].append(pattern_index)
+
+        # Breadth-first failure links, folded into a complete transition table
+        state_count = len(children)
+        delta = array("i", bytes(4 * state_count * size))
+        fail = [0] * state_count
+        queue = []
+        for char_id, child in children[0].items():
+            delta[char_id] = child * size
+            queue.append(child)
+        for state in queue:
+            row = state * size
+            fail_row = fail[state] * size
+            for char_id in range(size):
+                child = children[state].get(char_id)
+                if child is None:
+                    delta[row + char_id] = delta[fail_row + char_id]
+                else:
+                    fail[child] = delta[fail_row + char_id] // size
+                    outputs[child].extend(outputs[fail[child]])
+                    delta[row + char_id] = child * size
+                    queue.append(child)
+        self._delta = delta
+
+        # Outputs per state, flattened: patterns ending at state s are
+        # _outputs[_output_offsets[s]:_output_offsets[s + 1]]
+        self._output_offsets = array("i", [0])
+        self._outputs = array("i")
+        for state_outputs in outputs:
+            self._outputs.extend(state_outputs)
+            self._output_offsets.append(len(self._outputs))
+        self._has_output = bytearray(state_count * size)
+        for state, state_outputs in enumerate(outputs):
+            if state_outputs:
+                self._has_output[state * size] = 1
+
+    @classmethod
+    def from_file(cls, path: Path = TAXONOMY_PATH) -> "SkillMatcher":
+        """Compile the taxonomy stored at path."""
+        with open(path, encoding="utf-8") as taxonomy_file:
+            return cls(json.load(taxonomy_file))
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find skill mentions in text.
+
+        Returns:
+            Non-overlapping (start, end, skill_index) tuples, positions
+            referring to the normalized (lowercased, whitespace-collapsed) text
+        """
+        normalized = _normalize(text)
+        encoded = normalized.translate(self._char_ids).encode("latin-1")
+        delta, has_output, size = self._delta, self._has_output, self._alphabet_size
+
+        candidates = []
+        state = 0
+        for position, char_id in enumerate(encoded):
+            state = delta[state + char_id]
+            if has_output[state]:
+                candidates.append((position, state // size))
+
+        text_length = len(normalized)
+        matches = []
+        for position, state in candidates:
+            end = position + 1
+            for pattern in self._outputs[self._output_offsets[state]:self._output_offsets[state + 1]]:
+                start = end - self._pattern_lengths[pattern]
+                # Whole words only: "go" must not match inside "going"
+                if self._pattern_word_start[pattern] and start > 0 and normalized[start - 1].isalnum():
+                    continue
+                if self._pattern_word_end[pattern] and end < text_length and normalized[end].isalnum():
+                    continue
+                matches.append((start, end, self._pattern_skills[pattern]))
+
+        # Leftmost-longest, non-overlapping
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        covered_until = 0
+        for start, end, skill_index in matches:
+            if start >= covered_until:
+                selected.append((start, end, skill_index))
+                covered_until = end
+        return selected
+
+    def extract(self, text: str) -> List[dict[str, Any]]:
+        """
+        Skills mentioned in text, most mentioned first.
+
+        Returns:
+            List of {"skill", "skill_id", "category", "mentions"} - the shape
+            stored under "skills" in Message.analysis_data
+        """
+        mentions: dict[int, int] = {}
+        for _, _, skill_index in self.find(text):
+            mentions[skill_index] = mentions.get(skill_index, 0) + 1
+        ranked = sorted(mentions.items(), key=lambda item: (-item[1], item[0]))
+        return [{**self.skills[skill_index], "mentions": count} for skill_index, count in ranked]
+
+
+@lru_cache(maxsize=1)
+def get_skill_matcher() -> SkillMatcher:
+    """The matcher for the bundled taxonomy, compiled on first use (warmed at startup)."""
+    return SkillMatcher.from_file()
+
+
+def extract_skills(text: str) -> List[dict[str, Any]]:
+    """Skills mentioned in text, most mentioned first (see SkillMatcher.extract)."""
+    return get_skill_matcher().extract(text)
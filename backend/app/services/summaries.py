@@ -0,0 +1,163 @@
+"""
+Background generation of chat summaries (Chat.context_summary).
+
+Summaries are produced off the request path: the chat endpoints only call
+ChatSummarizer.notify() (no I/O), and a background task picks up due chats
+from the database (see app.db.summary_store for the debounce rule). The
+task runs in the web process (started and drained in the lifespan) or in a
+separate worker process (python -m app.worker).
+"""
+import asyncio
+import contextlib
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.summary_store import due_chats, save_summary, summary_columns_available, unsummarized_messages
+from app.services.llm import summarize_conversation
+
+logger = logging.getLogger(__name__)
+
+# Bound on chats remembered by notify(); beyond it we just poll
+_MAX_HINTS = 10000
+
+
+class ChatSummarizer:
+    """
+    Refreshes the summaries of chats with new messages.
+
+    A chat is summarized once every_messages new messages have arrived, or
+    after it has been idle for idle_seconds. notify() lets a chat that just
+    crossed every_messages be picked up before the next poll.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        every_messages: int,
+        idle_seconds: float,
+        poll_interval: float,
+        batch_size: int,
+        max_messages: int
+    ):
+        self.session_factory = session_factory
+        self.every_messages = every_messages
+        self.idle_seconds = idle_seconds
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_messages = max_messages
+        self._hints: dict[uuid.UUID, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the background task (call from the event loop)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self, chat_id: uuid.UUID, new_messages: int = 1) -> None:
+        """Record new messages in a chat. Never blocks; a no-op unless the task runs here."""
+        if self._task is None:
+            return
+        if len(self._hints) >= _MAX_HINTS:
+            self._hints.clear()
+        pending = self._hints[chat_id] = self._hints.get(chat_id, 0) + new_messages
+        if pending >= self.every_messages:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                while await self.run_once() >= self.batch_size and not self._stopping:
+                    pass
+            except Exception:
+                logger.exception("Chat summary pass failed")
+            self._wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+    async def run_once(self, every_messages: Optional[int] = None, idle_seconds: Optional[float] = None) -> int:
+        """
+        Summarize one batch of due chats.
+
+        Returns:
+            How many chats were summarized
+        """
+        async with self.session_factory() as db:
+            if not await summary_columns_available(db):
+                return 0
+            chats = await due_chats(
+                db,
+                every_messages=every_messages or self.every_messages,
+                idle_seconds=self.idle_seconds if idle_seconds is None else idle_seconds,
+                limit=self.batch_size
+            )
+        summarized = 0
+        for chat in chats:
+            try:
+                await self._summarize(chat)
+                summarized += 1
+            except Exception:
+                logger.exception("Summarizing chat %s failed", chat.chat_id)
+        return summarized
+
+    async def _summarize(self, chat: Row) -> None:
+        async with self.session_factory() as db:
+            # The count may have grown since due_chats: summarize up to the
+            # count read with the messages, not the one in `chat`
+            message_count, messages = await unsummarized_messages(
+                db, chat.chat_id, chat.summary_message_count, self.max_messages
+            )
+            # Don't hold a connection while the summary is generated
+            await db.rollback()
+            if messages:
+                summary = await summarize_conversation(
+                    chat.context_summary,
+                    [(message.sender, message.content) for message in messages]
+                )
+                await save_summary(db, chat.chat_id, summary, chat.summary_message_count, message_count)
+                await db.commit()
+        self._hints.pop(chat.chat_id, None)
+
+    async def stop(self, drain_timeout: float = 0) -> None:
+        """
+        Stop the background task, first summarizing every chat with pending
+        messages (for up to drain_timeout seconds).
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        self._hints.clear()
+        if drain_timeout > 0:
+            try:
+                await asyncio.wait_for(self._drain(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Chat summaries not fully drained within %.1fs", drain_timeout)
+            except Exception:
+                logger.exception("Draining chat summaries failed")
+
+    async def _drain(self) -> None:
+        while await self.run_once(every_messages=1, idle_seconds=0) >= self.batch_size:
+            pass
+
+
+chat_summarizer = ChatSummarizer(
+    AsyncSessionLocal,
+    every_messages=settings.CHAT_SUMMARY_EVERY_MESSAGES,
+    idle_seconds=settings.CHAT_SUMMARY_IDLE_SECONDS,
+    poll_interval=settings.CHAT_SUMMARY_POLL_SECONDS,
+    batch_size=settings.CHAT_SUMMARY_BATCH_SIZE,
+    max_messages=settings.CHAT_SUMMARY_MAX_MESSAGES
+)
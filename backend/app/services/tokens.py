@@ -0,0 +1,78 @@
+"""
+Token counting for model context budgets.
+
+Uses tiktoken's CHAT_CONTEXT_ENCODING when tiktoken is installed, otherwise
+an approximation (about four characters per token for words, one per
+punctuation mark). The tokenizer is loaded once, and counts of texts up to
+_CACHED_TEXT_MAX_CHARS are memoized since the same recent messages are
+counted on every turn (longer texts would pin too much memory in the cache).
+"""
+import re
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# The cache holds at most 8192 texts of up to this many characters
+_CACHED_TEXT_MAX_CHARS = 4096
+
+
+class _ApproximateTokenizer:
+    """Stand-in with the encode/decode shape of a tiktoken encoding."""
+
+    name = "approximate"
+
+    def encode(self, text: str) -> list[str]:
+        tokens = []
+        last_end = 0
+        for match in _TOKEN_PATTERN.finditer(text):
+            piece = match.group()
+            # Leading whitespace belongs to the token, so decode() round-trips
+            prefix = text[last_end:match.start()]
+            last_end = match.end()
+            for offset in range(0, len(piece), 4):
+                tokens.append(prefix + piece[offset:offset + 4])
+                prefix = ""
+        return tokens
+
+    def decode(self, tokens: list[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Any:
+    """The tokenizer, loaded on first use."""
+    try:
+        import tiktoken
+    except ImportError:
+        return _ApproximateTokenizer()
+    return tiktoken.get_encoding(settings.CHAT_CONTEXT_ENCODING)
+
+
+@lru_cache(maxsize=8192)
+def _count_tokens_cached(text: str) -> int:
+    return len(get_tokenizer().encode(text))
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text."""
+    if len(text) > _CACHED_TEXT_MAX_CHARS:
+        return len(get_tokenizer().encode(text))
+    return _count_tokens_cached(text)
+
+
+def truncate_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """
+    Cut text down to at most max_tokens tokens.
+
+    Args:
+        keep_end: Keep the last tokens instead of the first ones
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    tokenizer = get_tokenizer()
+    tokens = tokenizer.encode(text)
+    return tokenizer.decode(tokens[-max_tokens:] if keep_end else tokens[:max_tokens])
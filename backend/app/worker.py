@@ -0,0 +1,49 @@
+"""
+Standalone background worker process.
+
+Runs the background tasks that otherwise run inside each web process - chat
+summaries and batch resume analysis - so they can be scaled and deployed
+separately. Start web processes with CHAT_SUMMARY_WORKER_ENABLED=false and
+RESUME_BATCH_WORKER_ENABLED=false, then:
+
+    python -m app.worker
+
+Both tasks coordinate through the database, so several workers (and web
+processes still running them) can share the work.
+"""
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.db.session import async_engine
+from app.services.resume_batch import resume_batch_worker
+from app.services.skills import get_skill_matcher
+from app.services.summaries import chat_summarizer
+
+logger = logging.getLogger("app.worker")
+
+
+async def run() -> None:
+    """Run the background tasks until SIGINT/SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    
+    get_skill_matcher()
+    chat_summarizer.start()
+    resume_batch_worker.start()
+    logger.info("Worker started")
+    
+    await stop.wait()
+    
+    logger.info("Worker stopping")
+    await chat_summarizer.stop(drain_timeout=settings.CHAT_SUMMARY_DRAIN_SECONDS)
+    await resume_batch_worker.stop()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(run())
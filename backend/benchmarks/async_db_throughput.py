@@ -0,0 +1,97 @@
+"""
+Concurrent throughput of async endpoints: blocking sync session vs get_async_db.
+
+Two routes run the same simulated slow query (pg_sleep on PostgreSQL, a
+registered sleep() function on SQLite):
+
+- "before": an ``async def`` handler using the sync ``SessionLocal`` - the
+  pattern the chat/analysis/auth endpoints used, which blocks the event loop
+- "after": an ``async def`` handler using ``get_async_db``
+
+Requests are driven in-process over ASGI, so the numbers only reflect how
+well the handlers share one event loop.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_db_throughput --requests 200 --concurrency 50 --query-ms 20
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import engine, async_engine, SessionLocal, get_async_db
+
+
+def _register_sqlite_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000.0) or 0)
+
+
+def _slow_query(dialect_name: str, query_ms: int):
+    if dialect_name == "postgresql":
+        return text("SELECT pg_sleep(:seconds)").bindparams(seconds=query_ms / 1000.0)
+    return text("SELECT sleep(:ms)").bindparams(ms=query_ms)
+
+
+def build_app(query_ms: int) -> FastAPI:
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _register_sqlite_sleep)
+        event.listen(async_engine.sync_engine, "connect", _register_sqlite_sleep)
+
+    app = FastAPI()
+
+    @app.get("/before")
+    async def blocking_session():
+        with SessionLocal() as db:
+            db.execute(_slow_query(engine.dialect.name, query_ms))
+        return {"ok": True}
+
+    @app.get("/after")
+    async def async_session(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(_slow_query(async_engine.dialect.name, query_ms))
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        # Warm up the connection pool
+        await asyncio.gather(*(one() for _ in range(min(concurrency, requests))))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {"path": path, "requests": requests, "seconds": round(elapsed, 3),
+            "requests_per_second": round(requests / elapsed, 1)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    app = build_app(args.query_ms)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    for path in ("/before", "/after"):
+        result = await run(app, path, args.requests, args.concurrency)
+        print(f"{path:<8} {result['requests']} requests in {result['seconds']}s "
+              f"-> {result['requests_per_second']} req/s")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
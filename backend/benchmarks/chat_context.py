@@ -0,0 +1,91 @@
+"""
+Context building cost per chat turn versus chat length.
+
+Seeds chats of increasing length and times, per turn, loading the whole
+transcript (chat.messages) against build_chat_context (rolling summary +
+last CHAT_CONTEXT_MAX_MESSAGES messages via the tail index).
+
+Usage (from the backend directory):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.chat_context --lengths 100 1000 10000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import Chat, Message, User
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.services.context import build_chat_context
+
+
+def seed_chat(length: int) -> uuid.UUID:
+    """Insert a chat with length alternating USER/AI messages."""
+    Base.metadata.create_all(bind=engine)
+    user_id, chat_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime.utcnow() - timedelta(seconds=length)
+    with SessionLocal() as db:
+        db.execute(insert(User).values(user_id=user_id, email=f"bench-{user_id.hex[:8]}@example.com", hashed_password="unused"))
+        db.execute(insert(Chat).values(chat_id=chat_id, user_id=user_id, started_at=start, context_summary="Discussed Python and SQL."))
+        db.execute(insert(Message), [
+            {
+                "message_id": uuid.uuid4(),
+                "chat_id": chat_id,
+                "sender": "USER" if index % 2 == 0 else "AI",
+                "content": f"Message {index} about career paths in data engineering and analytics.",
+                "created_at": start + timedelta(seconds=index),
+            }
+            for index in range(length)
+        ])
+        db.commit()
+    return chat_id
+
+
+async def time_ms(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main_async(lengths: list[int], repeat: int) -> None:
+    for length in lengths:
+        chat_id = seed_chat(length)
+
+        async def full_transcript():
+            async with AsyncSessionLocal() as db:
+                chat = await db.scalar(select(Chat).options(selectinload(Chat.messages)).where(Chat.chat_id == chat_id))
+                return "\n".join(message.content for message in chat.messages)
+
+        async def rolling_context():
+            async with AsyncSessionLocal() as db:
+                return await build_chat_context(db, chat_id, "What should I learn next?", "Discussed Python and SQL.")
+
+        full = await time_ms(full_transcript, repeat)
+        rolling = await time_ms(rolling_context, repeat)
+        context = await rolling_context()
+        print(f"{length:>7,} messages: full transcript median {statistics.median(full):8.2f} ms | "
+              f"context median {statistics.median(rolling):6.2f} ms "
+              f"({len(context['messages'])} messages, {context['token_count']} tokens)")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(f"K = {settings.CHAT_CONTEXT_MAX_MESSAGES}, budget = {settings.CHAT_CONTEXT_TOKEN_BUDGET} tokens")
+    asyncio.run(main_async(args.lengths, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Commits and throughput per POST /chat/chat turn.
+
+Drives the real app in-process over ASGI with concurrent chat turns and
+counts COMMITs on the async engine, once with the default single-transaction
+write path and once with the write-behind batcher
+(CHAT_WRITE_BEHIND_ENABLED).
+
+Usage (from the backend directory):
+    python -m benchmarks.chat_turn_commits --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.models import User
+from app.db.session import engine, async_engine, SessionLocal
+from app.main import create_app
+
+
+def seed_user() -> str:
+    """Create a benchmark user and return a valid access token cookie value."""
+    Base.metadata.create_all(bind=engine)
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    with SessionLocal() as db:
+        db.add(User(email=email, hashed_password="unused", full_name="Benchmark"))
+        db.commit()
+    return f"Bearer {create_access_token({'sub': email})}"
+
+
+async def run(requests: int, concurrency: int, token: str, write_behind: bool) -> dict:
+    settings.CHAT_WRITE_BEHIND_ENABLED = write_behind
+    commits = 0
+
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    event.listen(async_engine.sync_engine, "commit", count_commit)
+    app = create_app()
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", cookies={"access_token": token}
+            ) as client:
+                async def turn(i: int):
+                    async with semaphore:
+                        response = await client.post("/api/v1/chat/chat", json={"message": f"question {i}"})
+                        response.raise_for_status()
+
+                # Warm up caches and the connection pool
+                await turn(0)
+                await asyncio.gather(*(turn(i) for i in range(concurrency)))
+                commits = 0
+
+                start = time.perf_counter()
+                await asyncio.gather(*(turn(i) for i in range(requests)))
+                elapsed = time.perf_counter() - start
+    finally:
+        event.remove(async_engine.sync_engine, "commit", count_commit)
+
+    return {
+        "mode": "write-behind" if write_behind else "single transaction",
+        "requests": requests,
+        "commits": commits,
+        "commits_per_request": round(commits / requests, 3),
+        "requests_per_second": round(requests / elapsed, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    token = seed_user()
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    for write_behind in (False, True):
+        result = await run(args.requests, args.concurrency, token, write_behind)
+        print(f"{result['mode']:<20} {result['commits']} commits / {result['requests']} requests "
+              f"= {result['commits_per_request']} per request, {result['requests_per_second']} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
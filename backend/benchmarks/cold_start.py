@@ -0,0 +1,109 @@
+"""
+Cold start of the API: import time, startup and first-request latency.
+
+Each sample is a fresh Python process that imports the Vercel entry point
+(api/index.py), runs the app's startup and sends its first and second
+GET /api/v1/users/me over ASGI. The serverless profile (SERVERLESS=true, the
+entry point's default) is compared with the regular server profile. The
+schema is created once up front, as migrations would, so the serverless
+profile can run without create_all.
+
+Usage (from the backend directory):
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+PROFILES = {"serverless": "true", "server": "false"}
+METRICS = ("import_ms", "startup_ms", "first_request_ms", "second_request_ms")
+
+
+def measure() -> dict:
+    """Run in the child process: one cold start, timed."""
+    import asyncio
+    import httpx
+
+    started = time.perf_counter()
+    import api.index
+    imported = time.perf_counter()
+
+    async def requests() -> dict:
+        app = api.index.app
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                cookies={"access_token": os.environ["COLD_START_TOKEN"]}
+            ) as client:
+                timings = []
+                for _ in range(2):
+                    start = time.perf_counter()
+                    response = await client.get("/api/v1/users/me")
+                    response.raise_for_status()
+                    timings.append(time.perf_counter() - start)
+        return {
+            "import_ms": (imported - started) * 1000,
+            "startup_ms": (ready - imported) * 1000,
+            "first_request_ms": timings[0] * 1000,
+            "second_request_ms": timings[1] * 1000,
+        }
+
+    return asyncio.run(requests())
+
+
+def seed_user() -> str:
+    """Create the schema and a benchmark user; return its access token cookie value."""
+    from app.core.security import create_access_token
+    from app.db.base import Base
+    from app.db import models
+    from app.db.session import engine, SessionLocal
+
+    Base.metadata.create_all(bind=engine)
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    with SessionLocal() as db:
+        db.add(models.User(email=email, hashed_password="unused", full_name="Benchmark"))
+        db.commit()
+    return f"Bearer {create_access_token({'sub': email})}"
+
+
+def sample(profile: str, token: str) -> dict:
+    env = {**os.environ, "SERVERLESS": PROFILES[profile], "COLD_START_TOKEN": token}
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--measure"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # Startup messages of the server profile come first
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts per profile")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure()))
+        return
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/apex_cold_start.db")
+    token = seed_user()
+    print(f"Database: {os.environ['DATABASE_URL']}, median (min-max) of {args.runs} cold starts")
+    print(f"{'profile':<12}" + "".join(f"{metric:>24}" for metric in METRICS))
+    for profile in PROFILES:
+        samples = [sample(profile, token) for _ in range(args.runs)]
+        cells = []
+        for metric in METRICS:
+            values = [s[metric] for s in samples]
+            cells.append(f"{statistics.median(values):.1f} ({min(values):.0f}-{max(values):.0f})")
+        print(f"{profile:<12}" + "".join(f"{cell:>24}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
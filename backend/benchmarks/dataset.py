@@ -0,0 +1,358 @@
+"""
+Synthetic dataset: users, chats, messages (with analysis_data) and skill gap rollups.
+
+Chats per user and messages per chat follow log-normal distributions with
+the given means; --chat-skew and --message-skew (their sigma, 0 = everyone
+gets the mean) control how heavy the heavy users and how long the long
+chats are. AI messages carry analysis_data shaped like the chat endpoint's
+(skills, skill gaps for a role, ROI), --analysis-share of them with skills
+and gaps. Every user can log in with --password.
+
+Rows are generated by streams per table: each user's and each chat's
+content comes from its own random generator seeded from --seed, so the
+same seed always produces the same rows (ids included; only the password
+hash's salt differs), and no table is ever held in memory. PostgreSQL loads them with COPY, SQLite with
+executemany in batches; the skill gap rollups are then computed from the
+messages in SQL.
+
+Usage (from the backend directory):
+    python -m benchmarks.dataset --users 10000 --chats-per-user 8 --messages-per-chat 12 --seed 42 --reset
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import JSON, insert
+
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.models import Chat, Message, User
+from app.db.session import async_engine, engine
+from app.db.skill_gap_store import rebuild_rollups
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "app" / "data"
+
+USER_QUESTIONS = (
+    "How do I move from {role} into {target}?",
+    "I have {years} years of experience with {skill}. What should I learn next?",
+    "Is {skill} worth learning for a {target} role?",
+    "Which certifications help most for {target} positions?",
+    "How long would it take me to get good enough at {skill} to switch jobs?",
+    "What salary can I expect as a {target} with my background?",
+)
+AI_ANSWERS = (
+    "Based on your experience with {skill}, the biggest gaps for a {target} role are {gaps}.",
+    "Focus on {gaps} first; most {target} job postings list them as requirements.",
+    "A {target} typically needs {gaps}. Your {skill} background covers part of that.",
+    "With a structured plan of about {months} months you could close the gaps in {gaps}.",
+)
+
+
+class DatasetSpec:
+    """
+    Size and shape of a synthetic dataset.
+
+    Args:
+        users: Number of users
+        chats_per_user: Mean chats per user
+        chat_skew: Sigma of the log-normal chats per user (0 = all equal)
+        messages_per_chat: Mean messages per chat (one USER + one AI message per turn)
+        message_skew: Sigma of the log-normal messages per chat (0 = all equal)
+        max_messages_per_chat: Upper bound of a chat's length
+        analysis_share: Share of AI messages whose analysis has skills and gaps
+        days: Span of days over which chats start (ending on `end`)
+        seed: Seed of every random choice
+        password: Every user's password
+        end: Latest chat start
+    """
+
+    def __init__(
+        self,
+        users: int,
+        chats_per_user: float = 8,
+        chat_skew: float = 1.0,
+        messages_per_chat: float = 12,
+        message_skew: float = 0.8,
+        max_messages_per_chat: int = 1000,
+        analysis_share: float = 0.6,
+        days: int = 365,
+        seed: int = 42,
+        password: str = "password",
+        end: datetime = datetime(2026, 10, 1)
+    ):
+        self.users = users
+        self.chats_per_user = chats_per_user
+        self.chat_skew = chat_skew
+        self.messages_per_chat = messages_per_chat
+        self.message_skew = message_skew
+        self.max_messages_per_chat = max_messages_per_chat
+        self.analysis_share = analysis_share
+        self.days = days
+        self.seed = seed
+        self.password = password
+        self.end = end
+
+
+def _lognormal_count(rng: random.Random, mean: float, sigma: float, low: int, high: int) -> int:
+    if sigma <= 0:
+        value = mean
+    else:
+        # mu chosen so that the distribution's mean is `mean`
+        value = rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+    return max(low, min(high, round(value)))
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class SyntheticDataset:
+    """Deterministic row streams (dicts keyed by column) for a DatasetSpec."""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        taxonomy = json.loads((DATA_DIR / "skill_taxonomy.json").read_text())
+        requirements = json.loads((DATA_DIR / "role_requirements.json").read_text())
+        self.skills = {skill["id"]: skill for skill in taxonomy["skills"]}
+        self.roles = [role for role in requirements["roles"] if role["skills"]]
+        self.hashed_password = get_password_hash(spec.password)
+
+    def _rng(self, *path: Any) -> random.Random:
+        # String seeds are hashed with SHA-512: stable across runs and processes
+        return random.Random("/".join(map(str, (self.spec.seed, *path))))
+
+    def user_plan(self, u: int) -> Tuple[dict, List[Tuple[uuid.UUID, datetime, int]]]:
+        """User u's row and its chats as (chat_id, started_at, message count), oldest first."""
+        spec = self.spec
+        rng = self._rng("user", u)
+        user_id = _uuid(rng)
+        chats = _lognormal_count(rng, spec.chats_per_user, spec.chat_skew, 0, 100 * max(1, round(spec.chats_per_user)))
+        span = spec.days * 86400
+        starts = sorted(rng.uniform(0, span) for _ in range(chats))
+        first = starts[0] if starts else rng.uniform(0, span)
+        created_at = spec.end - timedelta(seconds=span - first + rng.uniform(3600, 30 * 86400))
+        user = {
+            "user_id": user_id,
+            "email": f"user{u}-{spec.seed}@example.com",
+            "hashed_password": self.hashed_password,
+            "full_name": f"User {u}",
+            "is_active": rng.random() > 0.02,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        plans = []
+        for start in starts:
+            turns = _lognormal_count(rng, spec.messages_per_chat / 2, spec.message_skew, 1, max(1, spec.max_messages_per_chat // 2))
+            plans.append((_uuid(rng), spec.end - timedelta(seconds=span - start), turns * 2))
+        return user, plans
+
+    def _message_times(self, u: int, c: int, started_at: datetime, count: int) -> Iterator[datetime]:
+        # Own generator, so the chat rows can find a chat's last message time
+        # without generating its content
+        rng = self._rng("times", u, c)
+        at = started_at
+        for i in range(count):
+            yield at
+            at += timedelta(seconds=rng.uniform(2, 30) if i % 2 == 0 else rng.uniform(20, 900))
+
+    def users(self) -> Iterator[dict]:
+        for u in range(self.spec.users):
+            yield self.user_plan(u)[0]
+
+    def chats(self) -> Iterator[dict]:
+        for u in range(self.spec.users):
+            user, plans = self.user_plan(u)
+            rng = self._rng("chats", u)
+            for c, (chat_id, started_at, count) in enumerate(plans):
+                last = None
+                for last in self._message_times(u, c, started_at, count):
+                    pass
+                ongoing = c == len(plans) - 1 and rng.random() < 0.3
+                summarized = 0 if ongoing else count
+                yield {
+                    "chat_id": chat_id,
+                    "user_id": user["user_id"],
+                    "started_at": started_at,
+                    "ended_at": None if ongoing else last,
+                    "context_summary": f"Career guidance conversation ({count} messages)" if summarized else None,
+                    "message_count": count,
+                    "last_message_at": last,
+                    "summary_message_count": summarized,
+                    "summary_updated_at": last if summarized else None,
+                    "chat_metadata": {"channel": rng.choice(("web", "web", "mobile")), "topic": "career_guidance"},
+                }
+
+    def messages(self) -> Iterator[dict]:
+        for u in range(self.spec.users):
+            _, plans = self.user_plan(u)
+            for c, (chat_id, started_at, count) in enumerate(plans):
+                rng = self._rng("messages", u, c)
+                role, target = rng.sample(self.roles, 2)
+                skill = self.skills.get(rng.choice(list(role["skills"])), {"name": "Python"})["name"]
+                for i, created_at in enumerate(self._message_times(u, c, started_at, count)):
+                    message = {"message_id": _uuid(rng), "chat_id": chat_id, "created_at": created_at}
+                    if i % 2 == 0:
+                        message["sender"] = "USER"
+                        message["content"] = rng.choice(USER_QUESTIONS).format(
+                            role=role["name"], target=target["name"], skill=skill, years=rng.randint(1, 15)
+                        )
+                        message["analysis_data"] = None
+                    else:
+                        analysis = self._analysis(rng, target)
+                        gaps = ", ".join(gap["skill"] for gap in analysis["skill_gaps"][:3]) or "the fundamentals"
+                        message["sender"] = "AI"
+                        message["content"] = rng.choice(AI_ANSWERS).format(
+                            skill=skill, target=target["name"], gaps=gaps, months=rng.randint(3, 18)
+                        )
+                        message["analysis_data"] = analysis
+                    yield message
+
+    def _analysis(self, rng: random.Random, target: dict) -> dict:
+        """analysis_data shaped like app.services.llm.build_analysis_data's."""
+        if rng.random() >= self.spec.analysis_share:
+            return {"skills": [], "skill_gaps": [], "roi_calculation": None}
+        mentioned = rng.sample(list(self.skills), rng.randint(1, 5))
+        levels = {skill_id: rng.randint(1, 3) for skill_id in mentioned}
+        skill_gaps = [
+            {"skill": self.skills[skill_id]["name"], "current_level": levels.get(skill_id, 0), "target_level": level}
+            for skill_id, level in target["skills"].items()
+            if skill_id in self.skills and levels.get(skill_id, 0) < level
+        ]
+        investment = rng.choice((1000.0, 2500.0, 5000.0, 10000.0))
+        expected_return = round(investment * rng.uniform(0.5, 40), 2)
+        return {
+            "skills": [
+                {"skill_id": skill_id, "skill": self.skills[skill_id]["name"],
+                 "category": self.skills[skill_id]["category"], "mentions": rng.randint(1, 3)}
+                for skill_id in mentioned
+            ],
+            "skill_gaps": sorted(skill_gaps, key=lambda gap: gap["current_level"] - gap["target_level"]),
+            "roi_calculation": {
+                "investment": investment,
+                "expected_return": expected_return,
+                "roi_percentage": round((expected_return - investment) / investment * 100, 1),
+                "payback_months": round(rng.uniform(2, 36), 1),
+                "target_role": target["name"],
+            },
+        }
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+async def _copy(connection, table, rows: Iterable[dict]) -> int:
+    """COPY rows into table as they are generated; returns the row count."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    # The columns the stream fills; the others keep their defaults
+    columns = list(first)
+    json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+    count = 0
+
+    def records() -> Iterator[tuple]:
+        nonlocal count
+        for row in itertools.chain((first,), rows):
+            count += 1
+            yield tuple(
+                json.dumps(row[column]) if column in json_columns and row[column] is not None else row[column]
+                for column in columns
+            )
+
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(table.name, columns=columns, records=records())
+    return count
+
+
+async def load(dataset: SyntheticDataset, batch_size: int = 5000, progress: bool = False) -> Dict[str, int]:
+    """
+    Load the dataset into the application database in one transaction and
+    rebuild the skill gap rollups from it.
+
+    Returns:
+        Rows loaded per table
+    """
+    streams = (
+        (User.__table__, dataset.users()),
+        (Chat.__table__, dataset.chats()),
+        (Message.__table__, dataset.messages()),
+    )
+    counts = {}
+    async with async_engine.begin() as connection:
+        dialect = connection.dialect.name
+        for table, rows in streams:
+            started = time.perf_counter()
+            if dialect == "postgresql":
+                counts[table.name] = await _copy(connection, table, rows)
+            else:
+                counts[table.name] = 0
+                for batch in _batches(rows, batch_size):
+                    await connection.execute(insert(table), batch)
+                    counts[table.name] += len(batch)
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"{table.name:<10}{counts[table.name]:>12} rows {elapsed:8.1f} s "
+                      f"({counts[table.name] / elapsed if elapsed else 0:,.0f} rows/s)")
+        started = time.perf_counter()
+        if await rebuild_rollups(connection) and progress:
+            print(f"{'rollups':<10}{'':>12}      {time.perf_counter() - started:8.1f} s")
+    return counts
+
+
+def prepare_schema(reset: bool) -> None:
+    """Create the schema (dropping every table first with `reset`)."""
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chats-per-user", type=float, default=8, help="Mean chats per user")
+    parser.add_argument("--chat-skew", type=float, default=1.0, help="Log-normal sigma of chats per user (heavy users)")
+    parser.add_argument("--messages-per-chat", type=float, default=12, help="Mean messages per chat")
+    parser.add_argument("--message-skew", type=float, default=0.8, help="Log-normal sigma of messages per chat (long chats)")
+    parser.add_argument("--max-messages-per-chat", type=int, default=1000)
+    parser.add_argument("--analysis-share", type=float, default=0.6, help="Share of AI messages with skills and gaps")
+    parser.add_argument("--days", type=int, default=365, help="Span of chat start times")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password", help="Every user's password")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany (SQLite)")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    args = parser.parse_args()
+
+    spec = DatasetSpec(
+        users=args.users, chats_per_user=args.chats_per_user, chat_skew=args.chat_skew,
+        messages_per_chat=args.messages_per_chat, message_skew=args.message_skew,
+        max_messages_per_chat=args.max_messages_per_chat, analysis_share=args.analysis_share,
+        days=args.days, seed=args.seed, password=args.password
+    )
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}, seed {args.seed}")
+    prepare_schema(args.reset)
+
+    async def run() -> Dict[str, int]:
+        try:
+            return await load(SyntheticDataset(spec), args.batch_size, progress=True)
+        finally:
+            await async_engine.dispose()
+
+    started = time.perf_counter()
+    counts = asyncio.run(run())
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
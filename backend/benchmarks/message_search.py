@@ -0,0 +1,181 @@
+"""
+Message search latency on a large synthetic dataset.
+
+Seeds --messages messages (default 1,000,000) spread over --users users,
+with one heavy user owning --heavy-share of them, then times GET
+/chat/search's query (app.db.search_store: FTS5 on SQLite, tsvector + GIN
+on PostgreSQL) against finding every match of the user with LIKE
+(unranked), for a common term, a rare term and a two-term query.
+
+Seeding takes a few minutes for a million messages; an already seeded
+database is reused (pass --reseed to start over).
+
+Usage (from the backend directory):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.message_search --messages 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.db.base import Base
+from app.db.models import Chat, Message, User
+from app.db.search_store import search_messages
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+BATCH_SIZE = 10_000
+MESSAGES_PER_CHAT = 50
+
+# Zipf-like vocabulary: early words are common, later ones rare
+VOCABULARY = (
+    "career job role team work learn skill project experience growth salary interview "
+    "python sql data analytics cloud engineer developer manager design product testing "
+    "kubernetes terraform docker react typescript java golang rust spark airflow "
+    "mentorship certification portfolio negotiation leadership architecture security "
+    "bioinformatics cryptography compilers firmware haskell erlang quantum fortran"
+).split()
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+QUERIES = {"common": "python", "rare": "fortran", "two terms": "cloud security"}
+
+
+def seed(messages: int, users: int, heavy_share: float, seed_value: int) -> list[uuid.UUID]:
+    """Insert the synthetic users, chats and messages; returns the user ids, heavy user first."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed_value)
+    user_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(users)]
+    start = datetime.utcnow() - timedelta(days=365)
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"user_id": user_id, "email": f"search-{user_id.hex[:12]}@example.com", "hashed_password": "unused"}
+            for user_id in user_ids
+        ])
+        chats, rows = [], []
+        chat_id = None
+        for index in range(messages):
+            if index % MESSAGES_PER_CHAT == 0:
+                chat_id = uuid.UUID(int=rng.getrandbits(128))
+                owner = user_ids[0] if rng.random() < heavy_share else rng.choice(user_ids[1:])
+                chats.append({"chat_id": chat_id, "user_id": owner, "started_at": start})
+            words = rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(8, 40))
+            rows.append({
+                "message_id": uuid.UUID(int=rng.getrandbits(128)),
+                "chat_id": chat_id,
+                "sender": "USER" if index % 2 == 0 else "AI",
+                "content": " ".join(words).capitalize() + ".",
+                "created_at": start + timedelta(seconds=index),
+            })
+            if len(rows) == BATCH_SIZE or index == messages - 1:
+                db.execute(insert(Chat), chats)
+                db.execute(insert(Message), rows)
+                db.commit()
+                chats, rows = [], []
+    return user_ids
+
+
+def existing_users(messages: int) -> list[uuid.UUID]:
+    """User ids of an already seeded dataset of at least this many messages (else empty), heavy user first."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if db.scalar(select(func.count()).select_from(Message)) < messages:
+            return []
+        return list(db.scalars(
+            select(Chat.user_id)
+            .join(User, User.user_id == Chat.user_id)
+            .where(User.email.like("search-%"))
+            .group_by(Chat.user_id)
+            .order_by(func.count().desc())
+        ))
+
+
+async def time_ms(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    return f"median {statistics.median(timings):8.2f} ms, p95 {p95:8.2f} ms"
+
+
+async def run_queries(label: str, user_ids: list[uuid.UUID], repeat: int, limit: int) -> None:
+    print(f"{label}:")
+    for name, query in QUERIES.items():
+        users = itertools.cycle(user_ids)
+
+        async def first_page():
+            async with AsyncSessionLocal() as db:
+                return await search_messages(db, next(users), query, limit + 1)
+
+        async def third_page():
+            user_id = next(users)
+            async with AsyncSessionLocal() as db:
+                hits = await search_messages(db, user_id, query, limit + 1)
+                for _ in range(2):
+                    if len(hits) <= limit:
+                        break
+                    last = hits[limit - 1]
+                    hits = await search_messages(db, user_id, query, limit + 1, after=(last["score"], last["message_id"]))
+                return hits
+
+        # What ranking without an index costs: every match has to be found first
+        async def like_scan():
+            async with AsyncSessionLocal() as db:
+                terms = [Message.content.ilike(f"%{term}%") for term in query.split()]
+                return (await db.execute(
+                    select(Message.message_id, Message.content)
+                    .join(Chat, Chat.chat_id == Message.chat_id)
+                    .where(Chat.user_id == next(users), *terms)
+                )).all()
+
+        print(f"  {name:>9} ({query!r}):")
+        print(f"      search, first page  {summary(await time_ms(first_page, repeat))}")
+        print(f"      search, 3 pages     {summary(await time_ms(third_page, repeat))}")
+        print(f"      LIKE, all matches   {summary(await time_ms(like_scan, repeat))}")
+
+
+async def main_async(user_ids: list[uuid.UUID], repeat: int, limit: int) -> None:
+    heavy, typical = user_ids[0], user_ids[1:]
+    async with AsyncSessionLocal() as db:
+        heavy_messages = await db.scalar(
+            select(func.count()).select_from(Message).join(Chat, Chat.chat_id == Message.chat_id).where(Chat.user_id == heavy)
+        )
+    rng = random.Random(0)
+    await run_queries("Typical users", rng.sample(typical, min(repeat, len(typical))), repeat, limit)
+    await run_queries(f"Heavy user ({heavy_messages:,} messages)", [heavy], repeat, limit)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--heavy-share", type=float, default=0.1, help="Share of the messages owned by the heavy user")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="Seed even if the database already has the dataset")
+    args = parser.parse_args()
+
+    user_ids = [] if args.reseed else existing_users(args.messages)
+    if not user_ids:
+        if args.reseed:
+            Base.metadata.drop_all(bind=engine)
+        start = time.perf_counter()
+        user_ids = seed(args.messages, args.users, args.heavy_share, args.seed)
+        print(f"Seeded {args.messages:,} messages for {args.users:,} users in {time.perf_counter() - start:.1f}s")
+    print(f"{engine.dialect.name}, {args.messages:,} messages, {len(user_ids):,} users, page size {args.limit}")
+    asyncio.run(main_async(user_ids, args.repeat, args.limit))
+
+
+if __name__ == "__main__":
+    main()
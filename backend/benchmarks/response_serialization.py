@@ -0,0 +1,130 @@
+"""
+Read and serialization time of a 5k-message chat transcript.
+
+Loads every message of one chat from the database and encodes it as a
+MessagePage, comparing:
+- orm: ORM objects through FastAPI's response_model path (validation with
+  from_attributes, jsonable_encoder, stdlib json) - the previous read path;
+- adapter: columns as row dicts, validated and encoded by a precompiled
+  TypeAdapter (the fallback without orjson);
+- orjson: columns as row dicts encoded by orjson (app.core.responses).
+
+Usage (from the backend directory):
+    python -m benchmarks.response_serialization --messages 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/apex_serialization.db")
+
+from app.core import responses
+from app.core.responses import model_fields, model_response, row_dicts
+from app.db.base import Base
+from app.db.models import Chat, Message, User
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.schemas.chat import MessagePage, MessageRead
+
+
+def analysis_data(i: int) -> dict:
+    """A chat turn's analysis_data, shaped like build_analysis_data's."""
+    return {
+        "skills": [{"name": f"skill-{(i + k) % 40}", "level": k % 5 + 1, "evidence": ["resume", "chat"]} for k in range(6)],
+        "skill_gaps": [{"skill": f"skill-{(i + k) % 40}", "current_level": 2, "target_level": 4, "priority": 0.7} for k in range(3)],
+        "roi_calculation": {"median_roi": 1.42, "p10": 0.31, "p50": 1.42, "p90": 2.87, "payback_months": 14.5},
+    }
+
+
+def seed_chat(messages: int) -> uuid.UUID:
+    Base.metadata.create_all(bind=engine)
+    user_id, chat_id = uuid.uuid4(), uuid.uuid4()
+    started = datetime(2026, 1, 1)
+    with SessionLocal() as db:
+        db.add(User(user_id=user_id, email=f"bench-{user_id.hex[:8]}@example.com", hashed_password="unused"))
+        db.add(Chat(chat_id=chat_id, user_id=user_id, started_at=started))
+        db.flush()
+        db.execute(Message.__table__.insert(), [
+            {
+                "message_id": uuid.uuid4(), "chat_id": chat_id,
+                "sender": "AI" if i % 2 else "USER",
+                "content": f"Message {i}: " + "how do I move from analytics into data engineering? " * 6,
+                "created_at": started + timedelta(seconds=i),
+                "analysis_data": analysis_data(i) if i % 2 else None,
+            }
+            for i in range(messages)
+        ])
+        db.commit()
+    return chat_id
+
+
+async def orm_path(chat_id: uuid.UUID, field) -> bytes:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Message).where(Message.chat_id == chat_id).order_by(Message.created_at, Message.message_id))
+        page = MessagePage(items=[MessageRead.model_validate(message) for message in result.scalars().all()])
+    content = await serialize_response(field=field, response_content=page, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def row_path(chat_id: uuid.UUID, adapter: TypeAdapter) -> bytes:
+    columns = [getattr(Message, field) for field in model_fields(MessageRead)]
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(*columns).where(Message.chat_id == chat_id).order_by(Message.created_at, Message.message_id))
+        messages = row_dicts(result)
+    return model_response(adapter, {"items": messages, "next_cursor": None}).body
+
+
+async def run(chat_id: uuid.UUID, repeat: int) -> None:
+    field = create_response_field(name="Response_benchmark", type_=MessagePage)
+    adapter = TypeAdapter(MessagePage)
+    orjson = responses.orjson
+
+    async def adapter_path() -> bytes:
+        responses.orjson = None
+        try:
+            return await row_path(chat_id, adapter)
+        finally:
+            responses.orjson = orjson
+
+    paths = {"orm": lambda: orm_path(chat_id, field), "adapter": adapter_path}
+    if orjson is not None:
+        paths["orjson"] = lambda: row_path(chat_id, adapter)
+    else:
+        print("orjson is not installed; skipping the orjson path")
+
+    bodies = {}
+    for name, path in paths.items():
+        bodies[name] = await path()  # warm up
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await path()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<8} median {statistics.median(timings):7.1f} ms  min {min(timings):7.1f} ms  "
+              f"({len(bodies[name]) / 1e6:.1f} MB)")
+    print("identical bodies:", len(set(bodies.values())) == 1)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    chat_id = seed_chat(args.messages)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}, {args.messages} messages")
+    asyncio.run(run(chat_id, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
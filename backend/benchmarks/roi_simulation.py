@@ -0,0 +1,54 @@
+"""
+Monte Carlo ROI simulation latency.
+
+Simulates --candidates candidate investments (cycling through the bundled
+roles) with --paths paths each in one batched call, and reports latency
+over --repeat runs. A fixed seed is used so every run does the same work.
+
+Usage (from the backend directory):
+    python -m benchmarks.roi_simulation --paths 100000 --candidates 1
+    python -m benchmarks.roi_simulation --paths 100000 --candidates 10
+"""
+import argparse
+import statistics
+import time
+
+from app.services.roi import get_roi_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--candidates", type=int, default=1)
+    parser.add_argument("--horizon-years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = get_roi_model()
+    role_count = len(model.requirements.roles)
+    candidates = [
+        {"role_index": index % role_count, "investment_amount": 2000 + 1000 * index}
+        for index in range(args.candidates)
+    ]
+
+    # Deterministic seed: identical inputs give identical results
+    first = model.simulate(candidates, args.paths, args.horizon_years, seed=42)
+    assert first == model.simulate(candidates, args.paths, args.horizon_years, seed=42)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        model.simulate(candidates, args.paths, args.horizon_years, seed=42)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.candidates} candidate(s) x {args.paths:,} paths x {args.horizon_years} years")
+    print(f"median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms")
+    for result in first[:3]:
+        payback = result["percentiles"]["payback_months"]["p50"]
+        print(f"  {result['target_role']['role']}: placed {result['placement_probability']:.0%}, "
+              f"expected ROI {result['roi_percentage']}%, "
+              f"payback p50 {'never' if payback is None else f'{payback} months'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Skill gap scoring latency across many target roles.
+
+Builds --roles synthetic roles over the real skill taxonomy (each requiring
+--skills-per-role skills at levels 1-5), then times scoring one user's skill
+vector against all of them with the vectorized RoleRequirements path and,
+for comparison, a per-role Python loop.
+
+Usage (from the backend directory):
+    python -m benchmarks.skill_gap_scoring --roles 10000 --repeat 50
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.services.skill_gaps import RoleRequirements
+from app.services.skills import get_skill_matcher
+
+
+def synthetic_requirements(roles: int, skills_per_role: int, seed: int = 0) -> RoleRequirements:
+    rng = np.random.default_rng(seed)
+    skills = [{"skill_id": skill["skill_id"], "skill": skill["skill"]} for skill in get_skill_matcher().skills]
+    targets = np.zeros((roles, len(skills)), dtype=np.float32)
+    for row in range(roles):
+        columns = rng.choice(len(skills), size=skills_per_role, replace=False)
+        targets[row, columns] = rng.integers(1, 6, size=skills_per_role)
+    return RoleRequirements(
+        roles=[{"role_id": f"role_{row}", "role": f"Role {row}"} for row in range(roles)],
+        skills=skills,
+        targets=targets,
+        version="synthetic"
+    )
+
+
+def loop_best_fit(role_skills: list[dict[int, float]], current: list[float], top_k: int) -> list[int]:
+    """Reference implementation: score each role with plain Python."""
+    scores = []
+    for row, required in enumerate(role_skills):
+        total = sum(required.values())
+        missing = sum(max(level - current[column], 0) for column, level in required.items())
+        scores.append((-(1 - missing / total), row))
+    return [row for _, row in sorted(scores)[:top_k]]
+
+
+def time_ms(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--roles", type=int, default=10000)
+    parser.add_argument("--skills-per-role", type=int, default=12)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    requirements = synthetic_requirements(args.roles, args.skills_per_role)
+    rng = np.random.default_rng(1)
+    current = np.zeros(len(requirements.skills), dtype=np.float32)
+    known = rng.choice(len(current), size=15, replace=False)
+    current[known] = rng.integers(1, 6, size=len(known))
+
+    role_skills = [
+        {int(column): float(level) for column, level in enumerate(row) if level}
+        for row in requirements.targets
+    ]
+    current_list = current.tolist()
+
+    vectorized = time_ms(lambda: requirements.analyze(current, top_k=args.top_k), args.repeat)
+    loop = time_ms(lambda: loop_best_fit(role_skills, current_list, args.top_k), max(args.repeat // 10, 1))
+
+    # Roles can tie on score, so check the vectorized top-k scores rather than ids
+    scores = requirements.fit_scores(current)
+    expected = scores[loop_best_fit(role_skills, current_list, args.top_k)]
+    actual = [role["fit_score"] for role in requirements.best_fit_roles(current, args.top_k)]
+    assert np.allclose(expected, actual, atol=1e-4), (expected, actual)
+
+    print(f"{args.roles:,} roles x {len(requirements.skills)} skills")
+    print(f"vectorized: median {statistics.median(vectorized):.2f} ms, max {max(vectorized):.2f} ms")
+    print(f"python loop: median {statistics.median(loop):.2f} ms, max {max(loop):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
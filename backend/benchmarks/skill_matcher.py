@@ -0,0 +1,62 @@
+"""
+Skill extraction latency on long resumes.
+
+Builds a synthetic resume of --pages pages (~3,000 characters each) mixing
+taxonomy skills with filler prose, then times SkillMatcher compilation and
+extraction.
+
+Usage (from the backend directory):
+    python -m benchmarks.skill_matcher --pages 50 --repeat 20
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.skills import SkillMatcher
+
+FILLER = (
+    "Responsible for delivering projects on time and collaborating with the wider "
+    "organisation to improve processes, going beyond expectations in every quarter. "
+)
+SKILL_PHRASES = [
+    "Python", "PostgreSQL", "Kubernetes", "machine learning", "React.js", "C++", "Go programming",
+    "CI/CD", "AWS", "data pipelines", "Agile", "stakeholder management", "TypeScript", "Docker",
+]
+
+
+def synthetic_resume(pages: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < pages * 3000:
+        part = FILLER if rng.random() < 0.7 else f"Used {rng.choice(SKILL_PHRASES)} extensively. "
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = SkillMatcher.from_file()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    text = synthetic_resume(args.pages)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        skills = matcher.extract(text)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"Taxonomy {matcher.taxonomy_version}: {len(matcher.skills)} skills, compiled in {compile_ms:.1f} ms")
+    print(f"{args.pages} pages ({len(text):,} chars): {len(skills)} skills found, "
+          f"median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Tests drive create_app() in-process over ASGI against a throwaway SQLite
+database, with the background workers off. The engines are created from
+DATABASE_URL when app.db.session is imported, so the environment is set
+before anything from app is imported.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+_database_dir = tempfile.mkdtemp(prefix="apex-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["CHAT_SUMMARY_WORKER_ENABLED"] = "false"
+os.environ["RESUME_BATCH_WORKER_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine on the session's event loop (the async engine's connections belong to one loop)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    from app.db.session import async_engine
+
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+    shutil.rmtree(_database_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(run):
+    """An httpx client for the application, with its lifespan (schema creation) run."""
+    from app.main import create_app
+
+    app = create_app()
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
+    run(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture(scope="session")
+def register(run, client):
+    """Register a new user by email and return their auth cookie."""
+    def register(email: str) -> dict[str, str]:
+        response = run(client.post("/api/v1/auth/register", json={
+            "email": email, "password": "test-password", "full_name": "Test User"
+        }))
+        assert response.status_code in (200, 201), response.text
+        return {"Cookie": f"access_token={create_access_token({'sub': email})}"}
+    return register
+
+
+@pytest.fixture(scope="session")
+def auth_headers(register):
+    """A registered user's auth cookie."""
+    return register("tests@example.com")
@@ -0,0 +1,46 @@
+"""
+Registration and login (app.api.v1.endpoints.login) with password hashing
+awaited on the bounded hashing pool.
+"""
+import threading
+
+import pytest
+
+from app.core.security import password_hash_pool
+
+PASSWORD = "auth-test-password"
+
+
+@pytest.fixture(scope="module")
+def email(run, client):
+    email = "auth-tests@example.com"
+    response = run(client.post("/api/v1/auth/register", json={"email": email, "password": PASSWORD}))
+    assert response.status_code == 201, response.text
+    return email
+
+
+def login(run, client, email, password):
+    return run(client.post("/api/v1/auth/token", data={"username": email, "password": password}))
+
+
+def test_register_rejects_a_duplicate_email(run, client, email):
+    response = run(client.post("/api/v1/auth/register", json={"email": email, "password": PASSWORD}))
+    assert response.status_code == 400
+
+
+def test_login_sets_the_access_cookie(run, client, email):
+    response = login(run, client, email, PASSWORD)
+    assert response.status_code == 200, response.text
+    assert response.cookies.get("access_token")
+
+
+def test_login_rejects_a_wrong_password(run, client, email):
+    assert login(run, client, email, "not-the-password").status_code == 401
+
+
+def test_saturated_hashing_pool_answers_503(run, client, email, monkeypatch):
+    monkeypatch.setattr(password_hash_pool, "_slots", threading.BoundedSemaphore(1))
+    password_hash_pool._slots.acquire()
+    response = login(run, client, email, PASSWORD)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,60 @@
+"""
+In-process auth caches (app.core.cache) and their invalidation when a user
+changes, plus the /users/me ETag.
+"""
+import time
+
+from sqlalchemy import select
+
+from app.core.cache import TTLCache, user_cache
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+
+
+def test_ttl_cache_evicts_least_recently_used_first():
+    cache = TTLCache("test-lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = time.monotonic()
+    cache = TTLCache("test-ttl", maxsize=10, ttl=60)
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=600)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    # A per-entry TTL can only shorten the cache-wide one
+    assert cache.get("long") is None
+
+
+async def _deactivate(email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalars().one()
+        user.is_active = False
+        await db.commit()
+
+
+def test_deactivating_a_user_drops_the_cached_copy(run, client, register):
+    email = "deactivated-tests@example.com"
+    headers = register(email)
+    assert run(client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    assert user_cache.get(email) is not None
+
+    run(_deactivate(email))
+    assert user_cache.get(email) is None
+    assert run(client.get("/api/v1/users/me", headers=headers)).status_code == 403
+
+
+def test_current_user_revalidates_with_etag(run, client, auth_headers):
+    response = run(client.get("/api/v1/users/me", headers=auth_headers))
+    etag = response.headers["ETag"]
+    assert run(client.get("/api/v1/users/me", headers={**auth_headers, "If-None-Match": etag})).status_code == 304
+    assert run(client.get("/api/v1/users/me", headers={**auth_headers, "If-None-Match": 'W/"stale"'})).status_code == 200
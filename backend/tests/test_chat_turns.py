@@ -0,0 +1,139 @@
+"""
+Writing chat turns: the SSE stream (and the partial response kept when the
+client disconnects), write-behind batching with per-turn retry, and the
+summarizer's debounce.
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.api.v1.endpoints.chat import _stream_ai_response
+from app.db.chat_store import ChatWriteBehind, new_chat_row, new_message_row
+from app.db.models import Chat, Message
+from app.db.session import AsyncSessionLocal
+from app.services.summaries import ChatSummarizer
+
+
+@pytest.fixture(scope="module")
+def headers(register):
+    return register("chat-turns-tests@example.com")
+
+
+def send(run, client, headers, message, chat_id=None):
+    body = {"message": message} if chat_id is None else {"message": message, "chat_id": chat_id}
+    response = run(client.post("/api/v1/chat/chat", headers=headers, json=body))
+    assert response.status_code == 200, response.text
+    return response.json()["chat_id"]
+
+
+async def _messages(chat_id) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Message.message_id, Message.sender, Message.content)
+            .where(Message.chat_id == uuid.UUID(str(chat_id)))
+            .order_by(Message.created_at, Message.message_id)
+        )
+        return result.all()
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_sends_tokens_then_saves_the_message(run, client, headers):
+    response = run(client.post("/api/v1/chat/chat/stream", headers=headers, json={"message": "How do I learn Go?"}))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "start" and names[-2:] == ["analysis", "done"]
+    assert set(names[1:-2]) == {"token"}
+
+    start = events[0][1]
+    messages = run(_messages(start["chat_id"]))
+    assert [message.sender for message in messages] == ["USER", "AI"]
+    assert str(messages[-1].message_id) == start["message_id"]
+    assert messages[-1].content == "".join(data["text"] for name, data in events if name == "token")
+
+
+async def _disconnect_after(chat_id: str, tokens: int) -> list:
+    stream = _stream_ai_response(uuid.UUID(chat_id), "Tell me about system design interviews", [])
+    received = [await stream.__anext__() for _ in range(1 + tokens)]
+    await stream.aclose()
+    return received
+
+
+def test_disconnect_keeps_the_partial_response(run, client, headers):
+    chat_id = send(run, client, headers, "First question")
+    received = run(_disconnect_after(chat_id, tokens=2))
+    partial = "".join(json.loads(event.split("data: ")[1])["text"] for event in received[1:])
+
+    messages = run(_messages(chat_id))
+    assert len(messages) == 3
+    assert messages[-1].sender == "AI"
+    assert messages[-1].content == partial
+
+
+async def _write_behind_turns(existing_message_id: uuid.UUID) -> tuple:
+    write_behind = ChatWriteBehind(AsyncSessionLocal, flush_interval=0.05, max_batch=1000)
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(select(Chat.user_id).limit(1))
+    good_chat = new_chat_row(user_id)
+    good = [new_message_row(good_chat["chat_id"], "USER", "kept"), new_message_row(good_chat["chat_id"], "AI", "kept")]
+    bad_chat = new_chat_row(user_id)
+    # Reuses a stored message id: this turn's INSERT fails
+    bad = [new_message_row(bad_chat["chat_id"], "USER", "dropped", message_id=existing_message_id)]
+    outcomes = await asyncio.gather(
+        write_behind.submit([good_chat], good),
+        write_behind.submit([bad_chat], bad),
+        return_exceptions=True
+    )
+    await write_behind.stop()
+    return good_chat["chat_id"], bad_chat["chat_id"], outcomes
+
+
+def test_write_behind_fails_only_the_failing_turn(run, client, headers):
+    chat_id = send(run, client, headers, "Seed message")
+    existing = run(_messages(chat_id))[0].message_id
+
+    good_chat_id, bad_chat_id, (good, bad) = run(_write_behind_turns(existing))
+    assert good is None
+    assert isinstance(bad, Exception)
+    assert [message.content for message in run(_messages(good_chat_id))] == ["kept", "kept"]
+    assert run(_messages(bad_chat_id)) == []
+
+
+async def _summary_state(chat_id) -> tuple:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(Chat.summary_message_count, Chat.context_summary).where(Chat.chat_id == uuid.UUID(str(chat_id)))
+        )).one()
+
+
+def test_summaries_wait_for_enough_new_messages_or_idle(run, client, headers):
+    summarizer = ChatSummarizer(
+        AsyncSessionLocal, every_messages=4, idle_seconds=3600, poll_interval=60, batch_size=1000, max_messages=50
+    )
+    chat_id = send(run, client, headers, "Summarize me later")
+    run(summarizer.run_once())
+    assert run(_summary_state(chat_id)) == (0, None)
+
+    send(run, client, headers, "Second turn", chat_id)
+    run(summarizer.run_once())
+    count, summary = run(_summary_state(chat_id))
+    assert count == 4 and summary
+
+    # Two new messages: not enough on their own, but the chat is idle
+    send(run, client, headers, "Third turn", chat_id)
+    run(summarizer.run_once())
+    assert run(_summary_state(chat_id))[0] == 4
+    run(summarizer.run_once(idle_seconds=0))
+    assert run(_summary_state(chat_id))[0] == 6
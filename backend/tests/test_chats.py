@@ -0,0 +1,115 @@
+"""
+Chat read endpoints: keyset pagination, ETag/304 revalidation and its
+invalidation by writes, and full-text search.
+"""
+import pytest
+
+CHATS = 5
+
+
+@pytest.fixture(scope="module")
+def headers(register):
+    """A user of their own, so other tests' chats don't show up in the pages."""
+    return register("chats-tests@example.com")
+
+
+@pytest.fixture(scope="module")
+def chat_ids(run, client, headers):
+    """CHATS chats of one turn each, oldest first."""
+    chat_ids = []
+    for index in range(CHATS):
+        response = run(client.post("/api/v1/chat/chat", headers=headers, json={
+            "message": f"Chat {index}: how do I learn Kubernetes networking?"
+        }))
+        assert response.status_code == 200, response.text
+        chat_ids.append(response.json()["chat_id"])
+    return chat_ids
+
+
+def list_chats(run, client, headers, **params):
+    return run(client.get("/api/v1/chat/chats", headers=headers, params=params))
+
+
+def test_chat_pages_cover_every_chat_once_newest_first(run, client, headers, chat_ids):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = list_chats(run, client, headers, **params).json()
+        assert len(page["items"]) <= 2
+        seen.extend(chat["chat_id"] for chat in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == chat_ids[::-1]
+
+
+def test_malformed_cursor_is_rejected(run, client, headers, chat_ids):
+    assert list_chats(run, client, headers, cursor="not-a-cursor").status_code == 400
+
+
+def test_message_pages_are_oldest_first(run, client, headers, chat_ids):
+    chat_id = chat_ids[0]
+    run(client.post("/api/v1/chat/chat", headers=headers, json={"message": "And service meshes?", "chat_id": chat_id}))
+    url = f"/api/v1/chat/chats/{chat_id}/messages"
+
+    first = run(client.get(url, headers=headers, params={"limit": 3})).json()
+    rest = run(client.get(url, headers=headers, params={"limit": 3, "cursor": first["next_cursor"]})).json()
+    messages = first["items"] + rest["items"]
+    assert [message["sender"] for message in messages] == ["USER", "AI", "USER", "AI"]
+    assert rest["next_cursor"] is None
+
+
+def test_chat_list_revalidates_until_a_chat_is_added(run, client, headers, chat_ids):
+    response = list_chats(run, client, headers)
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    unchanged = list_chats(run, client, {**headers, "If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    run(client.post("/api/v1/chat/chat", headers=headers, json={"message": "One more question"}))
+    changed = list_chats(run, client, {**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_deleting_a_chat_changes_the_list_etag(run, client, headers, chat_ids):
+    response = run(client.post("/api/v1/chat/chat", headers=headers, json={"message": "Short-lived"}))
+    chat_id = response.json()["chat_id"]
+    etag = list_chats(run, client, headers).headers["ETag"]
+
+    assert run(client.delete(f"/api/v1/chat/chats/{chat_id}", headers=headers)).status_code == 200
+    response = list_chats(run, client, {**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert chat_id not in {chat["chat_id"] for chat in response.json()["items"]}
+
+
+def test_chat_etag_is_scoped_to_the_user(run, client, headers, auth_headers, chat_ids):
+    etag = list_chats(run, client, headers).headers["ETag"]
+    assert list_chats(run, client, {**auth_headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_search_ranks_and_highlights_matches(run, client, headers, chat_ids):
+    chat_id = chat_ids[1]
+    for message in ("Terraform state locking with Terraform Cloud", "Nothing relevant here"):
+        run(client.post("/api/v1/chat/chat", headers=headers, json={"message": message, "chat_id": chat_id}))
+
+    response = run(client.get("/api/v1/chat/search", headers=headers, params={"q": "terraform"}))
+    assert response.status_code == 200, response.text
+    hits = response.json()["items"]
+    assert hits
+    assert all("<mark>" in hit["snippet"].lower() for hit in hits)
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+
+
+def test_search_pages_do_not_repeat_hits(run, client, headers, chat_ids):
+    def search(**params):
+        return run(client.get("/api/v1/chat/search", headers=headers, params={"q": "kubernetes", "limit": 2, **params}))
+
+    first = search().json()
+    assert first["next_cursor"]
+    second = search(cursor=first["next_cursor"]).json()
+    first_ids = {hit["message_id"] for hit in first["items"]}
+    assert first_ids.isdisjoint(hit["message_id"] for hit in second["items"])
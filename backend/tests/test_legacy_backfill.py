@@ -0,0 +1,88 @@
+"""
+Resumable backfill of legacy chat_messages into chats/messages
+(app.db.legacy_chats): sessions split by gaps, and a batch that never
+commits is copied again by the next run without duplicates.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.core.security import get_password_hash
+from app.db.legacy_chats import BACKFILL_NAME, copy_batch, load_checkpoint
+from app.db.models import BackfillCheckpoint, Chat, ChatMessage, Message, MessageSender, User
+from app.db.session import AsyncSessionLocal
+
+SESSION_GAP = timedelta(hours=1)
+BATCH_SIZE = 2
+
+# Minutes after the first message: two sessions, of 3 and 2 messages
+OFFSETS = (0, 5, 10, 180, 185)
+
+
+async def _seed_legacy_messages() -> uuid.UUID:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ChatMessage))
+        await db.execute(delete(BackfillCheckpoint).where(BackfillCheckpoint.name == BACKFILL_NAME))
+        user = User(email=f"{uuid.uuid4()}@example.com", hashed_password=get_password_hash("test-password"))
+        db.add(user)
+        await db.flush()
+        started = datetime(2025, 3, 1, 9)
+        db.add_all([
+            ChatMessage(
+                user_id=user.user_id, sender=MessageSender.USER if index % 2 == 0 else MessageSender.AI,
+                content=f"legacy {index}", created_at=started + timedelta(minutes=offset)
+            )
+            for index, offset in enumerate(OFFSETS)
+        ])
+        await db.commit()
+        return user.user_id
+
+
+async def _run_batches(batches: int, commit: bool) -> int:
+    """Copy up to `batches` batches in one session; the last is rolled back unless commit."""
+    copied = 0
+    async with AsyncSessionLocal() as db:
+        checkpoint = await load_checkpoint(db)
+        for batch in range(batches):
+            count = await copy_batch(db, checkpoint, BATCH_SIZE, SESSION_GAP)
+            if not count:
+                break
+            if commit or batch < batches - 1:
+                await db.commit()
+                copied += count
+        await db.rollback()
+    return copied
+
+
+async def _copied_chats(user_id: uuid.UUID) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Chat.message_count, func.count(Message.message_id))
+            .join(Message, Message.chat_id == Chat.chat_id)
+            .where(Chat.user_id == user_id)
+            .group_by(Chat.chat_id, Chat.message_count)
+            .order_by(Chat.started_at)
+        )
+        return [tuple(row) for row in result]
+
+
+async def _checkpoint() -> BackfillCheckpoint:
+    async with AsyncSessionLocal() as db:
+        return await db.get(BackfillCheckpoint, BACKFILL_NAME)
+
+
+def test_backfill_resumes_after_an_uncommitted_batch(run, client):
+    user_id = run(_seed_legacy_messages())
+
+    # One committed batch, then one that "crashes" before its commit
+    assert run(_run_batches(2, commit=False)) == BATCH_SIZE
+    assert run(_checkpoint()).rows_copied == BATCH_SIZE
+
+    assert run(_run_batches(10, commit=True)) == len(OFFSETS) - BATCH_SIZE
+    # Every message copied exactly once, the first session continued across batches
+    assert run(_copied_chats(user_id)) == [(3, 3), (2, 2)]
+    checkpoint = run(_checkpoint())
+    assert checkpoint.rows_copied == len(OFFSETS)
+    assert checkpoint.chats_created == 2
+    assert checkpoint.completed_at is not None
@@ -0,0 +1,155 @@
+"""
+Request admission middleware: body size limits (app.core.body_limit) and
+per route group concurrency limits and load shedding (app.core.admission).
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.admission import AdmissionControl, AdmissionRejected, ConcurrencyLimiter, route_group_limiters
+from app.core.body_limit import BodySizeLimit
+from app.core.config import settings
+
+LIMIT = 100
+
+
+async def echo_body(scope, receive, send):
+    """Reads the whole body and answers with its size."""
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise OSError("client disconnected")
+        size += len(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(size).encode()})
+
+
+def request(run, app, method, path, content=None):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, content=content)
+    return run(send())
+
+
+def post(run, app, path, content):
+    return request(run, app, "POST", path, content)
+
+
+def chunks(total: int, size: int = 10):
+    async def body():
+        for _ in range(total // size):
+            yield b"x" * size
+    return body()
+
+
+@pytest.fixture
+def limited():
+    return BodySizeLimit(echo_body, [("/upload", LIMIT)])
+
+
+def test_declared_body_over_the_limit_is_rejected(run, limited):
+    response = post(run, limited, "/upload", b"x" * (LIMIT + 1))
+    assert response.status_code == 413
+    assert response.headers["Connection"] == "close"
+
+
+def test_streamed_body_over_the_limit_is_rejected(run, limited):
+    assert post(run, limited, "/upload", chunks(LIMIT * 3)).status_code == 413
+
+
+@pytest.mark.parametrize("content", [lambda: b"x" * LIMIT, lambda: chunks(LIMIT)], ids=["declared", "streamed"])
+def test_bodies_within_the_limit_pass(run, limited, content):
+    response = post(run, limited, "/upload", content())
+    assert response.status_code == 200
+    assert response.text == str(LIMIT)
+
+
+def test_other_paths_are_not_limited(run, limited):
+    assert post(run, limited, "/other", b"x" * (LIMIT * 2)).status_code == 200
+
+
+def test_app_rejects_oversized_resume_uploads_before_reading_them(run, client, auth_headers):
+    max_bytes = settings.RESUME_MAX_UPLOAD_BYTES + settings.RESUME_FORM_OVERHEAD_BYTES
+    response = run(client.post(
+        "/api/v1/analysis/analyze-resume",
+        headers={**auth_headers, "Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(max_bytes + 1)},
+        content=b""
+    ))
+    assert response.status_code == 413
+
+
+async def _limiter_rounds() -> tuple:
+    limiter = ConcurrencyLimiter("test", limit=1, queue_size=1, max_wait=0.2)
+    await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+
+    # Queue full: rejected without waiting
+    with pytest.raises(AdmissionRejected) as full:
+        await limiter.acquire()
+
+    # The slot is handed over to the queued request, not freed
+    limiter.release()
+    await queued
+    handed_over = limiter.in_flight
+
+    # Waiting longer than max_wait gives up
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await limiter.acquire()
+    limiter.release()
+    return full.value, handed_over, timed_out.value, limiter
+
+
+def test_limiter_queues_hands_over_and_rejects(run):
+    full, handed_over, timed_out, limiter = run(_limiter_rounds())
+    assert full.status_code == 429
+    assert handed_over == 1
+    assert timed_out.status_code == 429
+    assert limiter.in_flight == 0
+    assert limiter.rejected == 2
+
+
+class FakePoolMonitor:
+    def __init__(self, wait: float):
+        self.wait = wait
+
+    def wait_seconds(self) -> float:
+        return self.wait
+
+
+def admission(pool_wait: float) -> AdmissionControl:
+    return AdmissionControl(
+        echo_body,
+        [("/api", ConcurrencyLimiter("api", 4, 4, 1.0))],
+        FakePoolMonitor(pool_wait),
+        shed_reads_after=0.1,
+        shed_all_after=0.5
+    )
+
+
+def test_slow_pool_sheds_reads_first(run):
+    app = admission(pool_wait=0.3)
+    response = request(run, app, "GET", "/api/items")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert request(run, app, "POST", "/api/items").status_code == 200
+
+
+def test_very_slow_pool_sheds_everything_but_ungrouped_paths(run):
+    app = admission(pool_wait=2.0)
+    assert request(run, app, "POST", "/api/items").status_code == 503
+    assert request(run, app, "GET", "/health").status_code == 200
+
+
+def test_chat_streams_have_their_own_group():
+    control = AdmissionControl(echo_body, route_group_limiters(), FakePoolMonitor(0), 1, 1)
+    api = settings.API_V1_STR
+    assert control.limiter_for(f"{api}/chat/chat/stream").name == "chat_stream"
+    assert control.limiter_for(f"{api}/chat/chats").name == "chat"
+    assert control.limiter_for(f"{api}/users/me") is control.limiter_for(f"{api}/auth/token")
+    assert control.limiter_for("/health") is None
@@ -0,0 +1,55 @@
+"""
+Statement budgets of the chat read endpoints (app.core.profiling).
+
+Each endpoint is called once to warm the per-process caches and schema
+checks, then measured: an N+1 loop over the user's chats or an extra round
+trip makes these tests fail.
+"""
+import pytest
+
+from app.core.profiling import assert_max_queries
+
+CHATS = 5
+TURNS_PER_CHAT = 3
+
+
+@pytest.fixture(scope="module")
+def chat_ids(run, client, auth_headers):
+    """CHATS chats of TURNS_PER_CHAT turns each."""
+    chat_ids = []
+    for chat in range(CHATS):
+        chat_id = None
+        for turn in range(TURNS_PER_CHAT):
+            body = {"message": f"How do I get better at SQL? ({chat}.{turn})"}
+            if chat_id is not None:
+                body["chat_id"] = chat_id
+            response = run(client.post("/api/v1/chat/chat", headers=auth_headers, json=body))
+            assert response.status_code == 200, response.text
+            chat_id = response.json()["chat_id"]
+        chat_ids.append(chat_id)
+    return chat_ids
+
+
+def test_list_chats_statements(run, client, auth_headers, chat_ids):
+    run(client.get("/api/v1/chat/chats", headers=auth_headers))
+    # The chats_version check (ETag) and one page query
+    with assert_max_queries(2):
+        response = run(client.get("/api/v1/chat/chats", headers=auth_headers))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == CHATS
+
+
+def test_get_chat_statements(run, client, auth_headers, chat_ids):
+    run(client.get(f"/api/v1/chat/chats/{chat_ids[0]}", headers=auth_headers))
+    # Summary progress and the chat row
+    for chat_id in chat_ids:
+        with assert_max_queries(2):
+            response = run(client.get(f"/api/v1/chat/chats/{chat_id}", headers=auth_headers))
+        assert response.status_code == 200
+        assert response.json()["chat_id"] == chat_id
+
+
+def test_assert_max_queries_reports_statements(run, client, auth_headers, chat_ids):
+    with pytest.raises(AssertionError, match="Expected at most 1 SQL statements, got 2 statements"):
+        with assert_max_queries(1):
+            run(client.get("/api/v1/chat/chats", headers=auth_headers))
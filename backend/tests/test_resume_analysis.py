@@ -0,0 +1,46 @@
+"""
+Single resume analysis (POST /analysis/analyze-resume): uploads without
+client-side extracted text are parsed server-side before analysis and caching.
+"""
+import uuid
+
+RESUME = "Senior engineer: Python, SQL, Docker and Kubernetes"
+
+
+def analyze(run, client, auth_headers, files=None, data=None):
+    return run(client.post("/api/v1/analysis/analyze-resume", headers=auth_headers, files=files, data=data))
+
+
+def skill_ids(body):
+    return {skill["skill_id"] for skill in body["skills"]}
+
+
+def test_file_only_upload_is_analyzed(run, client, auth_headers):
+    # Unique content, so no other test's result is served from the cache
+    content = f"{RESUME}\n{uuid.uuid4()}".encode()
+    files = {"file": ("resume.txt", content, "text/plain")}
+
+    first = analyze(run, client, auth_headers, files=files)
+    assert first.status_code == 200, first.text
+    body = first.json()
+    assert body["cached"] is False
+    assert body["extracted_text_length"] == len(content)
+    assert {"python", "sql", "docker", "kubernetes"} <= skill_ids(body)
+
+    second = analyze(run, client, auth_headers, files=files).json()
+    assert second["cached"] is True
+    assert skill_ids(second) == skill_ids(body)
+
+
+def test_extracted_text_is_analyzed_instead_of_the_file(run, client, auth_headers):
+    files = {"file": ("resume.pdf", f"%PDF-1.7 {uuid.uuid4()}".encode(), "application/pdf")}
+    response = analyze(run, client, auth_headers, files=files, data={"extracted_text": "Kubernetes"})
+    assert response.status_code == 200, response.text
+    assert skill_ids(response.json()) == {"kubernetes"}
+
+
+def test_unparseable_file_only_upload_is_rejected(run, client, auth_headers):
+    files = {"file": ("resume.pdf", f"%PDF-1.7 {uuid.uuid4()}".encode(), "application/pdf")}
+    response = analyze(run, client, auth_headers, files=files)
+    assert response.status_code == 415
+    assert "extracted_text" in response.json()["detail"]
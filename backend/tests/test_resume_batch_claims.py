@@ -0,0 +1,49 @@
+"""
+Claiming batch items (app.db.resume_batch_store.claim_item): oldest job
+first, then file order.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from app.core.security import get_password_hash
+from app.db.models import ResumeBatchItem, ResumeBatchJob, User
+from app.db.resume_batch_store import add_item, claim_item, create_job
+from app.db.session import AsyncSessionLocal
+
+
+async def _queue_jobs() -> dict[uuid.UUID, tuple[str, int]]:
+    """Two jobs of three items, the older one queued last and in reverse file order."""
+    labels = {}
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ResumeBatchJob))
+        user = User(email=f"{uuid.uuid4()}@example.com", hashed_password=get_password_hash("test-password"))
+        db.add(user)
+        await db.flush()
+        for name, age in (("newer", 0), ("older", 1)):
+            job_id = await create_job(db, user.user_id, 3)
+            await db.execute(
+                update(ResumeBatchJob).where(ResumeBatchJob.job_id == job_id)
+                .values(created_at=datetime.utcnow() - timedelta(hours=age))
+            )
+            for position in reversed(range(3)):
+                await add_item(db, job_id, position, f"{name}-{position}.txt", "text/plain", 1, b"x", "0" * 64)
+        await db.commit()
+        for item in (await db.execute(select(ResumeBatchItem))).scalars():
+            labels[item.item_id] = (item.filename.split("-")[0], item.position)
+    return labels
+
+
+async def _claim_all() -> list[uuid.UUID]:
+    claimed = []
+    async with AsyncSessionLocal() as db:
+        while claim := await claim_item(db, claim_timeout=600):
+            claimed.append(claim[0])
+    return claimed
+
+
+def test_items_are_claimed_oldest_job_first_in_file_order(run, client):
+    labels = run(_queue_jobs())
+    claimed = [labels[item_id] for item_id in run(_claim_all())]
+    assert claimed == [("older", 0), ("older", 1), ("older", 2), ("newer", 0), ("newer", 1), ("newer", 2)]
@@ -0,0 +1,48 @@
+"""
+Summary statistics of the ROI simulation (app.services.roi).
+"""
+import pytest
+
+from app.services.roi import get_roi_model
+
+PATHS = 20_000
+
+
+def simulate(role_id: str, investment: float = 5000) -> dict:
+    model = get_roi_model()
+    (result,) = model.simulate(
+        [{"role_index": model.requirements.find_role(role_id), "investment_amount": investment}],
+        PATHS,
+        seed=42
+    )
+    return result
+
+
+def test_headline_figures_are_means_for_rarely_placed_roles():
+    model = get_roi_model()
+    role_index = model.requirements.find_role("data_scientist")
+    assert model.placement_probability[role_index] < 0.5
+
+    result = simulate("data_scientist")
+    # The median path is never placed: it earns nothing and loses the investment
+    assert result["percentiles"]["return"]["p50"] == 0
+    assert result["percentiles"]["roi_percentage"]["p50"] == -100
+    assert result["expected_return"] > 0
+    assert result["roi_percentage"] > -100
+
+
+def test_expected_figures_lie_within_the_percentile_spread():
+    result = simulate("software_engineer")
+    percentiles = result["percentiles"]
+    assert percentiles["return"]["p10"] <= result["expected_return"] <= percentiles["return"]["p90"]
+    assert percentiles["roi_percentage"]["p10"] <= result["roi_percentage"] <= percentiles["roi_percentage"]["p90"]
+
+
+def test_unplaced_share_matches_the_placement_probability():
+    result = simulate("engineering_manager")
+    # Every placed path pays the course back within the horizon; unplaced ones never do
+    assert result["payback_probability"] == pytest.approx(result["placement_probability"], abs=0.02)
+
+
+def test_same_seed_gives_same_results():
+    assert simulate("data_analyst") == simulate("data_analyst")
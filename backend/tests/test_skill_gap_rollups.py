@@ -0,0 +1,122 @@
+"""
+Skill gap rollups (app.db.skill_gap_store): the incrementally maintained
+totals, the SQL rebuild and the legacy backfill agree on which gaps count.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.security import get_password_hash
+from app.db.chat_store import new_chat_row, new_message_row, write_chat_rows
+from app.db.legacy_chats import copy_batch, load_checkpoint
+from app.db.models import ChatMessage, MessageSender, SkillGapRollup, User
+from app.db.session import AsyncSessionLocal, async_engine
+from app.db.skill_gap_store import rebuild_rollups
+
+# Well-formed gaps mixed with shapes older analysis data may have
+ANALYSES = [
+    {"skill_gaps": [
+        {"skill": "SQL", "current_level": 2, "target_level": 4},
+        {"skill": "Python", "current_level": 1, "target_level": 3},
+    ]},
+    {"skill_gaps": [
+        {"skill": "SQL", "current_level": 3.7, "target_level": 5},
+        {"skill": "SQL", "current_level": "high", "target_level": 4},
+        {"skill": "SQL", "current_level": "2", "target_level": 4},
+        {"skill": "SQL", "current_level": True, "target_level": 4},
+        {"skill": "Docker", "target_level": 3},
+        {"skill": None, "current_level": 1, "target_level": 2},
+        "Kubernetes",
+        ["Go", 1, 3],
+    ]},
+    {"skill_gaps": ["Rust"]},
+    {"skill_gaps": {"skill": "Java", "current_level": 1, "target_level": 2}},
+    {"skills": ["Excel"]},
+    None,
+]
+
+# Two SQL samples (3.7 truncated to 3) and one Python sample; the rest is skipped
+EXPECTED = {"SQL": (2, 5, 9), "Python": (1, 1, 3)}
+
+
+async def _new_user() -> uuid.UUID:
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"{uuid.uuid4()}@example.com", hashed_password=get_password_hash("test-password"))
+        db.add(user)
+        await db.commit()
+        return user.user_id
+
+
+async def _rollups(user_id: uuid.UUID) -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                SkillGapRollup.skill, SkillGapRollup.samples,
+                SkillGapRollup.current_level_sum, SkillGapRollup.target_level_sum
+            ).where(SkillGapRollup.user_id == user_id)
+        )
+        return {row.skill: (row.samples, row.current_level_sum, row.target_level_sum) for row in result}
+
+
+async def _write_chat(user_id: uuid.UUID) -> None:
+    chat_row = new_chat_row(user_id)
+    message_rows = [
+        new_message_row(chat_row["chat_id"], MessageSender.AI.value, "analysis", analysis_data)
+        for analysis_data in ANALYSES
+    ]
+    async with AsyncSessionLocal() as db:
+        await write_chat_rows(db, [chat_row], message_rows)
+        await db.commit()
+
+
+async def _rebuild() -> None:
+    async with async_engine.begin() as connection:
+        assert await rebuild_rollups(connection)
+
+
+@pytest.fixture
+def user_id(run, client):
+    """A new user (client runs the lifespan, which creates the schema)."""
+    return run(_new_user())
+
+
+def test_incremental_rollups_skip_malformed_gaps(run, user_id):
+    run(_write_chat(user_id))
+    assert run(_rollups(user_id)) == EXPECTED
+
+
+def test_rebuild_matches_incremental_rollups(run, user_id):
+    run(_write_chat(user_id))
+    incremental = run(_rollups(user_id))
+    run(_rebuild())
+    assert run(_rollups(user_id)) == incremental == EXPECTED
+
+
+async def _backfill(user_id: uuid.UUID) -> int:
+    started = datetime(2026, 1, 5, 9)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ChatMessage))
+        db.add_all([
+            ChatMessage(
+                user_id=user_id, sender=MessageSender.AI, content="legacy analysis",
+                created_at=started + timedelta(minutes=index), analysis_data=analysis_data
+            )
+            for index, analysis_data in enumerate(ANALYSES)
+        ])
+        await db.commit()
+
+    copied = 0
+    async with AsyncSessionLocal() as db:
+        checkpoint = await load_checkpoint(db)
+        checkpoint.position = None
+        while batch := await copy_batch(db, checkpoint, batch_size=2, session_gap=timedelta(hours=1)):
+            copied += batch
+            await db.commit()
+    return copied
+
+
+def test_legacy_backfill_copies_malformed_analysis_data(run, user_id):
+    assert run(_backfill(user_id)) == len(ANALYSES)
+    assert run(_rollups(user_id)) == EXPECTED
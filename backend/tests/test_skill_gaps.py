@@ -0,0 +1,41 @@
+"""
+Skill gap scoring (app.services.skill_gaps) and the level bounds of
+POST /analysis/skill-gap-analysis.
+"""
+import pytest
+
+from app.services.skill_gaps import MAX_LEVEL, get_role_requirements
+
+
+def analyze(run, client, auth_headers, skills):
+    return run(client.post(
+        "/api/v1/analysis/skill-gap-analysis",
+        params={"target_role": "software_engineer"},
+        headers=auth_headers,
+        json={"skills": skills}
+    ))
+
+
+def gap(body, skill):
+    return next(gap for gap in body["skill_gaps"] if gap["skill"] == skill)
+
+
+@pytest.mark.parametrize("level", [-1, MAX_LEVEL + 0.5])
+def test_out_of_range_levels_are_rejected(run, client, auth_headers, level):
+    assert analyze(run, client, auth_headers, {"python": level}).status_code == 422
+
+
+def test_fractional_levels_are_reported_as_scored(run, client, auth_headers):
+    response = analyze(run, client, auth_headers, {"python": 1.5})
+    assert response.status_code == 200, response.text
+    assert gap(response.json(), "Python") == {"skill": "Python", "current_level": 1.5, "target_level": 3}
+
+
+def test_skill_vector_clamps_both_ends():
+    requirements = get_role_requirements()
+    vector = requirements.skill_vector({"python": -3, "sql": MAX_LEVEL + 2})
+    assert vector.min() == 0
+    assert vector.max() == MAX_LEVEL
+    # A negative level scores the same as not knowing the skill at all
+    unknown = requirements.skill_vector({"sql": MAX_LEVEL})
+    assert (requirements.fit_scores(vector) == requirements.fit_scores(unknown)).all()
@@ -0,0 +1,55 @@
+"""
+Skill extraction with the Aho-Corasick matcher (app.services.skills).
+"""
+import pytest
+
+from app.services.skills import SkillMatcher
+
+TAXONOMY = {
+    "version": "test",
+    "skills": [
+        {"id": "c", "name": "C", "category": "language"},
+        {"id": "cpp", "name": "C++", "category": "language", "aliases": ["cplusplus"]},
+        {"id": "go", "name": "Go", "category": "language", "aliases": ["golang"]},
+        {"id": "ml", "name": "Machine Learning", "category": "data", "aliases": ["ML"]},
+        {"id": "k8s", "name": "Kubernetes", "category": "devops", "aliases": ["k8s"]},
+        {"id": "react_native", "name": "React Native", "category": "mobile"},
+        {"id": "react", "name": "React", "category": "frontend"},
+        {"id": "internal", "name": "Internal", "category": "misc", "aliases": ["in-house"], "match_name": False},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher(TAXONOMY)
+
+
+def mentions(matcher, text):
+    return {skill["skill_id"]: skill["mentions"] for skill in matcher.extract(text)}
+
+
+def test_matches_are_case_insensitive_and_count_aliases(matcher):
+    assert mentions(matcher, "GOLANG and go, plus K8S on kubernetes") == {"go": 2, "k8s": 2}
+
+
+def test_only_whole_words_match(matcher):
+    assert mentions(matcher, "going to a cargo meetup, mlops") == {}
+
+
+def test_longest_match_wins(matcher):
+    assert mentions(matcher, "C++ and React Native, then C and React") == {"cpp": 1, "react_native": 1, "c": 1, "react": 1}
+
+
+def test_whitespace_is_collapsed_inside_names(matcher):
+    assert mentions(matcher, "machine\n   learning") == {"ml": 1}
+
+
+def test_names_excluded_from_matching_only_match_aliases(matcher):
+    assert mentions(matcher, "internal tooling, built in-house") == {"internal": 1}
+
+
+def test_most_mentioned_skills_come_first(matcher):
+    skills = matcher.extract("React once; Go, golang and Go again")
+    assert [skill["skill_id"] for skill in skills] == ["go", "react"]
+    assert skills[0] == {"skill_id": "go", "skill": "Go", "category": "language", "mentions": 3}